@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark del pipeline de análisis
+
+Genera datos sintéticos tipo PLUTO (ver synthetic.py) con el tamaño pedido y
+mide cada etapa de los problemas 1 y 2 por separado:
+
+- descubrimiento: búsqueda de tiempos disponibles (discover_times)
+- empaquetado: construcción del cubo mapeado en memoria (pack_snapshots)
+- carga: apertura del almacén y lectura de todos los snapshots
+- reducciones: estadísticas por variable y por tiempo (compute_stats)
+- renderizado: rasterizado de los fotogramas de la animación principal
+- codificacion: envío de esos fotogramas a ffmpeg y al GIF
+- pipeline: ejecución completa del grafo de tareas (en frío e incremental),
+  con la duración de cada tarea
+
+Los resultados se escriben en JSON para poder comparar entre versiones.
+
+Uso:
+    python benchmarks/bench_pipeline.py --cells 2000 --snapshots 200 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC_DIR = ROOT / 'src'
+sys.path.insert(0, str(SRC_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+
+from synthetic import ALFVEN_DIRNAME, SOUND_DIRNAME, make_workspace
+
+BENCH_VERSION = 1
+
+# Configuración de cada problema: carpeta de datos, coordenada, variables que
+# descubre el script y animación principal (variable, rango fijo o None)
+PROBLEMS = {
+    'problema1': {'data': SOUND_DIRNAME, 'coord': 'x1',
+                  'discover': ('rho', 'vx1', 'vx2', 'vx3'), 'anim': ('rho', None)},
+    'problema2': {'data': ALFVEN_DIRNAME, 'coord': 'x3',
+                  'discover': ('vx1', 'bx1', 'bx3'), 'anim': ('bx1', (-1.0, 1.0))},
+}
+
+
+class Timer:
+    """Acumula tiempos de pared de una etapa a lo largo de las repeticiones"""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, problem, stage, seconds, **info):
+        entry = self.samples.setdefault((problem, stage), {'seconds': [], 'info': {}})
+        entry['seconds'].append(seconds)
+        entry['info'].update(info)
+
+    def results(self):
+        out = []
+        for (problem, stage), entry in self.samples.items():
+            s = entry['seconds']
+            out.append({'problem': problem, 'stage': stage, 'seconds': s,
+                        'min': min(s), 'median': statistics.median(s), 'max': max(s),
+                        **entry['info']})
+        return out
+
+
+def _clock(func, *args, **kwargs):
+    start = time.perf_counter()
+    value = func(*args, **kwargs)
+    return time.perf_counter() - start, value
+
+
+def bench_stages(problem, data_dir, timer):
+    """Mide las etapas aisladas de un problema sobre su directorio de datos"""
+    from dataset import STORE_DIRNAME, SnapshotStore, pack_snapshots
+    from render import LineAnimator
+    from stats import compute_stats
+    from utils import discover_times
+    from video import FfmpegPipe, GifWriter
+
+    cfg = PROBLEMS[problem]
+    shutil.rmtree(data_dir / STORE_DIRNAME, ignore_errors=True)
+
+    sec, times = _clock(lambda: {v: discover_times(str(data_dir / f'{v}_*.npy'))
+                                 for v in cfg['discover']})
+    timer.add(problem, 'descubrimiento', sec, files=sum(len(t) for t in times.values()))
+
+    sec, _ = _clock(pack_snapshots, data_dir)
+    timer.add(problem, 'empaquetado', sec)
+
+    def load():
+        store = SnapshotStore(data_dir)
+        total = 0.0
+        for var in store.variables:
+            total += float(np.nansum(store.series(var)))
+        return store
+
+    sec, store = _clock(load)
+    timer.add(problem, 'carga', sec, bytes=int(store.cube.nbytes))
+
+    sec, stats = _clock(compute_stats, store)
+    timer.add(problem, 'reducciones', sec, variables=len(stats))
+
+    var, ylim = cfg['anim']
+    ylim = ylim or stats[var].ylim(pad_frac=0.05)
+    frames = store.times_for(var)
+    tmp = Path(tempfile.mkdtemp(prefix='bench_encode_'))
+    render_s = encode_s = 0.0
+    try:
+        with LineAnimator(store.coord(cfg['coord']), 'x', var, ylim,
+                          title=f'{var} — t = {frames[0]}') as anim:
+            sinks = [FfmpegPipe(tmp / 'anim.mp4', anim.size), GifWriter(tmp / 'anim.gif', anim.size)]
+            for t in frames:
+                start = time.perf_counter()
+                rgb = anim.to_rgb(anim.draw(store.snapshot(var, t), f'{var} — t = {t}'))
+                mid = time.perf_counter()
+                for sink in sinks:
+                    sink.write(rgb)
+                render_s += mid - start
+                encode_s += time.perf_counter() - mid
+            start = time.perf_counter()
+            ok = [sink.close() for sink in sinks]
+            encode_s += time.perf_counter() - start
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    timer.add(problem, 'renderizado', render_s, frames=len(frames))
+    timer.add(problem, 'codificacion', encode_s, frames=len(frames), mp4=ok[0], gif=ok[1])
+
+
+def bench_pipeline(workspace, timer, workers, log):
+    """Ejecuta ambos problemas como grafo de tareas, en frío y luego incremental"""
+    import solucion_problema1
+    import solucion_problema2
+    from dataset import STORE_DIRNAME
+    from scheduler import TaskGraph
+
+    for name in (SOUND_DIRNAME, ALFVEN_DIRNAME):
+        shutil.rmtree(workspace / 'data' / name / STORE_DIRNAME, ignore_errors=True)
+    shutil.rmtree(workspace / 'results', ignore_errors=True)
+
+    for mode in ('frio', 'incremental'):
+        graph = TaskGraph(workers)
+        render_workers = max(1, workers // 4)
+        for module in (solucion_problema1, solucion_problema2):
+            problem = module.__name__.replace('solucion_', '')
+            module.add_tasks(graph, render_workers,
+                             data_dir=workspace / 'data' / PROBLEMS[problem]['data'],
+                             results_dir=workspace / 'results' / problem)
+        with redirect_stdout(log):
+            sec, ok = _clock(graph.run)
+        timer.add('pipeline', mode, sec, ok=ok, workers=workers)
+        for task in graph.tasks.values():
+            problem, _, stage = task.name.partition(':')
+            timer.add(problem, f'tarea:{stage}:{mode}', task.elapsed, status=task.status)
+
+
+def environment():
+    import matplotlib
+    import PIL
+
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'pillow': PIL.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'ffmpeg': shutil.which('ffmpeg') is not None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline con datos sintéticos")
+    parser.add_argument('--cells', type=int, default=100, help="Celdas de la malla 1D")
+    parser.add_argument('--snapshots', type=int, default=21, help="Número de tiempos")
+    parser.add_argument('--sound-vars', nargs='+', default=None,
+                        help="Variables de la onda sonora (por defecto todas)")
+    parser.add_argument('--alfven-vars', nargs='+', default=None,
+                        help="Variables de la onda de Alfvén (por defecto todas)")
+    parser.add_argument('--dtype', default='float64', choices=('float32', 'float64'))
+    parser.add_argument('--repeat', type=int, default=3, help="Repeticiones de cada etapa")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Presupuesto de workers (ver RENDER_WORKERS)")
+    parser.add_argument('--no-pipeline', action='store_true',
+                        help="Medir solo las etapas aisladas")
+    parser.add_argument('--workdir', default=None,
+                        help="Directorio de trabajo (por defecto uno temporal que se borra)")
+    parser.add_argument('--output', default='bench_results.json', help="Archivo JSON de salida")
+    args = parser.parse_args()
+
+    from render import resolve_workers
+
+    workers = resolve_workers(args.workers)
+    workspace = Path(args.workdir or tempfile.mkdtemp(prefix='bench_pipeline_')).resolve()
+    output = Path(args.output).resolve()
+    print(f"⏱️ Generando datos sintéticos en {workspace}...")
+    datasets = make_workspace(workspace, args.cells, args.snapshots, args.sound_vars,
+                              args.alfven_vars, dtype=np.dtype(args.dtype))
+
+    timer = Timer()
+    try:
+        for i in range(args.repeat):
+            print(f"⏱️ Repetición {i + 1}/{args.repeat}")
+            for problem, cfg in PROBLEMS.items():
+                bench_stages(problem, workspace / 'data' / cfg['data'], timer)
+            if not args.no_pipeline:
+                with open(workspace / 'pipeline.log', 'a') as log:
+                    bench_pipeline(workspace, timer, workers, log)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    report = {
+        'benchmark': 'pipeline',
+        'version': BENCH_VERSION,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'params': {'cells': args.cells, 'snapshots': args.snapshots, 'repeat': args.repeat,
+                   'workers': workers, 'dtype': args.dtype, 'datasets': datasets},
+        'results': timer.results(),
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'='*50}")
+    for r in report['results']:
+        print(f"⏱️ {r['problem']:<10} {r['stage']:<32} {r['median']:8.3f} s (mín {r['min']:.3f})")
+    print(f"🤍 Resultados en {output}")
+    print(f"{'='*50}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+🧪 Datos sintéticos tipo PLUTO
+
+Genera conjuntos de datos de onda sonora y onda de Alfvén con el mismo formato
+que data/ (un archivo `var_XX.npy` por variable y tiempo, más la coordenada
+`x1.npy` o `x3.npy`), con número de celdas, de snapshots y de variables
+configurable. Sirven para medir cómo escala el pipeline más allá de los ~21
+snapshots de 100 celdas incluidos en el repositorio.
+
+emulate_run escribe los mismos snapshots de a uno cada cierto tiempo, como
+una simulación en curso, para probar el modo seguimiento (src/follow.py):
+    python benchmarks/synthetic.py /tmp/corrida --kind sound --interval 1
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+SOUND_VARIABLES = ('rho', 'vx1', 'vx2', 'vx3')
+ALFVEN_VARIABLES = ('rho', 'vx1', 'vx2', 'vx3', 'bx1', 'bx2', 'bx3')
+
+# Subcarpetas que esperan los scripts de solución
+SOUND_DIRNAME = 'soundwave-data'
+ALFVEN_DIRNAME = 'alfvenwave-data'
+
+
+def _grid(ncells):
+    """Centros de celda uniformes en [0, 1]"""
+    return (np.arange(ncells) + 0.5) / ncells
+
+
+def _write(out_dir, var, t, arr, dtype, width):
+    np.save(out_dir / f'{var}_{t:0{width}d}.npy', arr.astype(dtype, copy=False))
+
+
+def _fields_sound(x, tau, amp, rng, noise):
+    # Onda estacionaria entre paredes reflectivas (modo fundamental, c_s = 1)
+    k = np.pi
+    fields = {
+        'rho': 1.0 + amp * np.cos(k * x) * np.cos(k * tau),
+        'vx1': amp * np.sin(k * x) * np.sin(k * tau),
+    }
+    for var in ('vx2', 'vx3'):
+        fields[var] = np.zeros_like(x)
+    if noise:
+        for arr in fields.values():
+            arr += noise * rng.standard_normal(x.size)
+    return fields
+
+
+def _fields_alfven(x, tau, amp, rng, noise):
+    # Onda de Alfvén viajera sobre B0 = 1 y rho0 = 1 (v_A = 1), dominio periódico
+    phase = 2 * np.pi * (x - tau)
+    fields = {
+        'rho': np.ones_like(x),
+        'bx1': amp * np.cos(phase),
+        'vx1': -amp * np.cos(phase),
+        'bx3': np.ones_like(x),
+    }
+    for var in ('bx2', 'vx2', 'vx3'):
+        fields[var] = np.zeros_like(x)
+    if noise:
+        for arr in fields.values():
+            arr += noise * rng.standard_normal(x.size)
+    return fields
+
+
+def _write_snapshots(kind, out_dir, ncells, nsnapshots, variables, amp, noise, dtype, seed,
+                     interval=0.0):
+    if kind == 'sound':
+        all_vars, coord, fields = SOUND_VARIABLES, 'x1', _fields_sound
+    elif kind == 'alfven':
+        all_vars, coord, fields = ALFVEN_VARIABLES, 'x3', _fields_alfven
+    else:
+        raise ValueError(f"Tipo de datos desconocido: {kind}")
+    variables = list(all_vars if variables is None else variables)
+    unknown = sorted(set(variables) - set(all_vars))
+    if unknown:
+        raise ValueError(f"Variables desconocidas para '{kind}': {unknown}")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    x = _grid(ncells)
+    np.save(out_dir / f'{coord}.npy', x)
+
+    width = max(2, len(str(nsnapshots - 1)))
+    for t in range(nsnapshots):
+        if t and interval:
+            time.sleep(interval)
+        # Un periodo completo a lo largo de la simulación
+        tau = 2.0 * t / max(1, nsnapshots - 1)
+        snap = fields(x, tau, amp, rng, noise)
+        for var in variables:
+            _write(out_dir, var, t, snap[var], dtype, width)
+    return variables
+
+
+def make_dataset(kind, out_dir, ncells=100, nsnapshots=21, variables=None,
+                 amp=0.2, noise=0.0, dtype=np.float64, seed=0):
+    """
+    Escribe un conjunto de datos sintético.
+
+    Args:
+        kind: 'sound' (onda sonora, coordenada x1) o 'alfven' (onda de
+            Alfvén, coordenada x3)
+        out_dir: Directorio destino (se crea si no existe)
+        ncells: Número de celdas de la malla 1D
+        nsnapshots: Número de tiempos (0..nsnapshots-1)
+        variables: Variables a escribir (por defecto todas las del tipo)
+        amp: Amplitud de la perturbación
+        noise: Desviación estándar de un ruido gaussiano opcional
+        dtype: Tipo de dato de los archivos
+        seed: Semilla del ruido
+
+    Returns:
+        dict: Parámetros del conjunto generado (para el reporte del benchmark)
+    """
+    variables = _write_snapshots(kind, out_dir, ncells, nsnapshots, variables, amp, noise,
+                                 dtype, seed)
+    return {'kind': kind, 'ncells': ncells, 'nsnapshots': nsnapshots,
+            'variables': variables, 'dtype': np.dtype(dtype).name,
+            'bytes': ncells * nsnapshots * len(variables) * np.dtype(dtype).itemsize}
+
+
+def make_workspace(root, ncells=100, nsnapshots=21, sound_variables=None,
+                   alfven_variables=None, **kwargs):
+    """
+    Crea un árbol root/data/{soundwave-data,alfvenwave-data}.
+
+    Los scripts de solución reciben root/data/... como `data_dir` y
+    root/results/... como `results_dir` (ver add_tasks).
+
+    Returns:
+        dict: {'sound': parámetros, 'alfven': parámetros}
+    """
+    root = Path(root)
+    return {
+        'sound': make_dataset('sound', root / 'data' / SOUND_DIRNAME, ncells, nsnapshots,
+                              sound_variables, **kwargs),
+        'alfven': make_dataset('alfven', root / 'data' / ALFVEN_DIRNAME, ncells, nsnapshots,
+                               alfven_variables, **kwargs),
+    }
+
+
+def emulate_run(kind, out_dir, ncells=100, nsnapshots=21, interval=1.0, variables=None,
+                amp=0.2, noise=0.0, dtype=np.float64, seed=0):
+    """
+    Emula una simulación en curso: escribe los snapshots de make_dataset uno
+    por uno, con `interval` segundos entre tiempos consecutivos.
+
+    Los archivos se escriben en su lugar (no de forma atómica), como PLUTO,
+    así que un lector puede encontrar un snapshot a medio escribir.
+    """
+    _write_snapshots(kind, out_dir, ncells, nsnapshots, variables, amp, noise, dtype, seed,
+                     interval=interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emula una simulación PLUTO que escribe snapshots")
+    parser.add_argument('out_dir', type=Path, help="Directorio destino")
+    parser.add_argument('--kind', choices=('sound', 'alfven'), default='sound')
+    parser.add_argument('--cells', type=int, default=100)
+    parser.add_argument('--snapshots', type=int, default=21)
+    parser.add_argument('--interval', type=float, default=1.0, help="Segundos entre snapshots")
+    args = parser.parse_args()
+    emulate_run(args.kind, args.out_dir, args.cells, args.snapshots, args.interval)
+
+
+if __name__ == "__main__":
+    main()
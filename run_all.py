@@ -6,53 +6,67 @@ Este script ejecuta automáticamente ambas simulaciones de la tarea programada:
 - Problema 1: Análisis de ondas sonoras con condiciones de frontera reflectivas
 - Problema 2: Análisis de ondas de Alfvén en magnetohidrodinámica
 
-Simplemente ejecuta: python run_all.py
+Ambos problemas se ejecutan en el mismo proceso como un grafo de tareas: las
+etapas independientes (por ejemplo, animaciones de distintas variables o de
+distintos problemas) corren en paralelo dentro de un presupuesto de workers.
+
+Simplemente ejecuta: python run_all.py [--workers N]
 Y obtendrás todos los resultados organizados en results/
+
+Vista rápida (baja resolución, a lo sumo 100 fotogramas por animación, en
+results/preview/): python run_all.py --render preview
 """
-import subprocess
+import argparse
 import sys
 from pathlib import Path
 
-def run_script(script_name):
-    """Ejecuta un script de simulación y maneja cualquier error que pueda surgir"""
-    print(f"\n{'='*50}")
-    print(f"👀 Ejecutando {script_name}")
-    print(f"{'='*50}")
-    
-    try:
-        result = subprocess.run([sys.executable, script_name], 
-                              cwd='src', 
-                              check=True, 
-                              capture_output=False)
-        print(f"🤍 {script_name}, Listo!!")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error ejecutando {script_name}: {e}")
-        return False
-    except FileNotFoundError:
-        print(f"❌ No se encontró {script_name}")
-        return False
+ROOT = Path(__file__).resolve().parent
+SRC_DIR = ROOT / 'src'
 
 
 def main():
     """Ejecuta todas las simulaciones de la tarea programada"""
-    print("🚀 Iniciando simulaciones de Física Espacial - Tarea Programada I")
+    parser = argparse.ArgumentParser(description="Ejecuta ambos problemas de la tarea programada")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Presupuesto de workers (por defecto RENDER_WORKERS o número de CPUs)")
+    parser.add_argument('--profile', nargs='?', const='json', default=None, choices=('json', 'chrome'),
+                        help="Registrar tiempos, CPU, memoria y E/S por etapa en results/profile.json "
+                             "(con 'chrome' también results/profile.trace.json)")
+
+    # Los scripts resuelven data/ y results/ a partir de su propia ubicación,
+    # así que se puede ejecutar desde cualquier directorio
+    sys.path.insert(0, str(SRC_DIR))
+
+    from presets import add_arguments, profile_from_args
+    add_arguments(parser)
+    args = parser.parse_args()
+    profile = profile_from_args(args)
+
+    import profiling
+    if args.profile:
+        profiling.enable(args.profile)
+
+    import solucion_problema1
+    import solucion_problema2
+    from render import resolve_workers
+    from scheduler import TaskGraph
+
+    print(f"🚀 Iniciando simulaciones de Física Espacial - Tarea Programada I (perfil {profile.name})")
     print("👀 Verificando que los datos estén en data/...")
-    
-    scripts = [
-        'solucion_problema1.py',
-        'solucion_problema2.py'
-    ]
-    
-    success_count = 0
-    for script in scripts:
-        if run_script(script):
-            success_count += 1
-    
-    print(f"\n{'='*50}")
-    print(f"🤍 Resumen: {success_count}/{len(scripts)} simulaciones completadas")
-    print(f"👀 Resultados en results/")
-    print(f"{'='*50}")
+
+    workers = resolve_workers(args.workers)
+    # Cuatro animaciones pueden correr a la vez (una del problema 1, tres del 2)
+    render_workers = max(1, workers // 4)
+    graph = TaskGraph(workers)
+    ctx1 = solucion_problema1.add_tasks(graph, render_workers, profile=profile)
+    solucion_problema2.add_tasks(graph, render_workers, profile=profile)
+    ok = graph.run()
+    graph.report()
+    results_dir = ctx1.results_dir.parent
+    profiling.write_trace(results_dir)
+    print(f"👀 Resultados en {results_dir}/")
+    if not ok:
+        raise SystemExit(1)
 
 if __name__ == "__main__":
     main()
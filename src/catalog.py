@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+📇 Catálogo de snapshots de un directorio de datos
+
+Recorre el directorio una sola vez con os.scandir y arma el índice
+variable → {tiempo → archivo} de todos los `var_XX.npy`. Los nombres de
+variable no distinguen mayúsculas: `Bx1_00.npy` responde a 'bx1' y a 'Bx1'
+(los datos de la tarea traen `Bx1_XX.npy` y los scripts piden `bx1`).
+
+El índice se guarda en `.store/catalog.json` dentro del directorio de datos y
+se reutiliza mientras no cambie la fecha de modificación del directorio (que
+cambia al crear, borrar o renombrar archivos). El archivo auxiliar vive en
+un subdirectorio para que escribirlo no modifique esa misma fecha.
+"""
+import json
+import os
+import re
+from pathlib import Path
+
+from profiling import profiled
+
+CACHE_DIRNAME = '.store'
+CATALOG_NAME = 'catalog.json'
+CATALOG_VERSION = 1
+
+SNAPSHOT_RX = re.compile(r'^(?P<var>.+)_(?P<t>\d+)\.npy$')
+
+
+def canonical(var):
+    """Nombre de variable sin distinción de mayúsculas"""
+    return var.lower()
+
+
+class Catalog:
+    """
+    Índice de los snapshots de un directorio.
+
+    Atributos:
+        data_dir: Directorio de datos
+        files: {variable: {tiempo: nombre_archivo}}, con la variable escrita
+            como en el primer archivo encontrado (orden alfabético)
+        dir_mtime_ns: Fecha de modificación del directorio al recorrerlo
+    """
+
+    def __init__(self, data_dir, files, dir_mtime_ns):
+        self.data_dir = Path(data_dir)
+        self.files = files
+        self.dir_mtime_ns = dir_mtime_ns
+        self._names = {canonical(v): v for v in files}
+
+    @property
+    def variables(self):
+        """Variables encontradas, como aparecen en los archivos"""
+        return sorted(self.files)
+
+    def __len__(self):
+        return sum(len(per_var) for per_var in self.files.values())
+
+    def __contains__(self, var):
+        return canonical(var) in self._names
+
+    def resolve(self, var):
+        """Nombre de `var` tal como aparece en los archivos (None si no existe)"""
+        return self._names.get(canonical(var))
+
+    def times_for(self, var):
+        """Tiempos disponibles de `var`, ordenados"""
+        name = self.resolve(var)
+        return sorted(self.files[name]) if name is not None else []
+
+    def path(self, var, t):
+        """Ruta del snapshot de `var` en `t`"""
+        return self.data_dir / self.files[self.resolve(var)][t]
+
+    def paths(self):
+        """Rutas de todos los snapshots"""
+        return [self.data_dir / name for per_var in self.files.values() for name in per_var.values()]
+
+
+def scan(data_dir):
+    """
+    Recorre `data_dir` una sola vez y arma el catálogo (sin archivo auxiliar).
+
+    Raises:
+        ValueError: Si dos archivos dan el mismo snapshot con distinta capitalización
+    """
+    data_dir = Path(data_dir)
+    dir_mtime_ns = os.stat(data_dir).st_mtime_ns
+    found = []
+    with os.scandir(data_dir) as it:
+        for entry in it:
+            m = SNAPSHOT_RX.match(entry.name)
+            if m and entry.is_file():
+                found.append((m.group('var'), int(m.group('t')), entry.name))
+
+    files = {}
+    names = {}
+    for var, t, fname in sorted(found):
+        var = names.setdefault(canonical(var), var)
+        per_var = files.setdefault(var, {})
+        if t in per_var:
+            raise ValueError(f"{data_dir}: {per_var[t]} y {fname} son el mismo snapshot")
+        per_var[t] = fname
+    return Catalog(data_dir, files, dir_mtime_ns)
+
+
+def _load_sidecar(path, dir_mtime_ns):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != CATALOG_VERSION or data.get('dir_mtime_ns') != dir_mtime_ns:
+        return None
+    return {var: {int(t): name for t, name in per_var.items()} for var, per_var in data['files'].items()}
+
+
+@profiled()
+def open_catalog(data_dir, cache_dir=None, refresh=False):
+    """
+    Catálogo de `data_dir`, leído del archivo auxiliar si sigue vigente.
+
+    Args:
+        data_dir: Directorio con archivos `var_XX.npy`
+        cache_dir: Directorio del archivo auxiliar (por defecto `data_dir/.store`)
+        refresh: Ignorar el archivo auxiliar y volver a recorrer el directorio
+
+    Returns:
+        Catalog
+    """
+    data_dir = Path(data_dir)
+    cache_dir = Path(cache_dir) if cache_dir is not None else data_dir / CACHE_DIRNAME
+    sidecar = cache_dir / CATALOG_NAME
+    try:
+        # Antes de leer la fecha: crear el subdirectorio modifica la del directorio
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        sidecar = None  # directorio de solo lectura: sin archivo auxiliar
+
+    if sidecar is not None and not refresh:
+        dir_mtime_ns = os.stat(data_dir).st_mtime_ns
+        files = _load_sidecar(sidecar, dir_mtime_ns)
+        if files is not None:
+            return Catalog(data_dir, files, dir_mtime_ns)
+
+    catalog = scan(data_dir)
+    if sidecar is not None:
+        payload = {'version': CATALOG_VERSION, 'dir_mtime_ns': catalog.dir_mtime_ns,
+                   'files': {var: {str(t): name for t, name in per_var.items()}
+                             for var, per_var in catalog.files.items()}}
+        tmp = sidecar.with_suffix('.tmp')
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(payload, f)
+            os.replace(tmp, sidecar)
+        except OSError:
+            pass
+    return catalog
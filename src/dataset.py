@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+🗃️ Almacén de snapshots
+
+Empaqueta los archivos `var_XX.npy` de un directorio de datos PLUTO en un único
+cubo (tiempo, variable, celda) mapeado en memoria, acompañado de un índice JSON
+pequeño. Los scripts de solución obtienen vistas sin copia del cubo en lugar de
+abrir un archivo .npy por variable y por tiempo.
+
+Los snapshots pueden ser 1D, 2D o 3D: cada uno se guarda aplanado y
+GridAccess devuelve vistas con la forma de la malla (x1, x2, x3), de modo que
+un corte (una línea a y fija, un plano a z fijo) solo lee del disco las
+páginas que contienen esas celdas.
+
+El cubo vive en `data_dir/.store`; si el directorio de datos es de solo
+lectura, open_store lo arma en un directorio alternativo (los scripts pasan
+uno dentro de su directorio de resultados). El cubo se escribe en un archivo
+temporal que reemplaza al anterior de una vez y el índice se escribe al
+final, así que una ejecución interrumpida nunca deja un cubo a medias que
+parezca vigente.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from catalog import canonical, open_catalog
+from profiling import profiled
+
+STORE_DIRNAME = '.store'
+CUBE_NAME = 'cube.npy'
+INDEX_NAME = 'index.json'
+INDEX_VERSION = 4
+
+AXES = ('x1', 'x2', 'x3')
+
+
+def _source_state(catalog):
+    """{archivo: [tamaño, mtime_ns]} de los snapshots del catálogo"""
+    state = {}
+    for p in catalog.paths():
+        st = os.stat(p)
+        state[p.name] = [st.st_size, st.st_mtime_ns]
+    return state
+
+
+def _writable(path):
+    """Indica si se puede crear (o ya existe) `path` y escribir en él"""
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return False
+    return os.access(path, os.W_OK)
+
+
+def store_dir_for(data_dir, fallback_dir=None):
+    """
+    Directorio del cubo de `data_dir`.
+
+    Args:
+        data_dir: Directorio con archivos `var_XX.npy`
+        fallback_dir: Directorio a usar si `data_dir` es de solo lectura (el
+            cubo va en un subdirectorio propio de cada directorio de datos)
+
+    Returns:
+        Path: `data_dir/.store`, o el subdirectorio de `fallback_dir` si no se
+            puede escribir en `data_dir`
+    """
+    data_dir = Path(data_dir)
+    local = data_dir / STORE_DIRNAME
+    if fallback_dir is None or _writable(local):
+        return local
+    tag = hashlib.blake2b(str(data_dir.resolve()).encode(), digest_size=4).hexdigest()
+    return Path(fallback_dir) / f'{data_dir.name}-{tag}'
+
+
+def content_digest(arr):
+    """Huella corta del contenido de un array (independiente del archivo de origen)"""
+    return hashlib.blake2b(np.ascontiguousarray(arr).tobytes(), digest_size=16).hexdigest()
+
+
+@profiled()
+def pack_snapshots(data_dir, store_dir=None, catalog=None):
+    """
+    Empaqueta todos los snapshots de `data_dir` en un cubo mapeado en memoria.
+
+    Args:
+        data_dir: Directorio con archivos `var_XX.npy`
+        store_dir: Directorio destino del cubo (por defecto `data_dir/.store`)
+        catalog: Catálogo del directorio (por defecto catalog.open_catalog)
+
+    Returns:
+        Path: Ruta del índice JSON generado
+    """
+    data_dir = Path(data_dir)
+    store_dir = Path(store_dir) if store_dir is not None else data_dir / STORE_DIRNAME
+    store_dir.mkdir(parents=True, exist_ok=True)
+
+    catalog = catalog if catalog is not None else open_catalog(data_dir, store_dir)
+    files = catalog.files
+    sources = _source_state(catalog)
+    if not files:
+        raise FileNotFoundError(f"No se encontraron archivos var_XX.npy en {data_dir}")
+
+    variables = sorted(files)
+    times = sorted({t for per_var in files.values() for t in per_var})
+    t_index = {t: i for i, t in enumerate(times)}
+
+    # El primer archivo define el tamaño de celda y el tipo de dato
+    first = np.load(data_dir / next(iter(files[variables[0]].values())), mmap_mode='r')
+    ncells = first.size
+    # Forma de la malla en orden (x1, x2, x3); las dimensiones ausentes valen 1
+    grid_shape = tuple(first.shape) + (1,) * (3 - first.ndim)
+    dtype = np.result_type(first.dtype, np.float32)
+
+    # Sin índice, el cubo viejo deja de estar vigente mientras se arma el nuevo
+    index_path = store_dir / INDEX_NAME
+    index_path.unlink(missing_ok=True)
+
+    # El cubo se arma en un temporal: quien tenga abierto el anterior sigue
+    # leyendo el archivo viejo, y una interrupción no deja un cubo truncado
+    cube_path = store_dir / CUBE_NAME
+    tmp_path = store_dir / f'{CUBE_NAME}.{os.getpid()}.tmp'
+    try:
+        cube = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype,
+                                         shape=(len(times), len(variables), ncells))
+        present = np.zeros((len(times), len(variables)), dtype=bool)
+        digests = [[None] * len(variables) for _ in times]
+        for iv, var in enumerate(variables):
+            for t, name in files[var].items():
+                arr = np.load(data_dir / name, mmap_mode='r')
+                if arr.size != ncells:
+                    raise ValueError(f"{name} tiene {arr.size} celdas, se esperaban {ncells}")
+                it = t_index[t]
+                cube[it, iv, :] = arr.reshape(-1)
+                present[it, iv] = True
+                digests[it][iv] = content_digest(arr)
+            # Huecos (variable ausente en algún tiempo) quedan como NaN
+            cube[~present[:, iv], iv, :] = np.nan
+        cube.flush()
+        del cube
+        os.replace(tmp_path, cube_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    index = {
+        'version': INDEX_VERSION,
+        'variables': variables,
+        'times': times,
+        'ncells': ncells,
+        'grid_shape': grid_shape,
+        'dtype': np.dtype(dtype).str,
+        'present': present.astype(int).tolist(),
+        'digests': digests,
+        'sources': sources,
+    }
+    tmp_index = index_path.with_suffix('.tmp')
+    with open(tmp_index, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_index, index_path)
+    return index_path
+
+
+def _grid_index(fixed):
+    """Índice (x1, x2, x3) para un corte: enteros en los ejes fijos, slices en el resto"""
+    unknown = set(fixed) - set(AXES)
+    if unknown:
+        raise KeyError(f"Ejes desconocidos: {sorted(unknown)}")
+    return tuple(fixed[a] if a in fixed else slice(None) for a in AXES)
+
+
+class GridAccess:
+    """
+    Acceso por malla a snapshots multidimensionales.
+
+    Requiere `snapshot(var, t)` (vista plana de una variable), `grid_shape`
+    (nx1, nx2, nx3), `coord(name)` y `_grid_order` ('C' si el snapshot plano
+    tiene x3 variando más rápido, 'F' si es x1, como en los binarios de PLUTO).
+    Todas las operaciones devuelven vistas: nada se lee hasta que se usan
+    los valores, y entonces solo las páginas de las celdas pedidas.
+    """
+
+    _grid_order = 'C'
+
+    @property
+    def ndim(self):
+        """Número de dimensiones con más de una celda"""
+        return sum(n > 1 for n in self.grid_shape)
+
+    @property
+    def axes(self):
+        """Ejes con más de una celda (ej: ('x1', 'x2') en una simulación 2D)"""
+        return tuple(a for a, n in zip(AXES, self.grid_shape) if n > 1)
+
+    def field(self, var, t):
+        """Vista (nx1, nx2, nx3) del snapshot de `var` en `t`"""
+        return self.snapshot(var, t).reshape(self.grid_shape, order=self._grid_order)
+
+    def cut(self, var, t, **fixed):
+        """
+        Corte de un snapshot con algunos ejes fijos, sin copia.
+
+        Ejemplos:
+            store.cut('rho', 10, x2=64)          # plano (x1, x3) o línea en 2D
+            store.cut('rho', 10, x2=64, x3=0)    # línea a lo largo de x1
+
+        Args:
+            var, t: Variable y tiempo
+            **fixed: Índice de celda de cada eje fijo (ver index_of)
+
+        Returns:
+            ndarray: Vista con los ejes libres de más de una celda, en orden x1, x2, x3
+        """
+        view = self.field(var, t)[_grid_index(fixed)]
+        free = [a for a in AXES if a not in fixed]
+        # Quitar los ejes degenerados (una sola celda) que quedaron libres
+        keep = tuple(n for a, n in zip(free, view.shape) if n > 1)
+        return view.reshape(keep) if keep != view.shape else view
+
+    def cut_axes(self, **fixed):
+        """Ejes que quedan en un corte (ver cut)"""
+        return tuple(a for a, n in zip(AXES, self.grid_shape) if a not in fixed and n > 1)
+
+    def index_of(self, name, value):
+        """Índice de la celda de `name` cuyo centro está más cerca de `value`"""
+        return int(np.abs(np.asarray(self.coord(name)) - value).argmin())
+
+
+class SnapshotStore(GridAccess):
+    """
+    Vista de solo lectura sobre un cubo (tiempo, variable, celda) empaquetado.
+
+    Los nombres de variable no distinguen mayúsculas ('bx1' encuentra Bx1).
+
+    Args:
+        data_dir: Directorio de datos original (se usa para las coordenadas)
+        store_dir: Directorio del cubo (por defecto `data_dir/.store`)
+    """
+
+    def __init__(self, data_dir, store_dir=None):
+        self.data_dir = Path(data_dir)
+        self.store_dir = Path(store_dir) if store_dir is not None else self.data_dir / STORE_DIRNAME
+        with open(self.store_dir / INDEX_NAME) as f:
+            self.index = json.load(f)
+        self.variables = list(self.index['variables'])
+        self.times = list(self.index['times'])
+        self.present = np.asarray(self.index['present'], dtype=bool).reshape(len(self.times), len(self.variables))
+        self.cube = np.load(self.store_dir / CUBE_NAME, mmap_mode='r')
+        self.grid_shape = tuple(self.index['grid_shape'])
+        self._var_index = {canonical(v): i for i, v in enumerate(self.variables)}
+        self._t_index = {t: i for i, t in enumerate(self.times)}
+        self._coords = {}
+        self._coord_digests = {}
+
+    def var_index(self, var):
+        """Posición de `var` en el eje de variables del cubo"""
+        return self._var_index[canonical(var)]
+
+    def __contains__(self, var):
+        return canonical(var) in self._var_index
+
+    def times_for(self, var):
+        """Tiempos en los que existe la variable `var`"""
+        if var not in self:
+            return []
+        col = self.present[:, self.var_index(var)]
+        return [t for t, ok in zip(self.times, col) if ok]
+
+    def has(self, var, t):
+        """Indica si existe el snapshot de `var` en el tiempo `t`"""
+        if var not in self or t not in self._t_index:
+            return False
+        return bool(self.present[self._t_index[t], self.var_index(var)])
+
+    def snapshot(self, var, t):
+        """Vista (sin copia) del snapshot de `var` en el tiempo `t`"""
+        return self.cube[self._t_index[t], self.var_index(var)]
+
+    def series(self, var, times=None):
+        """
+        Serie temporal (tiempo, celda) de una variable.
+
+        Sin `times`, o si `times` es un rango contiguo del cubo, devuelve una
+        vista sin copia; en otro caso usa indexado avanzado (implica copia).
+        """
+        iv = self.var_index(var)
+        if times is None:
+            return self.cube[:, iv, :]
+        idx = [self._t_index[t] for t in times]
+        if idx and idx == list(range(idx[0], idx[0] + len(idx))):
+            return self.cube[idx[0]:idx[0] + len(idx), iv, :]
+        return self.cube[idx, iv, :]
+
+    def coord(self, name):
+        """Coordenadas de celda (`x1`, `x2` o `x3`) leídas una sola vez"""
+        if name not in self._coords:
+            self._coords[name] = np.load(self.data_dir / f'{name}.npy')
+        return self._coords[name]
+
+    def digest(self, var, t):
+        """Huella del contenido del snapshot de `var` en `t` (calculada al empaquetar)"""
+        return self.index['digests'][self._t_index[t]][self.var_index(var)]
+
+    def coord_digest(self, name):
+        """Huella del contenido de las coordenadas `name`"""
+        if name not in self._coord_digests:
+            self._coord_digests[name] = content_digest(self.coord(name))
+        return self._coord_digests[name]
+
+
+def _store_is_fresh(catalog, store_dir):
+    index_path = store_dir / INDEX_NAME
+    if not index_path.exists() or not (store_dir / CUBE_NAME).exists():
+        return False
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if index.get('version') != INDEX_VERSION:
+        return False
+    # Cada archivo con el mismo tamaño y la misma fecha (en ns) que al empaquetar
+    return _source_state(catalog) == index['sources']
+
+
+def open_store(data_dir, store_dir=None, rebuild=False, fallback_dir=None):
+    """
+    Abre el almacén de un directorio de datos, empaquetándolo si hace falta.
+
+    El cubo se regenera si no existe o si algún archivo fuente apareció,
+    desapareció o cambió de tamaño o de fecha de modificación. Los archivos se
+    listan con el catálogo del directorio (catalog.py), que solo se recorre
+    de nuevo si cambió su fecha de modificación. Si el directorio es
+    una salida nativa de PLUTO (grid.out + dbl.out/flt.out) se abre
+    directamente con pluto.PlutoStore, sin empaquetar.
+
+    Args:
+        data_dir: Directorio con archivos `var_XX.npy`
+        store_dir: Directorio del cubo (por defecto ver store_dir_for)
+        rebuild: Forzar el reempaquetado
+        fallback_dir: Directorio para el cubo si `data_dir` es de solo lectura
+
+    Returns:
+        SnapshotStore o PlutoStore
+    """
+    from pluto import PlutoStore, is_pluto_dir
+
+    data_dir = Path(data_dir)
+    if is_pluto_dir(data_dir):
+        return PlutoStore(data_dir)
+    sdir = Path(store_dir) if store_dir is not None else store_dir_for(data_dir, fallback_dir)
+    catalog = open_catalog(data_dir, sdir)
+    if rebuild or not _store_is_fresh(catalog, sdir):
+        print(f"✨ Empaquetando snapshots de {data_dir} en {sdir}...")
+        pack_snapshots(data_dir, sdir, catalog)
+    return SnapshotStore(data_dir, sdir)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+📉 Decimación de líneas para graficar mallas grandes
+
+Una línea no puede mostrar más detalle que el número de columnas de píxeles
+del eje, así que antes de pasar los datos a matplotlib se reducen a un
+mínimo y un máximo por columna de píxeles (en el orden en que aparecen). Así
+se conservan los picos y las discontinuidades, y el costo de dibujar un
+fotograma depende del ancho de la imagen y no del número de celdas.
+
+Con pocas celdas (menos de dos por píxel) los datos pasan sin cambios.
+"""
+import math
+
+import numpy as np
+
+# Puntos por columna de píxeles (mínimo y máximo)
+POINTS_PER_PIXEL = 2
+
+
+def minmax_indices(y, nbins):
+    """
+    Índices del mínimo y del máximo de `y` en `nbins` bloques contiguos.
+
+    Los dos índices de cada bloque salen en el orden en que aparecen, y se
+    agregan el primer y el último punto para conservar el rango del eje.
+    No copia `y` (sirve con vistas de un memmap).
+
+    Args:
+        y: Valores (1D)
+        nbins: Número de bloques (≈ columnas de píxeles)
+
+    Returns:
+        ndarray: Índices crecientes (a lo sumo 2·nbins + 2)
+    """
+    n = len(y)
+    size = max(1, math.ceil(n / max(1, nbins)))
+    full = n // size
+    blocks = np.asarray(y)[:full * size].reshape(full, size)
+    offsets = np.arange(full) * size
+    lo = blocks.argmin(axis=1) + offsets
+    hi = blocks.argmax(axis=1) + offsets
+    parts = [[0], np.minimum(lo, hi), np.maximum(lo, hi)]
+    if full * size < n:
+        tail = np.asarray(y)[full * size:]
+        parts += [[full * size + int(tail.argmin()), full * size + int(tail.argmax())]]
+    parts.append([n - 1])
+    return np.unique(np.concatenate(parts))
+
+
+def decimate(x, y, width_px, points_per_pixel=POINTS_PER_PIXEL):
+    """
+    Reduce una línea al detalle que cabe en `width_px` columnas de píxeles.
+
+    Args:
+        x, y: Coordenadas y valores (1D, x monótona)
+        width_px: Ancho del eje en píxeles
+
+    Returns:
+        tuple: (x, y) decimados, o los originales si ya son pocos puntos
+    """
+    width_px = max(1, int(math.ceil(width_px)))
+    if len(y) <= points_per_pixel * width_px:
+        return x, y
+    idx = minmax_indices(y, width_px)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def figure_width_px(ax, dpi=None):
+    """
+    Cota superior del ancho en píxeles del área de datos de `ax`.
+
+    Se usa el ancho de la figura: el layout (tight_layout) se calcula después
+    de graficar y el eje nunca es más ancho que la figura.
+
+    Args:
+        ax: Ejes de matplotlib
+        dpi: Resolución de salida (por defecto la de la figura; usar el dpi
+            de savefig si es distinto)
+    """
+    fig = ax.figure
+    return fig.get_figwidth() * (fig.dpi if dpi is None else dpi)
+
+
+def plot_line(ax, x, y, dpi=None, **kwargs):
+    """ax.plot(x, y, **kwargs) con la línea decimada al ancho de la figura"""
+    return ax.plot(*decimate(x, y, figure_width_px(ax, dpi)), **kwargs)
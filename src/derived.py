@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+🧪 Magnitudes derivadas con memoización
+
+Registro de magnitudes que se calculan a partir de las variables de PLUTO:
+presión, presión magnética, |B|, energías cinética e interna, velocidad de
+Alfvén local y números de Mach sónico y Alfvénico. Cada magnitud se evalúa
+de forma perezosa y vectorizada sobre todo el eje temporal (un array
+(tiempo, celda) de una vez, no snapshot por snapshot).
+
+Los resultados quedan en una caché LRU acotada en bytes, compartida por todo
+el proceso y con clave (corrida, magnitud, parámetros, rango de tiempos):
+las gráficas, los resúmenes y el barrido piden la misma magnitud sin volver
+a calcularla. Cada entrada guarda además la huella de los snapshots de los
+que salió, así que si los datos cambian se recalcula.
+
+El tamaño de la caché se fija con la variable de entorno DERIVED_CACHE_MB
+(por defecto 512; 0 la desactiva).
+
+Uso:
+    q = Derived(store, cs=1.0)
+    times, P = q.get('pressure')           # (tiempo, celda)
+    M = q.stats('mach_alfven').absmax      # SeriesStats, como compute_stats
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from profiling import profiled
+
+CACHE_ENV = 'DERIVED_CACHE_MB'
+DEFAULT_CACHE_MB = 512
+
+VELOCITY = ('vx1', 'vx2', 'vx3')
+MAGNETIC = ('bx1', 'bx2', 'bx3')
+
+
+class Quantity:
+    """
+    Magnitud registrada.
+
+    Atributos:
+        name: Nombre con el que se pide (ej: 'pressure')
+        requires: Variables del almacén o magnitudes de las que depende
+        func: func(*arrays, params) → array (tiempo, celda)
+        components: Si es True, `requires` son componentes de un vector: se
+            usan las que existan en el almacén (al menos una)
+        description: Descripción corta (con unidades de PLUTO)
+    """
+
+    def __init__(self, name, requires, func, components=False, description=''):
+        self.name = name
+        self.requires = tuple(requires)
+        self.func = func
+        self.components = components
+        self.description = description
+
+
+QUANTITIES = {}
+
+
+def quantity(name, *requires, components=False, description=''):
+    """Decorador: registra una magnitud derivada en QUANTITIES"""
+    def decorate(func):
+        QUANTITIES[name] = Quantity(name, requires, func, components, description)
+        return func
+    return decorate
+
+
+def _sum_of_squares(*arrays, params):
+    total = np.square(arrays[0])
+    for a in arrays[1:]:
+        total += np.square(a)
+    return total
+
+
+QUANTITIES['v2'] = Quantity('v2', VELOCITY, _sum_of_squares, components=True,
+                            description="|v|² (componentes presentes)")
+QUANTITIES['b2'] = Quantity('b2', MAGNETIC, _sum_of_squares, components=True,
+                            description="|B|² (componentes presentes)")
+
+
+@quantity('pressure', 'rho', description="Presión isoterma P = c_s² ρ")
+def _pressure(rho, params):
+    return params['cs']**2 * rho
+
+
+@quantity('magnetic_pressure', 'b2', description="Presión magnética B²/2")
+def _magnetic_pressure(b2, params):
+    return 0.5 * b2
+
+
+@quantity('bmag', 'b2', description="|B|")
+def _bmag(b2, params):
+    return np.sqrt(b2)
+
+
+@quantity('internal_energy', 'rho',
+          description="Energía interna isoterma c_s² (ρ ln ρ − ρ + 1) (≥ 0, nula en ρ = 1)")
+def _internal_energy(rho, params):
+    # Potencial de P = c_s² ρ; el término −ρ + 1 solo suma una constante a
+    # la integral (la masa se conserva) y lo anula en el fondo
+    return params['cs']**2 * (rho * np.log(rho) - rho + 1)
+
+
+@quantity('kinetic_energy', 'rho', 'v2', description="Densidad de energía cinética ρ|v|²/2")
+def _kinetic_energy(rho, v2, params):
+    return 0.5 * rho * v2
+
+
+@quantity('v_alfven', 'bmag', 'rho', description="Velocidad de Alfvén local |B|/√ρ")
+def _v_alfven(bmag, rho, params):
+    # Factor 1/sqrt(4π) absorbido en unidades de PLUTO
+    return bmag / np.sqrt(rho)
+
+
+@quantity('mach_sound', 'v2', description="Mach sónico local |v|/c_s")
+def _mach_sound(v2, params):
+    return np.sqrt(v2) / params['cs']
+
+
+@quantity('mach_alfven', 'v2', 'v_alfven', description="Mach Alfvénico local |v|/v_A")
+def _mach_alfven(v2, v_alfven, params):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.sqrt(v2) / v_alfven
+
+
+class LRUCache:
+    """
+    Caché LRU de arrays acotada por la suma de sus tamaños en bytes.
+
+    Las entradas más grandes que el límite no se guardan. Segura entre hilos
+    (las etapas del grafo de tareas corren en hilos).
+
+    Args:
+        max_bytes: Límite (0 = no guarda nada)
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, fingerprint=None):
+        """Valor de `key` si existe y su huella coincide (o None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != fingerprint:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value, fingerprint=None):
+        size = value.nbytes
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1].nbytes
+            if size > self.max_bytes:
+                self._key_locks.pop(key, None)
+                return
+            self._entries[key] = (fingerprint, value)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                evicted_key, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                # Sin la entrada, su candado solo ocuparía memoria (a lo sumo,
+                # un hilo que ya esperaba lo recalcula otra vez)
+                self._key_locks.pop(evicted_key, None)
+
+    def key_lock(self, key):
+        """Candado por clave: dos hilos que piden lo mismo lo calculan una vez"""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+            self.nbytes = 0
+
+
+def _cache_bytes():
+    env = os.environ.get(CACHE_ENV)
+    return int(float(env) * 1024 * 1024) if env else DEFAULT_CACHE_MB * 1024 * 1024
+
+
+# Caché compartida por todas las corridas del proceso
+CACHE = LRUCache(_cache_bytes())
+
+
+class Derived:
+    """
+    Magnitudes derivadas de un almacén (SnapshotStore o PlutoStore).
+
+    Args:
+        store: Almacén de snapshots
+        cs: Velocidad del sonido (presión isoterma y Mach sónico)
+        cache: LRUCache (por defecto la caché compartida CACHE)
+        run: Identificador de la corrida en la clave de la caché (por
+            defecto la ruta absoluta del directorio de datos)
+    """
+
+    def __init__(self, store, cs=1.0, cache=None, run=None):
+        self.store = store
+        self.params = {'cs': float(cs)}
+        self.cache = CACHE if cache is None else cache
+        self.run = run if run is not None else str(Path(store.data_dir).resolve())
+
+    def __contains__(self, name):
+        try:
+            self._leaves(name)
+        except KeyError:
+            return False
+        return True
+
+    def _inputs(self, name):
+        """Entradas de `name` que se usan con este almacén"""
+        q = QUANTITIES[name]
+        if not q.components:
+            return q.requires
+        present = tuple(v for v in q.requires if v in self.store)
+        if not present:
+            raise KeyError(f"{name}: no hay ninguna de {', '.join(q.requires)}")
+        return present
+
+    def _leaves(self, name):
+        """Variables del almacén de las que depende `name`"""
+        if name not in QUANTITIES:
+            if name not in self.store:
+                raise KeyError(f"Variable o magnitud desconocida: {name}")
+            return (name,)
+        leaves = []
+        for dep in self._inputs(name):
+            leaves += [v for v in self._leaves(dep) if v not in leaves]
+        return tuple(leaves)
+
+    def times(self, name, t0=None, t1=None):
+        """Tiempos en los que existen todas las entradas de `name`, dentro de [t0, t1]"""
+        common = None
+        for var in self._leaves(name):
+            ts = set(self.store.times_for(var))
+            common = ts if common is None else common & ts
+        return [t for t in sorted(common or ())
+                if (t0 is None or t >= t0) and (t1 is None or t <= t1)]
+
+    def _fingerprint(self, name, times):
+        h = hashlib.blake2b(digest_size=16)
+        for var in self._leaves(name):
+            for t in times:
+                h.update(str(self.store.digest(var, t)).encode())
+        return h.hexdigest()
+
+    def series(self, name, times):
+        """
+        Magnitud `name` exactamente en `times` (array (tiempo, celda)).
+
+        Sirve para alinear varias magnitudes en los mismos tiempos; todas
+        sus entradas deben existir en cada uno.
+        """
+        return self._evaluate(name, list(times))
+
+    def _evaluate(self, name, times):
+        if name not in QUANTITIES:
+            return self.store.series(name, times)
+        key = (self.run, name, tuple(sorted(self.params.items())), tuple(times))
+        fingerprint = self._fingerprint(name, times)
+        with self.cache.key_lock(key):
+            value = self.cache.get(key, fingerprint)
+            if value is None:
+                value = self._compute(name, times)
+                self.cache.put(key, value, fingerprint)
+        return value
+
+    @profiled('derivadas')
+    def _compute(self, name, times):
+        q = QUANTITIES[name]
+        arrays = [self._evaluate(dep, times) for dep in self._inputs(name)]
+        value = np.asarray(q.func(*arrays, params=self.params))
+        # Compartido por todos los que lo pidan: de solo lectura
+        value.flags.writeable = False
+        return value
+
+    def get(self, name, t0=None, t1=None):
+        """
+        Magnitud `name` en todos los tiempos de [t0, t1].
+
+        Args:
+            name: Magnitud de QUANTITIES (o variable del almacén)
+            t0, t1: Rango de tiempos (por defecto todos)
+
+        Returns:
+            tuple: (tiempos, array (tiempo, celda) de solo lectura)
+
+        Raises:
+            KeyError: Si falta alguna variable de la que depende
+        """
+        times = self.times(name, t0, t1)
+        return times, self._evaluate(name, times)
+
+    def at(self, name, t):
+        """Snapshot de `name` en `t`, tomado de la serie completa (memoizada)"""
+        times, values = self.get(name)
+        return values[times.index(t)]
+
+    def stats(self, name, t0=None, t1=None):
+        """SeriesStats de `name` (mínimo, máximo, promedio... por tiempo)"""
+        from stats import reduce_series
+
+        times, values = self.get(name, t0, t1)
+        return reduce_series(values, times)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+🩺 Diagnósticos de conservación y consistencia
+
+Para cada snapshot, en una sola pasada vectorizada sobre el eje temporal
+(las densidades salen de derived.py), calcula las integrales de volumen de:
+
+- masa Σ ρ dV y momento Σ ρ v dV (por componente)
+- energías cinética ρ|v|²/2, magnética B²/2, interna isoterma
+  c_s² (ρ ln ρ − ρ + 1) y total
+- max |By| y max |vy| (deberían ser ≈ 0 en los problemas 1D de la tarea)
+
+y la deriva relativa de masa y energía respecto del primer snapshot. Los
+umbrales de THRESHOLDS marcan las violaciones, de modo que muchas corridas
+se pueden validar sin mirar las figuras.
+
+El momento no se compara con t=0: con paredes reflectivas no se conserva
+(las paredes ejercen fuerza sobre el gas).
+"""
+import numpy as np
+
+from profiling import profiled
+
+# Columnas de la tabla por snapshot, en orden
+COLUMNS = ('t', 'masa', 'px', 'py', 'pz', 'cinetica', 'magnetica', 'interna', 'energia',
+           'by_max', 'vy_max', 'deriva_masa', 'deriva_energia')
+
+# Límites por defecto: derivas relativas y máximos absolutos (u. de PLUTO)
+THRESHOLDS = {
+    'deriva_masa': 1e-6,
+    'deriva_energia': 1e-2,
+    'by_max': 1e-3,
+    'vy_max': 1e-3,
+}
+
+_MOMENTUM = (('px', 'vx1'), ('py', 'vx2'), ('pz', 'vx3'))
+
+
+def cell_volumes(store, coord=None):
+    """
+    Volumen de cada celda (longitud en 1D, área en 2D), aplanado como los snapshots.
+
+    Los anchos salen de los centros de celda (np.gradient), exactos en mallas
+    uniformes.
+
+    Args:
+        store: Almacén de snapshots
+        coord: Coordenada de una simulación 1D (ej: 'x3' si la malla se guardó
+            como (nx, 1, 1) pero la coordenada es z); por defecto los ejes
+            con más de una celda
+
+    Returns:
+        ndarray: dV por celda (mismo largo que un snapshot)
+    """
+    ncells = int(np.prod(store.grid_shape))
+    if coord is not None:
+        widths = np.gradient(np.asarray(store.coord(coord), dtype=np.float64))
+        if widths.size != ncells:
+            raise ValueError(f"{coord} tiene {widths.size} celdas y los snapshots {ncells}")
+        return widths
+    dv = np.ones(store.grid_shape)
+    for axis, (name, n) in enumerate(zip(('x1', 'x2', 'x3'), store.grid_shape)):
+        if n > 1:
+            shape = [1, 1, 1]
+            shape[axis] = n
+            dv = dv * np.gradient(np.asarray(store.coord(name), dtype=np.float64)).reshape(shape)
+    return dv.reshape(-1, order=store._grid_order)
+
+
+def _available(store, var, times):
+    return var in store and set(times) <= set(store.times_for(var))
+
+
+def _drift(values):
+    ref = values[0]
+    scale = abs(ref) if ref != 0 else 1.0
+    return (values - ref) / scale
+
+
+class Diagnostics:
+    """
+    Integrales por snapshot de una corrida.
+
+    Atributos:
+        columns: {nombre de COLUMNS: array por snapshot}; las magnitudes sin
+            datos (ej: energía magnética sin B) quedan en NaN
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @property
+    def times(self):
+        return self.columns['t']
+
+    def table(self):
+        """Filas con las columnas de COLUMNS por snapshot"""
+        return np.column_stack([self.columns[c] for c in COLUMNS])
+
+    def write_csv(self, path):
+        """Escribe la tabla por snapshot como CSV (NaN = sin datos)"""
+        np.savetxt(path, self.table(), delimiter=',', fmt='%.8g',
+                   header=','.join(COLUMNS), comments='')
+
+    def worst(self, name):
+        """(tiempo, valor) del máximo de |columna| (None si no hay datos)"""
+        values = np.abs(self.columns[name])
+        if not np.isfinite(values).any():
+            return None
+        i = int(np.nanargmax(values))
+        return self.times[i], float(values[i])
+
+    def violations(self, thresholds=None):
+        """
+        Columnas que superan su umbral.
+
+        Args:
+            thresholds: {columna: límite} (por defecto THRESHOLDS)
+
+        Returns:
+            list: (columna, tiempo del peor valor, |valor|, límite)
+        """
+        found = []
+        for name, limit in (THRESHOLDS if thresholds is None else thresholds).items():
+            worst = self.worst(name)
+            if worst is not None and worst[1] > limit:
+                found.append((name, worst[0], worst[1], limit))
+        return found
+
+    def summary_lines(self, thresholds=None):
+        """Líneas de texto para el resumen"""
+        c = self.columns
+        lines = [f" - Snapshots: {len(self.times)} (t = {self.times[0]:g} a {self.times[-1]:g})",
+                 f" - Masa inicial = {c['masa'][0]:.6g}; energía inicial = {c['energia'][0]:.6g}"]
+        for name, label in (('deriva_masa', "Deriva relativa máxima de masa"),
+                            ('deriva_energia', "Deriva relativa máxima de energía"),
+                            ('by_max', "max |By|"), ('vy_max', "max |vy|")):
+            worst = self.worst(name)
+            if worst is not None:
+                lines.append(f" - {label} = {worst[1]:.3g} (t = {worst[0]:g})")
+        violations = self.violations(thresholds)
+        for name, t, value, limit in violations:
+            lines.append(f" - ⚠️ {name} = {value:.3g} supera el umbral {limit:g} (t = {t:g})")
+        if not violations:
+            lines.append(" - Sin violaciones de los umbrales")
+        return lines
+
+
+@profiled()
+def conservation(derived, coord=None):
+    """
+    Diagnósticos de conservación de todos los snapshots con ρ y v.
+
+    Args:
+        derived: derived.Derived del almacén (fija c_s y comparte la caché)
+        coord: Coordenada de una simulación 1D (ver cell_volumes)
+
+    Returns:
+        Diagnostics
+
+    Raises:
+        KeyError: Si faltan ρ o todas las componentes de v
+    """
+    store = derived.store
+    times = derived.times('kinetic_energy')
+    has_b = 'b2' in derived
+    if has_b:
+        times = sorted(set(times) & set(derived.times('b2')))
+    if not times:
+        raise KeyError("No hay snapshots con ρ y v en los mismos tiempos")
+    dv = cell_volumes(store, coord)
+    nan = np.full(len(times), np.nan)
+
+    def integral(name):
+        return derived.series(name, times) @ dv
+
+    rho = derived.series('rho', times)
+    cols = {'t': np.asarray(times, dtype=np.float64), 'masa': rho @ dv}
+    for col, var in _MOMENTUM:
+        cols[col] = (rho * derived.series(var, times)) @ dv if _available(store, var, times) else nan
+    cols['cinetica'] = integral('kinetic_energy')
+    cols['interna'] = integral('internal_energy')
+    cols['magnetica'] = integral('magnetic_pressure') if has_b else nan
+    cols['energia'] = cols['cinetica'] + cols['interna'] + (cols['magnetica'] if has_b else 0.0)
+    for col, var in (('by_max', 'bx2'), ('vy_max', 'vx2')):
+        cols[col] = (np.abs(derived.series(var, times)).max(axis=1)
+                     if _available(store, var, times) else nan)
+    cols['deriva_masa'] = _drift(cols['masa'])
+    cols['deriva_energia'] = _drift(cols['energia'])
+    return Diagnostics(cols)
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+🛰️ Modo seguimiento: animación en vivo de una simulación en curso
+
+Revisa cada cierto tiempo un directorio de salida (archivos `var_XX.npy` o
+salida nativa de PLUTO con dbl.out/flt.out) y, por cada snapshot nuevo:
+
+- dibuja solo ese fotograma con una figura persistente (LineAnimator) y lo
+  agrega al MP4 y al GIF abiertos, sin recodificar lo anterior. El MP4 se
+  escribe fragmentado: se puede abrir mientras la simulación sigue;
+- actualiza las estadísticas acumuladas (mínimo, máximo, promedio y máximo
+  absoluto por snapshot) agregando una fila a `<var>_follow.csv` y reescribe
+  el resumen `<var>_follow.txt`;
+- reemplaza `<var>_latest.png` con el último fotograma.
+
+Un snapshot que todavía se está escribiendo (no se puede leer completo) se
+vuelve a intentar en la siguiente revisión. El GIF queda válido al terminar:
+por inactividad (--idle), al llegar a --max-snapshots o con Ctrl+C.
+
+Sin rango fijo (--ylim), el eje vertical se amplía cuando los datos salen
+del rango actual; los fotogramas ya codificados conservan el anterior.
+
+Ejecutar:
+    python src/follow.py ruta/a/la/salida --var rho --coord x1 [--interval 2] [--idle 600]
+"""
+import argparse
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from catalog import scan
+from pluto import PlutoStore, is_pluto_dir
+from render import FRAME_DPI, LineAnimator, resolve_keep_frames
+from stats import fixed_ylim
+from utils import ensure_dir
+from video import FfmpegPipe, GifWriter
+
+RESULTS_DIR = Path(__file__).resolve().parent.parent / 'results' / 'follow'
+DEFAULT_INTERVAL = 2.0
+# Margen del eje vertical automático: amplio para no rehacer la figura seguido
+AUTO_PAD = 0.25
+
+STATS_COLUMNS = ('t', 'min', 'max', 'mean', 'absmax')
+
+
+class _NpySource:
+    """Snapshots `var_XX.npy` de un directorio (un recorrido con scandir por revisión)"""
+
+    def __init__(self, data_dir, var, coord):
+        self.data_dir = Path(data_dir)
+        self.var = var
+        self.coord_name = coord
+        self._catalog = None
+
+    def refresh(self):
+        self._catalog = scan(self.data_dir)
+
+    def times(self):
+        return self._catalog.times_for(self.var)
+
+    def coord(self):
+        return np.load(self.data_dir / f'{self.coord_name}.npy')
+
+    def load(self, t):
+        # Lectura completa (sin mmap): un archivo a medio escribir falla aquí
+        return np.load(self._catalog.path(self.var, t))
+
+
+class _PlutoSource:
+    """Salida nativa de PLUTO; dbl.out/flt.out se vuelve a leer si cambió"""
+
+    def __init__(self, data_dir, var, coord):
+        self.data_dir = Path(data_dir)
+        self.var = var
+        self.coord_name = coord
+        self.store = None
+        self._state = None
+
+    def refresh(self):
+        outlists = [p for p in (self.data_dir / 'dbl.out', self.data_dir / 'flt.out') if p.exists()]
+        state = tuple((p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in outlists)
+        if state != self._state:
+            self.store = PlutoStore(self.data_dir)
+            self._state = state
+
+    def times(self):
+        return self.store.times_for(self.var) if self.store is not None else []
+
+    def coord(self):
+        return self.store.coord(self.coord_name)
+
+    def load(self, t):
+        data = np.array(self.store.snapshot(self.var, t))
+        if data.size != self.store.ncells:
+            # Archivo a medio escribir: el memmap quedó corto. Se olvida para
+            # volver a abrirlo en la próxima revisión
+            self.store.forget(self.var, t)
+            raise ValueError(f"Snapshot incompleto de {self.var} en t = {t}: "
+                             f"{data.size} de {self.store.ncells} celdas")
+        return data
+
+
+class RunningStats:
+    """
+    Estadísticas acumuladas snapshot a snapshot.
+
+    Atributos:
+        rows: Filas (t, min, max, mean, absmax), una por snapshot
+        vmin, vmax: Extremos de todos los snapshots vistos
+    """
+
+    def __init__(self):
+        self.rows = []
+        self.vmin = np.inf
+        self.vmax = -np.inf
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, t, data):
+        """Agrega un snapshot y devuelve su fila"""
+        lo, hi = float(np.min(data)), float(np.max(data))
+        row = (t, lo, hi, float(np.mean(data, dtype=np.float64)), max(abs(lo), abs(hi)))
+        self.rows.append(row)
+        self.vmin = min(self.vmin, lo)
+        self.vmax = max(self.vmax, hi)
+        return row
+
+    def summary_lines(self, var):
+        """Líneas de texto para el resumen"""
+        if not self.rows:
+            return [f" - {var}: todavía no hay snapshots"]
+        t_peak, absmax = max(((r[0], r[4]) for r in self.rows), key=lambda p: p[1])
+        first, last = self.rows[0], self.rows[-1]
+        return [f" - Snapshots procesados: {len(self.rows)} (t = {first[0]} a {last[0]})",
+                f" - Rango de {var}: [{self.vmin:.6g}, {self.vmax:.6g}]",
+                f" - Máximo |{var}| = {absmax:.6g} (t = {t_peak})",
+                f" - Promedio de {var}: {first[3]:.6g} en t = {first[0]}, {last[3]:.6g} en t = {last[0]}"]
+
+
+class Follower:
+    """
+    Animación incremental de una variable de una simulación en curso.
+
+    Args:
+        data_dir: Directorio de salida de la simulación
+        var: Variable a animar (ej: 'rho', 'bx1')
+        coord: Coordenada del eje horizontal (ej: 'x1', 'x3')
+        output_dir: Directorio de resultados
+        ylim: Rango fijo del eje vertical (None = automático)
+        fps: Fotogramas por segundo del video
+        keep_frames: Guardar también los PNG de cada fotograma (None →
+            variable de entorno KEEP_FRAMES)
+        dpi: Resolución de los fotogramas
+    """
+
+    def __init__(self, data_dir, var, coord, output_dir=RESULTS_DIR, ylim=None, fps=10,
+                 keep_frames=None, dpi=FRAME_DPI):
+        self.data_dir = Path(data_dir)
+        self.var = var
+        self.coord = coord
+        self.output_dir = Path(output_dir)
+        self.fixed_ylim = ylim
+        self.fps = fps
+        self.dpi = dpi
+        self.keep_frames = resolve_keep_frames(keep_frames)
+        self.source = None
+        self.stats = RunningStats()
+        self.last_t = None
+        self._anim = None
+        self._ylim = None
+        self._sinks = None
+
+        ensure_dir(self.output_dir)
+        if self.keep_frames:
+            ensure_dir(self.frames_dir)
+        self.csv_path = self.output_dir / f'{var}_follow.csv'
+        self.summary_path = self.output_dir / f'{var}_follow.txt'
+        self.latest_path = self.output_dir / f'{var}_latest.png'
+        with open(self.csv_path, 'w') as f:
+            f.write(','.join(STATS_COLUMNS) + '\n')
+
+    @property
+    def frames_dir(self):
+        return self.output_dir / f'frames_{self.var}'
+
+    def _detect_source(self):
+        """Tipo de salida; PLUTO escribe grid.out y dbl.out recién con el primer snapshot"""
+        if is_pluto_dir(self.data_dir):
+            return _PlutoSource(self.data_dir, self.var, self.coord)
+        if (self.data_dir / f'{self.coord}.npy').exists():
+            return _NpySource(self.data_dir, self.var, self.coord)
+        return None
+
+    def _animator(self, title):
+        """Figura persistente; se rehace solo si los datos salen del rango del eje"""
+        if self.fixed_ylim is not None:
+            ylim = self.fixed_ylim
+        elif self._ylim is None or self.stats.vmin < self._ylim[0] or self.stats.vmax > self._ylim[1]:
+            ylim = fixed_ylim(self.stats.vmin, self.stats.vmax, pad_frac=AUTO_PAD)
+        else:
+            ylim = self._ylim
+        if self._anim is None or ylim != self._ylim:
+            if self._anim is not None:
+                self._anim.close()
+            self._anim = LineAnimator(self.source.coord(), self.coord, self.var, ylim,
+                                      title=title, dpi=self.dpi)
+            self._ylim = ylim
+        return self._anim
+
+    def _open_sinks(self, size):
+        base = self.output_dir / self.var
+        self._sinks = (FfmpegPipe(f'{base}.mp4', size, self.fps, live=True),
+                       GifWriter(f'{base}.gif', size, self.fps))
+
+    def poll(self):
+        """
+        Procesa los snapshots nuevos desde la última revisión.
+
+        Returns:
+            int: Número de fotogramas agregados
+        """
+        if self.source is None:
+            self.source = self._detect_source()
+            if self.source is None:
+                return 0
+        self.source.refresh()
+        new = [t for t in self.source.times() if self.last_t is None or t > self.last_t]
+        done = 0
+        rows = []
+        for t in new:
+            try:
+                data = self.source.load(t)
+            except (OSError, ValueError, EOFError):
+                break  # todavía se está escribiendo: se reintenta en la próxima revisión
+            rows.append(self.stats.add(t, data))
+            title = f"{self.var} — t = {t}"
+            anim = self._animator(title)
+            if self._sinks is None:
+                self._open_sinks(anim.size)
+            buf = anim.draw(data, title)
+            rgb = anim.to_rgb(buf)
+            for sink in self._sinks:
+                sink.write(rgb)
+            if self.keep_frames:
+                anim.write_png(buf, self.frames_dir / f'{t:02d}.png')
+            self.last_t = t
+            done += 1
+        if not done:
+            return 0
+
+        # Último fotograma (reemplazo atómico: nunca se ve un PNG a medias)
+        tmp = self.latest_path.with_suffix('.tmp.png')
+        self._anim.write_png(self._anim.canvas.buffer_rgba(), tmp)
+        os.replace(tmp, self.latest_path)
+        self._sinks[0].flush()
+        with open(self.csv_path, 'a') as f:
+            for row in rows:
+                f.write(','.join(f'{v:.8g}' if isinstance(v, float) else str(v) for v in row) + '\n')
+        self.write_summary()
+        return done
+
+    def write_summary(self):
+        lines = [f"Seguimiento de {self.data_dir} ({self.var})"] + self.stats.summary_lines(self.var)
+        with open(self.summary_path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        return lines
+
+    def close(self):
+        """Cierra el video y el GIF. Devuelve (mp4_ok, gif_ok)"""
+        if self._anim is not None:
+            self._anim.close()
+            self._anim = None
+        if self._sinks is None:
+            return False, False
+        mp4, gif = self._sinks
+        self._sinks = None
+        return mp4.close(), gif.close()
+
+
+def follow(data_dir, var, coord, output_dir=RESULTS_DIR, interval=DEFAULT_INTERVAL, idle=None,
+           max_snapshots=None, **kwargs):
+    """
+    Sigue una simulación en curso hasta que deje de producir snapshots.
+
+    Args:
+        data_dir, var, coord, output_dir: Ver Follower
+        interval: Segundos entre revisiones
+        idle: Terminar tras estos segundos sin snapshots nuevos (None = nunca)
+        max_snapshots: Terminar al llegar a este número de snapshots
+        **kwargs: Otros argumentos de Follower (ylim, fps, keep_frames, dpi)
+
+    Returns:
+        Follower: Ya cerrado; `stats` tiene las estadísticas acumuladas
+    """
+    follower = Follower(data_dir, var, coord, output_dir, **kwargs)
+    last_new = time.monotonic()
+    try:
+        while True:
+            added = follower.poll()
+            if added:
+                last_new = time.monotonic()
+                print(f"🛰️ {len(follower.stats)} snapshots (último t = {follower.last_t})")
+            if max_snapshots is not None and len(follower.stats) >= max_snapshots:
+                break
+            if idle is not None and time.monotonic() - last_new >= idle:
+                print(f"⏹️ Sin snapshots nuevos en {idle:g} s")
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("⏹️ Seguimiento interrumpido")
+    finally:
+        follower.mp4_ok, follower.gif_ok = follower.close()
+    return follower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Anima una simulación PLUTO mientras corre")
+    parser.add_argument('data_dir', type=Path, help="Directorio de salida (var_XX.npy o salida de PLUTO)")
+    parser.add_argument('--var', required=True, help="Variable a animar (ej: rho, bx1)")
+    parser.add_argument('--coord', default='x1', help="Coordenada del eje horizontal (x1, x2 o x3)")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help="Segundos entre revisiones")
+    parser.add_argument('--idle', type=float, default=None,
+                        help="Terminar tras estos segundos sin snapshots nuevos")
+    parser.add_argument('--max-snapshots', type=int, default=None, help="Terminar al llegar a N snapshots")
+    parser.add_argument('--ylim', type=float, nargs=2, default=None, help="Rango fijo del eje vertical")
+    parser.add_argument('--fps', type=int, default=10, help="Fotogramas por segundo del video")
+    parser.add_argument('--output', type=Path, default=RESULTS_DIR, help="Directorio de salida")
+    args = parser.parse_args()
+
+    if not args.data_dir.is_dir():
+        raise SystemExit(f"❌ {args.data_dir} no es un directorio.")
+    print(f"🛰️ Siguiendo {args.var} en {args.data_dir} cada {args.interval:g} s (Ctrl+C para terminar)")
+    follower = follow(args.data_dir, args.var, args.coord, args.output, args.interval, args.idle,
+                      args.max_snapshots, ylim=tuple(args.ylim) if args.ylim else None, fps=args.fps)
+    print("🔥 Resumen: \n" + "\n".join(follower.write_summary()[1:]))
+    base = args.output / args.var
+    if follower.mp4_ok:
+        print(f"🔥 Video: {base}.mp4")
+    if follower.gif_ok:
+        print(f"🔥 GIF: {base}.gif")
+
+
+if __name__ == "__main__":
+    main()
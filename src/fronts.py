@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+📡 Seguimiento de frentes de onda y reflexiones en las paredes
+
+Convierte la pregunta "¿qué pasa en las paredes?" en números: a partir de
+todos los snapshots de una variable 1D (tiempo, celda) calcula, en pasadas
+vectorizadas sobre el array completo,
+
+- la posición del pico de la perturbación y de los frentes izquierdo y
+  derecho (celdas extremas donde la perturbación supera una fracción de su
+  máximo, con interpolación lineal en el cruce),
+- la velocidad de propagación a partir de la correlación cruzada (por FFT)
+  entre snapshots consecutivos, por separado en cada mitad del dominio: el
+  signo del desplazamiento indica hacia dónde viaja la onda y cambia al
+  reflejarse en la pared (solo se usan los pares en que un snapshot es una
+  copia desplazada del anterior; mientras la onda incidente y la reflejada
+  se superponen la correlación pierde coherencia), y
+- los tiempos de reflexión en cada pared: máximos locales de la
+  perturbación en la celda de borde (donde la onda incidente y la reflejada
+  se superponen), refinados con una parábola entre snapshots.
+
+La perturbación se mide respecto del estado de fondo, por defecto la mediana
+del primer snapshot.
+"""
+import numpy as np
+
+from profiling import profiled
+from spectral import time_axis
+
+# Fracción del máximo de la perturbación que define un frente
+THRESHOLD = 0.5
+# Energía mínima (fracción de la máxima) para usar una mitad en la correlación
+MIN_ENERGY = 1e-3
+# Correlación normalizada mínima para considerar que la onda solo se desplazó
+COHERENCE = 0.98
+WALLS = ('izquierda', 'derecha')
+
+
+def perturbation(series, background=None):
+    """
+    Perturbación respecto del estado de fondo.
+
+    Args:
+        series: Array (tiempo, celda)
+        background: Valor de fondo (por defecto la mediana del primer snapshot)
+
+    Returns:
+        tuple: (perturbación, fondo)
+    """
+    series = np.asarray(series, dtype=np.float64)
+    if background is None:
+        background = float(np.median(series[0]))
+    return series - background, background
+
+
+def _parabolic_peak(values):
+    """Desplazamiento (entre -0.5 y 0.5) del vértice de la parábola por (-1, 0, 1) de la última dimensión"""
+    left, center, right = values[..., 0], values[..., 1], values[..., 2]
+    denom = left - 2 * center + right
+    safe = np.where(denom != 0, denom, 1.0)
+    return np.where(denom != 0, np.clip(0.5 * (left - right) / safe, -0.5, 0.5), 0.0)
+
+
+def front_positions(dev, x, threshold=THRESHOLD):
+    """
+    Pico y frentes de la perturbación en todos los snapshots a la vez.
+
+    Args:
+        dev: Perturbación (tiempo, celda)
+        x: Coordenadas de las celdas (uniformes)
+        threshold: Fracción del máximo de |perturbación| de cada snapshot
+
+    Returns:
+        dict: {'peak', 'left', 'right', 'amplitude'}, arrays por tiempo
+            (NaN en snapshots sin perturbación)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    mag = np.abs(dev)
+    nt, n = mag.shape
+    rows = np.arange(nt)
+    amplitude = mag.max(axis=1)
+    level = threshold * amplitude[:, None]
+    above = (mag > level) & (amplitude[:, None] > 0)
+    found = above.any(axis=1)
+
+    # Primera y última celda sobre el umbral
+    first = above.argmax(axis=1)
+    last = n - 1 - above[:, ::-1].argmax(axis=1)
+
+    # Cruce del umbral interpolado entre la celda exterior y la primera interior
+    def crossing(inner, outer):
+        a_in = mag[rows, inner]
+        a_out = mag[rows, outer]
+        span = np.where(a_in != a_out, a_in - a_out, 1.0)
+        frac = np.clip((level[:, 0] - a_out) / span, 0.0, 1.0)
+        pos = x[outer] + frac * (x[inner] - x[outer])
+        # En el borde del dominio el frente es la propia celda
+        return np.where(inner == outer, x[inner], pos)
+
+    left = crossing(first, np.maximum(first - 1, 0))
+    right = crossing(last, np.minimum(last + 1, n - 1))
+
+    # Pico con refinamiento parabólico
+    ipk = mag.argmax(axis=1)
+    window = np.stack([mag[rows, np.maximum(ipk - 1, 0)], mag[rows, ipk],
+                       mag[rows, np.minimum(ipk + 1, n - 1)]], axis=1)
+    interior = (ipk > 0) & (ipk < n - 1)
+    shift = np.where(interior, _parabolic_peak(window), 0.0)
+    peak = x[ipk] + shift * (x[1] - x[0])
+
+    nan = np.full(nt, np.nan)
+    return {
+        'peak': np.where(found, peak, nan),
+        'left': np.where(found, left, nan),
+        'right': np.where(found, right, nan),
+        'amplitude': amplitude,
+    }
+
+
+def correlation_shifts(frames):
+    """
+    Desplazamiento (en celdas) entre snapshots consecutivos por correlación cruzada.
+
+    Una sola FFT real (con relleno a 2n para que la correlación no sea
+    circular) para todos los pares y ventanas.
+
+    Args:
+        frames: Array (..., tiempo, celda)
+
+    Returns:
+        tuple: (desplazamientos (..., tiempo - 1), positivos hacia +x;
+            máximo de la correlación normalizada de cada par)
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    n = frames.shape[-1]
+    spec = np.fft.rfft(frames, n=2 * n, axis=-1)
+    corr = np.fft.irfft(np.conj(spec[..., :-1, :]) * spec[..., 1:, :], n=2 * n, axis=-1)
+    best = corr.argmax(axis=-1)
+    # Vecinos del máximo (la correlación es circular en 2n)
+    window = np.stack([np.take_along_axis(corr, ((best - 1) % (2 * n))[..., None], -1)[..., 0],
+                       np.take_along_axis(corr, best[..., None], -1)[..., 0],
+                       np.take_along_axis(corr, ((best + 1) % (2 * n))[..., None], -1)[..., 0]],
+                      axis=-1)
+    lag = np.where(best < n, best, best - 2 * n).astype(np.float64)
+    energy = (frames ** 2).sum(axis=-1)
+    norm = np.sqrt(energy[..., :-1] * energy[..., 1:])
+    coherence = window[..., 1] / np.where(norm > 0, norm, 1.0)
+    return lag + _parabolic_peak(window), coherence
+
+
+def correlation_speeds(dev, x, t, split=None):
+    """
+    Velocidad de la onda en cada mitad del dominio entre snapshots consecutivos.
+
+    Args:
+        dev: Perturbación (tiempo, celda)
+        x: Coordenadas (uniformes)
+        t: Tiempos
+        split: Coordenada que separa las mitades (por defecto el centroide
+            de la perturbación inicial)
+
+    Returns:
+        tuple: (velocidades (2, tiempo - 1) de la mitad izquierda y derecha,
+            NaN donde la mitad no tiene señal; coherencia de cada par;
+            coordenada de separación)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+    weight = np.abs(dev[0])
+    if split is None:
+        split = float((weight * x).sum() / weight.sum()) if weight.sum() > 0 else float(x.mean())
+    cut = int(np.searchsorted(x, split))
+    half = min(cut, len(x) - cut)
+    if half < 2:
+        raise ValueError("El punto de separación deja una mitad del dominio vacía")
+    # Las dos mitades con el mismo número de celdas para una sola FFT
+    halves = np.stack([dev[:, cut - half:cut], dev[:, cut:cut + half]])    # (2, T, n)
+    shifts, coherence = correlation_shifts(halves)
+    speeds = shifts * (x[1] - x[0]) / np.diff(t)
+
+    energy = (halves ** 2).sum(axis=2)
+    ok = energy > MIN_ENERGY * energy.max()
+    return np.where(ok[:, :-1] & ok[:, 1:], speeds, np.nan), coherence, split
+
+
+def wall_reflections(dev, t, threshold=THRESHOLD):
+    """
+    Tiempos de reflexión en las paredes.
+
+    Args:
+        dev: Perturbación (tiempo, celda)
+        t: Tiempos (uniformes)
+        threshold: Fracción del máximo global de |perturbación|
+
+    Returns:
+        dict: {'izquierda': {'arrival', 'reflections'}, 'derecha': ...}; 'arrival'
+            es el primer tiempo con la pared perturbada (None si nunca) y
+            'reflections' la lista de tiempos de máxima perturbación en la pared
+    """
+    t = np.asarray(t, dtype=np.float64)
+    mag = np.abs(dev)
+    level = threshold * mag.max()
+    walls = mag[:, [0, -1]].T                                   # (2, tiempo)
+    above = walls > level
+    # Máximos locales interiores por encima del umbral
+    peak = (walls[:, 1:-1] >= walls[:, :-2]) & (walls[:, 1:-1] > walls[:, 2:]) & above[:, 1:-1]
+    step = np.diff(t).mean() if len(t) > 1 else 0.0
+
+    result = {}
+    for w, name in enumerate(WALLS):
+        idx = np.nonzero(peak[w])[0] + 1
+        window = np.stack([walls[w, idx - 1], walls[w, idx], walls[w, idx + 1]], axis=1)
+        times = t[idx] + _parabolic_peak(window) * step
+        hits = np.nonzero(above[w])[0]
+        result[name] = {
+            'arrival': float(t[hits[0]]) if hits.size else None,
+            'reflections': [float(v) for v in times],
+        }
+    return result
+
+
+class WaveTrack:
+    """
+    Resultado del seguimiento de una variable.
+
+    Atributos:
+        var: Variable
+        t: Tiempos
+        background: Estado de fondo
+        peak, left, right, amplitude: Ver front_positions
+        speeds: Velocidades (2, tiempo - 1) de cada mitad (ver correlation_speeds)
+        coherence: Correlación normalizada de cada par (2, tiempo - 1)
+        split: Coordenada que separa las mitades
+        walls: Ver wall_reflections
+    """
+
+    def __init__(self, var, t, background, fronts, speeds, coherence, split, walls):
+        self.var = var
+        self.t = t
+        self.background = background
+        self.peak = fronts['peak']
+        self.left = fronts['left']
+        self.right = fronts['right']
+        self.amplitude = fronts['amplitude']
+        self.speeds = speeds
+        self.coherence = coherence
+        self.split = split
+        self.walls = walls
+
+    def propagating(self, coherence=COHERENCE):
+        """Máscara (2, tiempo - 1) de los pares en que la onda solo se desplazó"""
+        return np.isfinite(self.speeds) & (self.coherence >= coherence)
+
+    def speed(self, coherence=COHERENCE):
+        """Velocidad de propagación típica: mediana de |v| en los pares coherentes de ambas mitades"""
+        valid = np.abs(self.speeds[self.propagating(coherence)])
+        return float(np.median(valid)) if valid.size else float('nan')
+
+    def summary_lines(self):
+        """Líneas de texto para el resumen"""
+        lines = [f" - Variable: {self.var} (fondo = {self.background:.6g})",
+                 f" - Velocidad de propagación (correlación cruzada) ≈ {self.speed():.6g} u.l./u.t."]
+        for name in WALLS:
+            info = self.walls[name]
+            if info['arrival'] is None:
+                lines.append(f" - Pared {name}: la onda no llega en los snapshots disponibles")
+                continue
+            times = ", ".join(f"{v:.3g}" for v in info['reflections']) or "—"
+            lines.append(f" - Pared {name}: llegada en t = {info['arrival']:g}, "
+                         f"reflexión en t ≈ {times}")
+        # Inversión del sentido de propagación en cada mitad
+        mask = self.propagating()
+        for w, name in enumerate(WALLS):
+            sign = np.sign(self.speeds[w][mask[w]])
+            flips = int((np.diff(sign) != 0).sum()) if sign.size > 1 else 0
+            lines.append(f" - Mitad {name}: el sentido de propagación se invierte "
+                         f"{flips} {'vez' if flips == 1 else 'veces'}")
+        return lines
+
+    def table(self):
+        """Filas (t, pico, frente_izq, frente_der, amplitud, v_izq, v_der) por snapshot"""
+        nan = np.array([np.nan])
+        v_left = np.concatenate([nan, self.speeds[0]])
+        v_right = np.concatenate([nan, self.speeds[1]])
+        return np.column_stack([self.t, self.peak, self.left, self.right,
+                                self.amplitude, v_left, v_right])
+
+
+@profiled()
+def track_waves(store, var, coord, times=None, dt=None, threshold=THRESHOLD,
+                background=None, split=None):
+    """
+    Sigue los frentes de `var` y detecta las reflexiones en las paredes.
+
+    Args:
+        store: SnapshotStore o PlutoStore (1D)
+        var: Variable (ej: 'rho')
+        coord: Coordenada espacial ('x1')
+        times: Snapshots a usar (por defecto todos los de `var`)
+        dt: Intervalo entre snapshots (ver spectral.time_axis)
+        threshold: Fracción del máximo que define un frente
+        background: Estado de fondo (por defecto la mediana del primer snapshot)
+        split: Separación entre las mitades del dominio para la correlación
+
+    Returns:
+        WaveTrack
+    """
+    if store.ndim > 1:
+        raise ValueError("El seguimiento de frentes requiere datos 1D")
+    times = store.times_for(var) if times is None else times
+    if len(times) < 3:
+        raise ValueError(f"Se necesitan al menos tres snapshots de {var}")
+    x = store.coord(coord)
+    t = time_axis(store, times, dt)
+    dev, background = perturbation(store.series(var, times), background)
+    fronts = front_positions(dev, x, threshold)
+    speeds, coherence, split = correlation_speeds(dev, x, t, split)
+    walls = wall_reflections(dev, t, threshold)
+    return WaveTrack(var, t, background, fronts, speeds, coherence, split, walls)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+📒 Manifiesto de construcción incremental
+
+Registra, para cada artefacto generado (fotograma, video, GIF, figura o
+resumen), una huella de sus entradas (contenido de los snapshots) y de sus
+parámetros de renderizado. En la siguiente ejecución solo se regeneran los
+artefactos cuya huella cambió o cuyos archivos ya no existen.
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+MANIFEST_NAME = '.manifest.json'
+MANIFEST_VERSION = 1
+
+
+def build_key(inputs=(), params=None):
+    """
+    Huella de un artefacto a partir de sus entradas y parámetros.
+
+    Args:
+        inputs: Huellas de contenido de los datos de entrada
+        params: Parámetros de renderizado (serializables a JSON)
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    payload = json.dumps([list(inputs), params], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class BuildManifest:
+    """
+    Manifiesto de los artefactos de un directorio de resultados.
+
+    Args:
+        results_dir: Directorio de resultados (ej: '../results/problema1')
+    """
+
+    def __init__(self, results_dir):
+        self.results_dir = Path(results_dir)
+        self.path = self.results_dir / MANIFEST_NAME
+        self.entries = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self.entries = data.get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def name_for(self, path):
+        """Nombre de un artefacto: su ruta relativa al directorio de resultados"""
+        return os.path.relpath(path, self.results_dir)
+
+    def is_fresh(self, name, key):
+        """Indica si el artefacto `name` está al día y todas sus salidas existen"""
+        entry = self.entries.get(name)
+        if entry is None or entry['key'] != key:
+            return False
+        outputs = entry['outputs']
+        return bool(outputs) and all((self.results_dir / out).exists() for out in outputs)
+
+    def record(self, name, key, outputs):
+        """
+        Registra un artefacto recién generado.
+
+        Las salidas que el artefacto tenía antes y que ya no produce se borran.
+        """
+        outputs = [self.name_for(out) for out in outputs]
+        with self._lock:
+            previous = self.entries.get(name, {}).get('outputs', [])
+            for old in set(previous) - set(outputs):
+                stale = self.results_dir / old
+                if stale.is_file():
+                    stale.unlink()
+            self.entries[name] = {'key': key, 'outputs': outputs}
+
+    def forget(self, name):
+        """Olvida un artefacto (sin borrar sus archivos): se regenera en la próxima ejecución"""
+        with self._lock:
+            self.entries.pop(name, None)
+
+    def stale_key(self, path, inputs=(), params=None):
+        """
+        Huella de un archivo de salida si hay que regenerarlo, o None si está al día.
+
+        Uso típico:
+            key = build.stale_key(out, inputs, params)
+            if key:
+                ...generar out...
+                build.record_output(out, key)
+        """
+        key = build_key(inputs, params)
+        return None if self.is_fresh(self.name_for(path), key) else key
+
+    def record_output(self, path, key):
+        """Registra un archivo de salida generado por sí solo"""
+        self.record(self.name_for(path), key, [path])
+
+    def save(self):
+        """Guarda el manifiesto de forma atómica"""
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with self._lock:
+            with open(tmp, 'w') as f:
+                json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f)
+            os.replace(tmp, self.path)
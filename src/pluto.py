@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+🪐 Lector de salidas binarias nativas de PLUTO
+
+Abre directamente los archivos `data.XXXX.dbl` / `data.XXXX.flt` (o
+`var.XXXX.dbl` en modo multiple_files) que escribe PLUTO, sin convertirlos
+antes a un `var_XX.npy` por variable y por tiempo:
+
+- `dbl.out` / `flt.out`: una línea por salida con el número de archivo, el
+  tiempo físico, dt, el paso, el modo (single_file o multiple_files), el
+  orden de bytes y la lista de variables en el orden en que se escribieron.
+- `grid.out`: número de celdas y bordes de cada celda en x1, x2 y x3.
+
+Cada archivo se mapea en memoria; PlutoStore ofrece la misma interfaz que
+dataset.SnapshotStore, así que los scripts de solución pueden apuntar a un
+directorio de salida de PLUTO tal cual.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+from catalog import canonical
+from dataset import GridAccess, content_digest
+
+# Tipo de dato de cada formato binario de PLUTO
+FORMATS = {'dbl': 'f8', 'flt': 'f4'}
+GRID_NAME = 'grid.out'
+COORD_NAMES = ('x1', 'x2', 'x3')
+
+
+def is_pluto_dir(data_dir, fmt=None):
+    """Indica si `data_dir` contiene salidas nativas de PLUTO (grid.out + dbl.out/flt.out)"""
+    data_dir = Path(data_dir)
+    if not (data_dir / GRID_NAME).exists():
+        return False
+    fmts = FORMATS if fmt is None else (fmt,)
+    return any((data_dir / f'{f}.out').exists() for f in fmts)
+
+
+def read_grid(path):
+    """
+    Lee grid.out.
+
+    Acepta el formato de PLUTO 4 (`i  xL  xR`) y el antiguo
+    (`i  xL  xC  xR  dx`).
+
+    Returns:
+        dict: {'x1': (bordes_izq, bordes_der), 'x2': ..., 'x3': ...}
+    """
+    with open(path) as f:
+        lines = [L.split() for L in f if L.strip() and not L.lstrip().startswith('#')]
+    grid = {}
+    pos = 0
+    for name in COORD_NAMES:
+        if pos >= len(lines):
+            break
+        n = int(lines[pos][0])
+        rows = np.array([[float(v) for v in L] for L in lines[pos + 1:pos + 1 + n]])
+        if rows.ndim != 2 or len(rows) != n or rows.shape[1] not in (3, 5):
+            raise ValueError(f"{path}: bloque {name} con formato inesperado")
+        left, right = (rows[:, 1], rows[:, 2]) if rows.shape[1] == 3 else (rows[:, 1], rows[:, 3])
+        grid[name] = (left, right)
+        pos += 1 + n
+    # Dimensiones ausentes: una sola celda
+    for name in COORD_NAMES:
+        grid.setdefault(name, (np.zeros(1), np.zeros(1)))
+    return grid
+
+
+def read_outlist(path):
+    """
+    Lee dbl.out / flt.out.
+
+    Returns:
+        list: [{'nfile', 'time', 'dt', 'nstep', 'mode', 'endian', 'variables'}, ...]
+    """
+    entries = []
+    with open(path) as f:
+        for L in f:
+            parts = L.split()
+            if len(parts) < 7:
+                continue
+            entries.append({
+                'nfile': int(parts[0]),
+                'time': float(parts[1]),
+                'dt': float(parts[2]),
+                'nstep': int(parts[3]),
+                'mode': parts[4],
+                'endian': parts[5],
+                'variables': parts[6:],
+            })
+    return entries
+
+
+class _LazyCube:
+    """
+    Cubo (tiempo, variable, celda) armado bajo demanda a partir de memmaps.
+
+    `cube[i]` devuelve el bloque (variable, celda) de un tiempo (sin copia en
+    modo single_file); `cube[a:b]` y `cube[a:b, variables, celdas]` apilan
+    los tiempos pedidos en un array, leyendo solo las variables y celdas
+    indicadas.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self.shape = (len(store.times), len(store.variables), store.ncells)
+        self.dtype = store.dtype
+        self.nbytes = int(np.prod(self.shape)) * self.dtype.itemsize
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        rest = ()
+        if isinstance(key, tuple):
+            key, rest = key[0], key[1:]
+        if not isinstance(key, slice):
+            return self._store._block(key, *rest)
+        blocks = [self._store._block(i, *rest) for i in range(*key.indices(self.shape[0]))]
+        if not blocks:
+            return np.empty((0,) + self.shape[1:], self.dtype)
+        return np.stack(blocks)
+
+
+class PlutoStore(GridAccess):
+    """
+    Vista de solo lectura sobre las salidas binarias de una simulación PLUTO.
+
+    Los tiempos son los números de archivo (como los `XX` de `var_XX.npy`);
+    el tiempo físico de cada uno está en `sim_time`. Los nombres de variable
+    no distinguen mayúsculas ('bx1' encuentra Bx1).
+
+    Args:
+        data_dir: Directorio de salida de PLUTO (con grid.out y dbl.out/flt.out)
+        store_dir: Sin uso (compatibilidad con SnapshotStore)
+        fmt: 'dbl' o 'flt' (por defecto el que exista, prefiriendo dbl)
+    """
+
+    # PLUTO escribe cada variable con x1 variando más rápido
+    _grid_order = 'F'
+
+    def __init__(self, data_dir, store_dir=None, fmt=None):
+        self.data_dir = Path(data_dir)
+        self.store_dir = store_dir
+        if fmt is None:
+            fmt = next((f for f in FORMATS if (self.data_dir / f'{f}.out').exists()), None)
+        if fmt not in FORMATS:
+            raise FileNotFoundError(f"No se encontró dbl.out ni flt.out en {self.data_dir}")
+        self.fmt = fmt
+
+        grid = read_grid(self.data_dir / GRID_NAME)
+        self._edges = grid
+        self.grid_shape = tuple(len(grid[name][0]) for name in COORD_NAMES)  # (nx1, nx2, nx3)
+        self.ncells = int(np.prod(self.grid_shape))
+
+        entries = read_outlist(self.data_dir / f'{fmt}.out')
+        if not entries:
+            raise FileNotFoundError(f"{fmt}.out no lista ninguna salida en {self.data_dir}")
+        # Si una salida se repite (reinicio), vale la última
+        by_file = {e['nfile']: e for e in entries}
+        self.times = sorted(by_file)
+        self._entries = [by_file[t] for t in self.times]
+        self.sim_time = [e['time'] for e in self._entries]
+        variables = []
+        for e in self._entries:
+            variables += [v for v in e['variables'] if v not in variables]
+        self.variables = variables
+        endian = '>' if self._entries[0]['endian'] == 'big' else '<'
+        self.dtype = np.dtype(endian + FORMATS[fmt])
+
+        self._var_index = {canonical(v): i for i, v in enumerate(self.variables)}
+        self._t_index = {t: i for i, t in enumerate(self.times)}
+        self.present = np.zeros((len(self.times), len(self.variables)), dtype=bool)
+        for it, e in enumerate(self._entries):
+            for v in e['variables']:
+                self.present[it, self.var_index(v)] = self._path(e, v).exists()
+        self._maps = {}
+        self._coords = {}
+        self._coord_digests = {}
+        self._digests = {}
+        self.cube = _LazyCube(self)
+
+    # ---------- Archivos ----------
+
+    def _path(self, entry, var):
+        if entry['mode'] == 'single_file':
+            return self.data_dir / f"data.{entry['nfile']:04d}.{self.fmt}"
+        return self.data_dir / f"{var}.{entry['nfile']:04d}.{self.fmt}"
+
+    def _map(self, path):
+        """memmap de un archivo, abierto una sola vez"""
+        mm = self._maps.get(path)
+        if mm is None:
+            mm = self._maps[path] = np.memmap(path, dtype=self.dtype, mode='r')
+        return mm
+
+    def forget(self, var, t):
+        """
+        Olvida el memmap y la huella del archivo de `var` en `t`: la próxima
+        lectura lo vuelve a abrir (por ejemplo, si estaba a medio escribir).
+        """
+        path, _ = self._locate(var, t)
+        self._maps.pop(path, None)
+        self._digests.pop((canonical(var), t), None)
+
+    def _locate(self, var, t):
+        """(ruta, desplazamiento en celdas) del snapshot de `var` en `t`"""
+        var = self.variables[self.var_index(var)]
+        entry = self._entries[self._t_index[t]]
+        if entry['mode'] == 'single_file':
+            return self._path(entry, var), entry['variables'].index(var) * self.ncells
+        return self._path(entry, var), 0
+
+    def _block(self, i, ivs=slice(None), cells=slice(None)):
+        """
+        Bloque (variable, celda) del tiempo de índice `i`; NaN donde falta la variable.
+
+        Con `ivs` y `cells` solo se leen esas variables y celdas.
+        """
+        entry = self._entries[i]
+        if entry['mode'] == 'single_file' and entry['variables'] == self.variables \
+                and self.present[i].all():
+            frame = self._map(self._path(entry, None))[:len(self.variables) * self.ncells]
+            return frame.reshape(len(self.variables), self.ncells)[ivs, cells]
+        ivs = range(len(self.variables))[ivs] if isinstance(ivs, slice) else ivs
+        ncells = len(range(self.ncells)[cells])
+        out = np.full((len(ivs), ncells), np.nan, dtype=self.dtype)
+        t = self.times[i]
+        for k, iv in enumerate(ivs):
+            if self.present[i, iv]:
+                out[k] = self.snapshot(self.variables[iv], t)[cells]
+        return out
+
+    # ---------- Interfaz de SnapshotStore ----------
+
+    def var_index(self, var):
+        """Posición de `var` en el eje de variables del cubo"""
+        return self._var_index[canonical(var)]
+
+    def __contains__(self, var):
+        return canonical(var) in self._var_index
+
+    def times_for(self, var):
+        """Tiempos en los que existe la variable `var`"""
+        if var not in self:
+            return []
+        col = self.present[:, self.var_index(var)]
+        return [t for t, ok in zip(self.times, col) if ok]
+
+    def has(self, var, t):
+        """Indica si existe el snapshot de `var` en el tiempo `t`"""
+        if var not in self or t not in self._t_index:
+            return False
+        return bool(self.present[self._t_index[t], self.var_index(var)])
+
+    def snapshot(self, var, t):
+        """
+        Vista (sin copia) del snapshot de `var` en el tiempo `t`, aplanada en
+        orden de PLUTO (x1 varía más rápido).
+        """
+        path, offset = self._locate(var, t)
+        return self._map(path)[offset:offset + self.ncells]
+
+    def series(self, var, times=None):
+        """Serie temporal (tiempo, celda) de una variable (copia)"""
+        times = self.times_for(var) if times is None else times
+        out = np.empty((len(times), self.ncells), dtype=self.dtype)
+        for i, t in enumerate(times):
+            out[i] = self.snapshot(var, t)
+        return out
+
+    def coord(self, name):
+        """Centros de celda (`x1`, `x2` o `x3`) calculados a partir de grid.out"""
+        if name not in self._coords:
+            if name not in self._edges:
+                raise KeyError(f"Coordenada desconocida: {name}")
+            left, right = self._edges[name]
+            self._coords[name] = 0.5 * (left + right)
+        return self._coords[name]
+
+    def digest(self, var, t):
+        """
+        Huella del snapshot de `var` en `t`.
+
+        Se calcula con la ruta, el tamaño, la fecha de modificación y el
+        desplazamiento dentro del archivo, sin leer los datos.
+        """
+        key = (canonical(var), t)
+        if key not in self._digests:
+            path, offset = self._locate(var, t)
+            st = os.stat(path)
+            payload = f'{path.name}:{st.st_size}:{st.st_mtime_ns}:{offset}:{self.dtype.str}'
+            self._digests[key] = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+        return self._digests[key]
+
+    def coord_digest(self, name):
+        """Huella de las coordenadas `name`"""
+        if name not in self._coord_digests:
+            self._coord_digests[name] = content_digest(self.coord(name))
+        return self._coord_digests[name]
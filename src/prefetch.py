@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+📦 Lectura anticipada de snapshots
+
+Mientras se dibuja el fotograma N, un pool de hilos ya está leyendo los
+snapshots N+1..N+k del disco. Los snapshots son vistas de un memmap: leerlos
+por adelantado significa recorrer sus páginas (una reducción de NumPy, que
+libera el GIL) para que, al dibujar, ya estén en la caché de páginas del
+sistema, sin copiar los datos. En discos de red o con la caché fría, la
+E/S deja de esperar al dibujo y viceversa.
+
+La ventana de anticipación se fija con el argumento `lookahead` o con la
+variable de entorno PREFETCH (0 desactiva la lectura anticipada).
+"""
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+PREFETCH_ENV = 'PREFETCH'
+DEFAULT_LOOKAHEAD = 4
+MAX_THREADS = 4
+
+_END = object()
+
+
+def resolve_lookahead(lookahead=None):
+    """
+    Número de snapshots a leer por adelantado.
+
+    Args:
+        lookahead: Valor explícito (None → variable de entorno PREFETCH o
+            DEFAULT_LOOKAHEAD)
+
+    Returns:
+        int: Ventana (>= 0; 0 = sin lectura anticipada)
+    """
+    if lookahead is None:
+        env = os.environ.get(PREFETCH_ENV)
+        lookahead = int(env) if env else DEFAULT_LOOKAHEAD
+    return max(0, int(lookahead))
+
+
+def warm(data):
+    """
+    Lee del disco las páginas de `data` si es un memmap (sin copiarlo).
+
+    Returns:
+        El mismo `data`
+    """
+    if isinstance(data, np.memmap) and data.size:
+        # Cualquier reducción recorre todas las páginas; el resultado no importa
+        np.max(data)
+    return data
+
+
+def prefetch(load, keys, lookahead=None, threads=None):
+    """
+    Itera (key, load(key)) en orden, con las siguientes `lookahead` cargas en curso.
+
+    Args:
+        load: Función que lee los datos de una clave (ej: un tiempo)
+        keys: Claves en el orden en que se consumen
+        lookahead: Ventana de anticipación (ver resolve_lookahead)
+        threads: Hilos de lectura (por defecto min(lookahead, MAX_THREADS))
+
+    Yields:
+        tuple: (key, datos)
+    """
+    keys = list(keys)
+    lookahead = resolve_lookahead(lookahead)
+    if lookahead == 0 or len(keys) < 2:
+        for key in keys:
+            yield key, load(key)
+        return
+
+    pool = ThreadPoolExecutor(max_workers=threads or min(lookahead, MAX_THREADS),
+                              thread_name_prefix='prefetch')
+    pending = deque()
+    upcoming = iter(keys)
+    try:
+        for key in upcoming:
+            pending.append((key, pool.submit(load, key)))
+            if len(pending) > lookahead:
+                break
+        while pending:
+            key, future = pending.popleft()
+            nxt = next(upcoming, _END)
+            if nxt is not _END:
+                pending.append((nxt, pool.submit(load, nxt)))
+            yield key, future.result()
+    finally:
+        # Si el consumidor se detiene antes, no se espera a lo que falta
+        pool.shutdown(wait=False, cancel_futures=True)
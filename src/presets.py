@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+🎛️ Perfiles de renderizado
+
+Un perfil fija con qué calidad y sobre qué snapshots se dibujan las
+animaciones y las figuras de ambos problemas:
+
+- publication: lo de siempre (180 dpi, todos los snapshots, 10 fps)
+- preview: vista rápida a baja resolución, con a lo sumo PREVIEW_FRAMES
+  fotogramas por animación (se salta snapshots con un paso regular) y sin
+  guardar los PNG de cada fotograma
+
+Además del nombre, cada perfil acepta ajustes sueltos: dpi, tamaño de la
+figura, paso temporal, ventana [t_start, t_end] y las variables a animar.
+Los análisis vectorizados (estadísticas, dispersión, frentes, diagnósticos)
+siguen usando todos los snapshots: son baratos frente al dibujo.
+
+Los perfiles distintos de publication escriben en results/<perfil>/problemaN
+para no pisar (ni invalidar en el manifiesto) los resultados definitivos.
+
+El perfil se elige con el argumento --render de los scripts o con la
+variable de entorno RENDER_PROFILE. Este módulo no importa NumPy.
+"""
+import math
+import os
+from pathlib import Path
+
+PROFILE_ENV = 'RENDER_PROFILE'
+DEFAULT_PROFILE = 'publication'
+
+# Fotogramas por animación en el perfil preview (fija el paso temporal)
+PREVIEW_FRAMES = 100
+
+
+class RenderProfile:
+    """
+    Parámetros de renderizado de una ejecución.
+
+    Atributos:
+        name: Nombre del perfil
+        dpi: Resolución de fotogramas y figuras
+        figsize: Tamaño de las figuras en pulgadas
+        fps: Fotogramas por segundo de los videos
+        stride: Paso temporal de las animaciones (None = el que deja a lo
+            sumo max_frames fotogramas)
+        max_frames: Tope de fotogramas por animación cuando stride es None
+            (None = sin tope)
+        t_start, t_end: Ventana de tiempos, inclusiva (None = sin límite)
+        variables: Variables a animar, por nombre PLUTO ('bx1') o de la
+            animación ('Bx'); None = todas
+        keep_frames: Guardar los PNG de cada fotograma (None = variable de
+            entorno KEEP_FRAMES)
+    """
+
+    FIELDS = ('dpi', 'figsize', 'fps', 'stride', 'max_frames', 't_start', 't_end',
+              'variables', 'keep_frames')
+
+    def __init__(self, name, dpi=180, figsize=(7, 4), fps=10, stride=1, max_frames=None,
+                 t_start=None, t_end=None, variables=None, keep_frames=None):
+        self.name = name
+        self.dpi = dpi
+        self.figsize = tuple(figsize)
+        self.fps = fps
+        self.stride = stride
+        self.max_frames = max_frames
+        self.t_start = t_start
+        self.t_end = t_end
+        self.variables = None if variables is None else tuple(variables)
+        self.keep_frames = keep_frames
+
+    def __repr__(self):
+        fields = ', '.join(f'{k}={getattr(self, k)!r}' for k in self.FIELDS)
+        return f"RenderProfile({self.name!r}, {fields})"
+
+    def replace(self, **changes):
+        """Copia con algunos campos cambiados (los valores None se ignoran)"""
+        fields = {k: getattr(self, k) for k in self.FIELDS}
+        fields.update({k: v for k, v in changes.items() if v is not None})
+        return RenderProfile(self.name, **fields)
+
+    def window(self, times):
+        """Tiempos dentro de [t_start, t_end]"""
+        return [t for t in times
+                if (self.t_start is None or t >= self.t_start)
+                and (self.t_end is None or t <= self.t_end)]
+
+    def frame_times(self, times):
+        """
+        Tiempos que se animan: la ventana, recorrida con el paso temporal.
+
+        Con un paso mayor que 1 el último tiempo de la ventana se agrega
+        siempre, para que la animación termine en el estado final.
+        """
+        times = self.window(times)
+        stride = self.stride
+        if stride is None:
+            stride = math.ceil(len(times) / self.max_frames) if self.max_frames else 1
+        stride = max(1, int(stride))
+        selected = times[::stride]
+        if times and selected[-1] != times[-1]:
+            selected.append(times[-1])
+        return selected
+
+    def animates(self, *names):
+        """Si se anima la variable (basta con que coincida alguno de sus nombres)"""
+        return self.variables is None or any(n in self.variables for n in names)
+
+    def results_dir(self, default):
+        """Directorio de resultados: `default` en publication, results/<perfil>/... en el resto"""
+        default = Path(default)
+        if self.name == DEFAULT_PROFILE:
+            return default
+        return default.parent / self.name / default.name
+
+
+PROFILES = {
+    'publication': RenderProfile('publication'),
+    'preview': RenderProfile('preview', dpi=80, stride=None, max_frames=PREVIEW_FRAMES,
+                             keep_frames=False),
+}
+
+
+def resolve_profile(profile=None, **overrides):
+    """
+    Perfil de renderizado a usar.
+
+    Args:
+        profile: RenderProfile, nombre de PROFILES o None (variable de
+            entorno RENDER_PROFILE o 'publication')
+        **overrides: Campos a cambiar (ver RenderProfile); los None se ignoran
+
+    Returns:
+        RenderProfile
+
+    Raises:
+        ValueError: Si el nombre no está en PROFILES
+    """
+    if not isinstance(profile, RenderProfile):
+        name = profile or os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE
+        if name not in PROFILES:
+            raise ValueError(f"Perfil desconocido: {name} (opciones: {', '.join(PROFILES)})")
+        profile = PROFILES[name]
+    return profile.replace(**overrides)
+
+
+def add_arguments(parser):
+    """Agrega --render (el perfil) y los ajustes sueltos a un argparse.ArgumentParser"""
+    group = parser.add_argument_group("perfil de renderizado")
+    group.add_argument('--render', choices=tuple(PROFILES), default=None, metavar='PERFIL',
+                       help=f"Perfil: {', '.join(PROFILES)} (por defecto {PROFILE_ENV} o {DEFAULT_PROFILE})")
+    group.add_argument('--dpi', type=int, default=None, help="Resolución de fotogramas y figuras")
+    group.add_argument('--figsize', type=float, nargs=2, default=None, metavar=('ANCHO', 'ALTO'),
+                       help="Tamaño de las figuras en pulgadas")
+    group.add_argument('--fps', type=int, default=None, help="Fotogramas por segundo de los videos")
+    group.add_argument('--stride', type=int, default=None,
+                       help="Paso temporal de las animaciones (1 = todos los snapshots)")
+    group.add_argument('--t-start', type=int, default=None, help="Primer tiempo de la ventana")
+    group.add_argument('--t-end', type=int, default=None, help="Último tiempo de la ventana")
+    group.add_argument('--vars', nargs='+', default=None, metavar='VAR',
+                       help="Variables a animar (ej: rho, o Bx vx)")
+
+
+def profile_from_args(args):
+    """RenderProfile a partir de los argumentos de add_arguments"""
+    return resolve_profile(args.render, dpi=args.dpi, figsize=args.figsize, fps=args.fps,
+                           stride=args.stride, t_start=args.t_start, t_end=args.t_end,
+                           variables=args.vars)
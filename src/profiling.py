@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+🔬 Perfilado por etapas
+
+Registra, para cada etapa con nombre, el tiempo de pared, el tiempo de CPU,
+el pico de memoria residente (RSS) y los bytes leídos y escritos. Al final se
+escribe una traza JSON junto a los resultados y, opcionalmente, una traza en
+formato Chrome (abrir en chrome://tracing o https://ui.perfetto.dev).
+
+Se activa con la variable de entorno PROFILE (1/json o chrome) o con
+enable(); desactivado, stage() devuelve un contexto vacío compartido y las
+funciones decoradas con profiled() se llaman directamente.
+
+Notas sobre las medidas:
+- cpu_s es el tiempo de CPU del hilo que ejecuta la etapa; cpu_children_s el
+  de los procesos hijos (pools de renderizado, ffmpeg) ya terminados.
+- peak_rss_kb es el máximo del proceso hasta el final de la etapa.
+- read_bytes/write_bytes son contadores del proceso (/proc/self/io); con
+  etapas en paralelo incluyen la E/S de las demás, y las lecturas de archivos
+  mapeados en memoria no se cuentan. En sistemas sin /proc quedan en None.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_ENV = 'PROFILE'
+TRACE_NAME = 'profile.json'
+CHROME_TRACE_NAME = 'profile.trace.json'
+
+_NULL = nullcontext()
+_lock = threading.Lock()
+_local = threading.local()
+_events = []
+_origin = time.perf_counter()
+_format = None
+
+
+def _format_from_env():
+    value = os.environ.get(PROFILE_ENV, '').strip().lower()
+    if value in ('', '0', 'false', 'no'):
+        return None
+    return 'chrome' if value == 'chrome' else 'json'
+
+
+def enable(fmt='json'):
+    """
+    Activa el perfilado.
+
+    Args:
+        fmt: 'json' (solo traza JSON) o 'chrome' (también traza Chrome);
+            None lo desactiva
+    """
+    global _format
+    _format = fmt
+    if fmt is None:
+        os.environ.pop(PROFILE_ENV, None)
+    else:
+        # Para que los scripts importados después vean el mismo ajuste
+        os.environ[PROFILE_ENV] = fmt
+
+
+def enabled():
+    return _format is not None
+
+
+def _io_counters():
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(':', 1) for line in f)
+        return int(fields['rchar']), int(fields['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _rusage():
+    if resource is None:
+        return None, 0.0
+    self_ = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return self_.ru_maxrss, children.ru_utime + children.ru_stime
+
+
+class _Stage:
+    """Contexto que mide una etapa y la agrega a la traza al salir"""
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.depth = len(stack)
+        self.parent = stack[-1] if stack else None
+        stack.append(self.name)
+        self.read0, self.written0 = _io_counters()
+        _, self.children0 = _rusage()
+        self.cpu0 = time.thread_time()
+        self.wall0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall1 = time.perf_counter()
+        cpu1 = time.thread_time()
+        peak, children1 = _rusage()
+        read1, written1 = _io_counters()
+        _local.stack.pop()
+        event = {
+            'name': self.name,
+            'parent': self.parent,
+            'depth': self.depth,
+            'thread': threading.current_thread().name,
+            'tid': threading.get_ident(),
+            'start_s': self.wall0 - _origin,
+            'wall_s': wall1 - self.wall0,
+            'cpu_s': cpu1 - self.cpu0,
+            'cpu_children_s': children1 - self.children0,
+            'peak_rss_kb': peak,
+            'read_bytes': None if read1 is None else read1 - self.read0,
+            'write_bytes': None if written1 is None else written1 - self.written0,
+            'ok': exc_type is None,
+        }
+        if self.args:
+            event['args'] = self.args
+        with _lock:
+            _events.append(event)
+        return False
+
+
+def stage(name, **args):
+    """
+    Mide una etapa con nombre.
+
+    Uso:
+        with stage('problema1:densidad', frames=21):
+            ...
+
+    Returns:
+        Contexto que registra la etapa (o uno vacío si el perfilado está apagado)
+    """
+    if _format is None:
+        return _NULL
+    return _Stage(name, args)
+
+
+def profiled(name=None):
+    """Decorador: mide cada llamada a la función como una etapa"""
+    def decorate(func):
+        label = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _format is None:
+                return func(*args, **kwargs)
+            with _Stage(label, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def events():
+    """Copia de las etapas registradas hasta ahora"""
+    with _lock:
+        return list(_events)
+
+
+def reset():
+    with _lock:
+        _events.clear()
+
+
+def write_trace(results_dir):
+    """
+    Escribe la traza en results_dir (profile.json y, en modo chrome,
+    profile.trace.json). No hace nada si el perfilado está apagado.
+
+    Returns:
+        list: Rutas escritas
+    """
+    if _format is None:
+        return []
+    results_dir = Path(results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    evs = sorted(events(), key=lambda e: e['start_s'])
+
+    written = []
+    path = results_dir / TRACE_NAME
+    with open(path, 'w') as f:
+        json.dump({'pid': os.getpid(), 'stages': evs}, f, indent=2)
+    written.append(path)
+
+    if _format == 'chrome':
+        pid = os.getpid()
+        trace = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                  'args': {'name': tname}}
+                 for tid, tname in sorted({(e['tid'], e['thread']) for e in evs})]
+        for e in evs:
+            args = {k: e[k] for k in ('cpu_s', 'cpu_children_s', 'peak_rss_kb',
+                                       'read_bytes', 'write_bytes', 'ok')}
+            args.update(e.get('args', {}))
+            trace.append({'name': e['name'], 'cat': 'etapa', 'ph': 'X', 'pid': pid,
+                          'tid': e['tid'], 'ts': e['start_s'] * 1e6,
+                          'dur': e['wall_s'] * 1e6, 'args': args})
+        path = results_dir / CHROME_TRACE_NAME
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+        written.append(path)
+
+    for p in written:
+        print(f"🔬 Traza de perfilado: {p}")
+    return written
+
+
+_format = _format_from_env()
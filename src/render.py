@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+"""
+🎨 Renderizado de fotogramas
+
+Motor de renderizado de animaciones: líneas 1D (LineAnimator) e imágenes 2D
+(ImageAnimator) de una variable o de un corte de una malla 2D/3D. Cada
+fotograma es independiente, así que se reparten en bloques contiguos entre un
+pool de procesos; cada proceso abre su propia vista del almacén de snapshots y
+escribe sus PNG con el mismo nombre que tendría en una ejecución en serie.
+Dentro de cada bloque se reutiliza una única figura y los snapshots de los
+fotogramas siguientes se leen en segundo plano mientras se dibuja el actual.
+"""
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from profiling import profiled
+from decimate import decimate
+from prefetch import prefetch, warm
+
+WORKERS_ENV = 'RENDER_WORKERS'
+KEEP_FRAMES_ENV = 'KEEP_FRAMES'
+
+# Fotogramas por tarea en modo streaming (acota la memoria en vuelo)
+STREAM_BLOCK = 8
+
+# Cambiar al modificar el dibujo de los fotogramas: invalida el manifiesto
+RENDER_VERSION = 2
+
+# Estilo común de los fotogramas
+FRAME_DPI = 180
+FRAME_FIGSIZE = (7, 4)
+
+_worker_store = None
+# Figuras persistentes por hilo: con workers=1 las animaciones del grafo de
+# tareas corren en hilos del mismo proceso y no deben compartirlas
+_local = threading.local()
+
+
+def _animators():
+    """Caché de animadores del hilo actual"""
+    if not hasattr(_local, 'animators'):
+        _local.animators = {}
+    return _local.animators
+
+
+def resolve_workers(workers=None, n_jobs=None):
+    """
+    Determina cuántos procesos usar para renderizar.
+
+    Args:
+        workers: Número pedido explícitamente (None → variable de entorno
+            RENDER_WORKERS o todos los núcleos disponibles)
+        n_jobs: Número de fotogramas; nunca se usan más procesos que fotogramas
+
+    Returns:
+        int: Número de procesos (>= 1)
+    """
+    if workers is None:
+        env = os.environ.get(WORKERS_ENV)
+        workers = int(env) if env else (os.cpu_count() or 1)
+    workers = max(1, int(workers))
+    if n_jobs is not None:
+        workers = min(workers, max(1, n_jobs))
+    return workers
+
+
+def resolve_keep_frames(keep=None):
+    """
+    Indica si se conservan los PNG de cada fotograma en modo streaming.
+
+    Args:
+        keep: Valor explícito (None → variable de entorno KEEP_FRAMES, por
+            defecto se conservan)
+    """
+    if keep is None:
+        return os.environ.get(KEEP_FRAMES_ENV, '1').lower() not in ('0', 'false', 'no')
+    return bool(keep)
+
+
+def new_figure(figsize=FRAME_FIGSIZE):
+    """
+    Figura con un solo eje, sin pasar por pyplot.
+
+    A diferencia de plt.subplots no toca el estado global de pyplot, así que
+    es seguro crear figuras desde varios hilos a la vez. Se guarda con
+    fig.savefig(...) y no hace falta cerrarla.
+
+    Returns:
+        tuple: (fig, ax)
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots()
+
+
+def _pool(n, store):
+    """
+    Pool de procesos que abre el almacén en cada worker.
+
+    Con forkserver (si existe) los workers no heredan los hilos del proceso
+    principal, lo que permite usar el pool desde tareas en paralelo.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('forkserver')
+        ctx.set_forkserver_preload(['render', 'dataset'])
+    else:
+        ctx = multiprocessing.get_context()
+    return ProcessPoolExecutor(max_workers=n, mp_context=ctx, initializer=_init_worker,
+                               initargs=(type(store), store.data_dir, store.store_dir))
+
+
+def _init_worker(store_cls, data_dir, store_dir):
+    """Abre el almacén (SnapshotStore o PlutoStore) una sola vez por proceso"""
+    global _worker_store
+    _worker_store = store_cls(data_dir, store_dir)
+
+
+class _Animator:
+    """
+    Base de las figuras persistentes: lienzo Agg, blitting y salida de fotogramas.
+
+    Las subclases construyen sus artistas en `self.ax`, llaman a
+    `_finish(dpi, blit, animated)` y definen `_update(data, title)`.
+    """
+
+    def __init__(self, figsize):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.fig = Figure(figsize=figsize)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.subplots()
+
+    def _finish(self, dpi, blit, animated):
+        self.dpi = dpi
+        # Layout calculado con el dpi por defecto, igual que savefig(dpi=...)
+        self.fig.tight_layout()
+        self.fig.set_dpi(dpi)
+
+        self._animated = animated
+        self.blit = blit and hasattr(self.canvas, 'copy_from_bbox')
+        self._background = None
+        if self.blit:
+            # Los artistas animados no se incluyen en el fondo
+            for artist in animated:
+                artist.set_animated(True)
+            self.canvas.draw()
+            self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+    def draw(self, data, title):
+        """
+        Actualiza los datos y el título y rasteriza el fotograma.
+
+        Returns:
+            memoryview: Buffer RGBA (alto, ancho, 4) del lienzo
+        """
+        self._update(data, title)
+        if self.blit:
+            self.canvas.restore_region(self._background)
+            for artist in self._animated:
+                self.ax.draw_artist(artist)
+        else:
+            self.canvas.draw()
+        return self.canvas.buffer_rgba()
+
+    @property
+    def size(self):
+        """Tamaño del fotograma en píxeles (ancho, alto)"""
+        w, h = self.canvas.get_width_height()
+        return int(w), int(h)
+
+    def write_png(self, buf, path):
+        """Guarda como PNG un buffer devuelto por draw()"""
+        from PIL import Image
+
+        Image.frombuffer('RGBA', self.size, buf, 'raw', 'RGBA', 0, 1).save(
+            path, dpi=(self.dpi, self.dpi))
+
+    @staticmethod
+    def to_rgb(buf):
+        """Copia un buffer RGBA de draw() como bytes RGB crudos"""
+        return np.asarray(buf)[..., :3].tobytes()
+
+    def save(self, data, title, path):
+        """Dibuja un fotograma y lo guarda como PNG"""
+        self.write_png(self.draw(data, title), path)
+
+    def close(self):
+        self.fig.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LineAnimator(_Animator):
+    """
+    Figura persistente para animaciones de una línea 1D.
+
+    La figura, los ejes, etiquetas, límites y el layout se construyen una sola
+    vez; en cada fotograma solo cambian los datos de la línea y el texto del
+    título. Con `blit=True` el fondo estático se rasteriza una vez y en cada
+    fotograma se redibujan únicamente la línea y el título. Si hay más celdas
+    que columnas de píxeles, cada fotograma se decima a un mínimo y un máximo
+    por columna (ver decimate.py) antes de dibujarlo.
+
+    Args:
+        x: Coordenadas del eje horizontal (fijas para toda la animación)
+        xlabel, ylabel: Etiquetas de los ejes
+        ylim: Límites fijos del eje vertical (ej: de fixed_ylim)
+        title: Título representativo, usado para calcular el layout
+        dpi: Resolución de los fotogramas
+        figsize: Tamaño de la figura en pulgadas
+        blit: Reutilizar el fondo rasterizado entre fotogramas
+    """
+
+    def __init__(self, x, xlabel, ylabel, ylim, title='', dpi=FRAME_DPI,
+                 figsize=FRAME_FIGSIZE, blit=True):
+        super().__init__(figsize)
+        self.x = np.asarray(x)
+        # Los extremos de x fijan los límites del eje aunque se decime
+        (self.line,) = self.ax.plot(*decimate(self.x, self.x, figsize[0] * dpi), lw=2)
+        self.title = self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.ax.set_ylim(*ylim)
+        self.ax.grid(True, alpha=0.3)
+        self._finish(dpi, blit, (self.line, self.title))
+        # Ancho real del eje tras el layout
+        self.width_px = self.ax.get_window_extent().width
+
+    def _update(self, y, title):
+        xd, yd = decimate(self.x, y, self.width_px)
+        if yd is y:
+            self.line.set_ydata(y)
+        else:
+            self.line.set_data(xd, yd)
+        self.title.set_text(title)
+
+
+def _is_uniform(c):
+    c = np.asarray(c, dtype=np.float64)
+    return c.size < 3 or np.allclose(np.diff(c), c[1] - c[0], rtol=1e-6, atol=0)
+
+
+class ImageAnimator(_Animator):
+    """
+    Figura persistente para animaciones de un campo 2D.
+
+    Con coordenadas uniformes usa imshow; si no, pcolormesh. Ejes, barra de
+    color, límites de color y layout se construyen una sola vez; en cada
+    fotograma solo cambian los valores de la imagen y el título.
+
+    Args:
+        x, y: Centros de celda de los ejes horizontal y vertical
+        xlabel, ylabel: Etiquetas de los ejes
+        clim: Límites fijos de la escala de color (ej: de fixed_ylim)
+        title: Título representativo, usado para calcular el layout
+        cmap: Mapa de colores
+        clabel: Etiqueta de la barra de color
+        dpi, figsize, blit: Ver LineAnimator
+    """
+
+    def __init__(self, x, y, xlabel, ylabel, clim, title='', cmap='viridis', clabel='',
+                 dpi=FRAME_DPI, figsize=FRAME_FIGSIZE, blit=True):
+        super().__init__(figsize)
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        blank = np.zeros((y.size, x.size))
+        if _is_uniform(x) and _is_uniform(y):
+            dx = x[1] - x[0] if x.size > 1 else 1.0
+            dy = y[1] - y[0] if y.size > 1 else 1.0
+            extent = (x[0] - dx / 2, x[-1] + dx / 2, y[0] - dy / 2, y[-1] + dy / 2)
+            self.image = self.ax.imshow(blank, origin='lower', extent=extent, aspect='auto',
+                                        interpolation='nearest', cmap=cmap,
+                                        vmin=clim[0], vmax=clim[1])
+        else:
+            self.image = self.ax.pcolormesh(x, y, blank, shading='nearest', cmap=cmap,
+                                            vmin=clim[0], vmax=clim[1])
+        self.fig.colorbar(self.image, ax=self.ax, label=clabel)
+        self.title = self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self._finish(dpi, blit, (self.image, self.title))
+
+    def _update(self, z, title):
+        # z tiene forma (nx, ny); la imagen se dibuja con y en las filas
+        z = np.asarray(z).T
+        if hasattr(self.image, 'set_data'):
+            self.image.set_data(z)
+        else:
+            self.image.set_array(z)
+        self.title.set_text(title)
+
+
+def _frame_data(store, var, t, style):
+    """Datos de un fotograma: el snapshot completo o el corte indicado en el estilo"""
+    cut = dict(style['cut'])
+    if cut or style['kind'] == 'image':
+        return store.cut(var, t, **cut)
+    return store.snapshot(var, t)
+
+
+def _animator_for(store, style, title):
+    """Figura persistente del hilo, reutilizada entre bloques del mismo estilo"""
+    animators = _animators()
+    key = tuple(sorted(style.items()))
+    anim = animators.get(key)
+    if anim is None:
+        if style['kind'] == 'image':
+            x, y = (store.coord(a) for a in style['axes'])
+            anim = ImageAnimator(x, y, style['xlabel'], style['ylabel'], style['clim'],
+                                 title=title, cmap=style['cmap'], clabel=style['clabel'],
+                                 dpi=style['dpi'], figsize=style['figsize'], blit=style['blit'])
+        else:
+            anim = LineAnimator(store.coord(style['coord']), style['xlabel'], style['ylabel'],
+                                style['ylim'], title=title, dpi=style['dpi'],
+                                figsize=style['figsize'], blit=style['blit'])
+        animators[key] = anim
+    return anim
+
+
+def _release_animators():
+    """Cierra las figuras del hilo actual (las de otros hilos siguen en uso)"""
+    animators = _animators()
+    for anim in animators.values():
+        anim.close()
+    animators.clear()
+
+
+def _render_chunk(var, chunk, style, rgb=False, store=None):
+    """
+    Renderiza un bloque contiguo de fotogramas [(t, título, ruta), ...].
+
+    Las rutas None no generan PNG. Con `rgb=True` devuelve
+    ((ancho, alto), [bytes RGB por fotograma]); si no, el número de fotogramas.
+    Los snapshots de los fotogramas siguientes se leen en segundo plano
+    mientras se dibuja el actual (ver prefetch.py).
+    """
+    store = store if store is not None else _worker_store
+    anim = _animator_for(store, style, chunk[0][1])
+    out = []
+    frames = prefetch(lambda t: warm(_frame_data(store, var, t, style)), [t for t, _, _ in chunk])
+    for (t, title, path), (_, data) in zip(chunk, frames):
+        buf = anim.draw(data, title)
+        if path is not None:
+            anim.write_png(buf, path)
+        if rgb:
+            out.append(anim.to_rgb(buf))
+    return (anim.size, out) if rgb else len(chunk)
+
+
+def _split_chunks(items, n):
+    """Divide `items` en `n` bloques contiguos de tamaño similar"""
+    size, extra = divmod(len(items), n)
+    chunks, start = [], 0
+    for i in range(n):
+        end = start + size + (1 if i < extra else 0)
+        if end > start:
+            chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+def _cut_key(cut):
+    return tuple(sorted((cut or {}).items()))
+
+
+def _line_style(coord, xlabel, ylabel, ylim, dpi, figsize, blit, cut):
+    return {'kind': 'line', 'coord': coord, 'cut': _cut_key(cut), 'xlabel': xlabel,
+            'ylabel': ylabel, 'ylim': tuple(ylim), 'dpi': dpi, 'figsize': figsize, 'blit': blit}
+
+
+def _image_style(store, cut, xlabel, ylabel, clim, cmap, clabel, dpi, figsize, blit):
+    axes = store.cut_axes(**(cut or {}))
+    if len(axes) != 2:
+        raise ValueError(f"El corte {cut or {}} deja los ejes {axes}; una imagen necesita dos")
+    return {'kind': 'image', 'axes': axes, 'cut': _cut_key(cut),
+            'xlabel': xlabel or axes[0], 'ylabel': ylabel or axes[1], 'clim': tuple(clim),
+            'cmap': cmap, 'clabel': clabel, 'dpi': dpi, 'figsize': figsize, 'blit': blit}
+
+
+def _render_frames(store, var, frames, style, workers=None):
+    frames = list(frames)
+    if not frames:
+        return 0
+    n = resolve_workers(workers, len(frames))
+    if n == 1:
+        try:
+            return _render_chunk(var, frames, style, store=store)
+        finally:
+            _release_animators()
+
+    chunks = _split_chunks(frames, n)
+    with _pool(n, store) as pool:
+        done = pool.map(_render_chunk, [var] * len(chunks), chunks, [style] * len(chunks))
+        return sum(done)
+
+
+@profiled()
+def render_line_frames(store, var, coord, frames, xlabel, ylabel, ylim,
+                       workers=None, dpi=FRAME_DPI, figsize=FRAME_FIGSIZE, blit=True, cut=None):
+    """
+    Renderiza fotogramas de una variable 1D en paralelo.
+
+    Args:
+        store: SnapshotStore con los datos
+        var: Variable a graficar (ej: 'rho', 'vx1')
+        coord: Coordenada del eje horizontal ('x1' o 'x3')
+        frames: Lista de (t, título, ruta_png)
+        xlabel, ylabel: Etiquetas de los ejes
+        ylim: Límites fijos del eje vertical
+        workers: Número de procesos (ver resolve_workers)
+        dpi: Resolución de los PNG
+        figsize: Tamaño de la figura en pulgadas
+        blit: Reutilizar el fondo rasterizado entre fotogramas (ver LineAnimator)
+        cut: En mallas 2D/3D, índices de los ejes fijos de la línea
+            (ej: {'x2': 64, 'x3': 0}; ver GridAccess.cut)
+
+    Returns:
+        int: Número de fotogramas generados
+    """
+    style = _line_style(coord, xlabel, ylabel, ylim, dpi, figsize, blit, cut)
+    return _render_frames(store, var, frames, style, workers)
+
+
+@profiled()
+def render_image_frames(store, var, frames, clim, cut=None, xlabel=None, ylabel=None,
+                        cmap='viridis', clabel='', workers=None, dpi=FRAME_DPI,
+                        figsize=FRAME_FIGSIZE, blit=True):
+    """
+    Renderiza fotogramas 2D (imagen) de una variable en paralelo.
+
+    Args:
+        store: Almacén con una malla 2D o 3D
+        var: Variable a graficar
+        frames: Lista de (t, título, ruta_png)
+        clim: Límites fijos de la escala de color
+        cut: Índices de los ejes fijos; deben quedar dos ejes libres
+            (ej: {'x3': 32} en 3D, nada en 2D)
+        xlabel, ylabel: Etiquetas (por defecto el nombre de cada eje)
+        cmap, clabel: Mapa de colores y etiqueta de la barra de color
+        workers, dpi, figsize, blit: Ver render_line_frames
+
+    Returns:
+        int: Número de fotogramas generados
+    """
+    style = _image_style(store, cut, xlabel, ylabel, clim, cmap, clabel, dpi, figsize, blit)
+    return _render_frames(store, var, frames, style, workers)
+
+
+def _stream_animation(store, var, frames, style, output_base, fps=10, workers=None,
+                      manifest=None):
+    from utils import report_video_and_gif
+    from video import FfmpegPipe, GifWriter
+
+    frames = list(frames)
+    if not frames:
+        return report_video_and_gif(output_base, False, False)
+
+    if manifest is not None:
+        from manifest import build_key
+
+        # blit no cambia los píxeles, así que no forma parte de la huella
+        params = {k: v for k, v in style.items() if k != 'blit'}
+        params['version'] = RENDER_VERSION
+        coords = [style['coord']] if style['kind'] == 'line' else list(style['axes'])
+        coord_digests = [store.coord_digest(c) for c in coords]
+        frame_keys = [build_key([store.digest(var, t)] + coord_digests, dict(params, title=title))
+                      for t, title, _ in frames]
+        anim_name = manifest.name_for(output_base)
+        anim_key = build_key(frame_keys, {'fps': fps})
+        stale = [(frame, key) for frame, key in zip(frames, frame_keys)
+                 if frame[2] is not None and not manifest.is_fresh(manifest.name_for(frame[2]), key)]
+
+        if manifest.is_fresh(anim_name, anim_key):
+            # Video y GIF al día: solo faltan (si acaso) algunos PNG
+            if stale:
+                _render_frames(store, var, [f for f, _ in stale], style, workers)
+            for (t, title, path), key in stale:
+                manifest.record_output(path, key)
+            print(f"✨ Sin cambios: {output_base} ({len(stale)} fotogramas regenerados)")
+            return (os.path.exists(f'{output_base}.mp4'), os.path.exists(f'{output_base}.gif'))
+
+        # Hay que volver a codificar: se renderiza todo, pero los PNG al día no se reescriben
+        stale_paths = {str(f[2]) for f, _ in stale}
+        frames = [(t, title, path if path is not None and str(path) in stale_paths else None)
+                  for t, title, path in frames]
+        mp4_ok, gif_ok = _stream_animation(store, var, frames, style, output_base,
+                                           fps=fps, workers=workers)
+        for (t, title, path), key in stale:
+            manifest.record_output(path, key)
+        if mp4_ok and gif_ok:
+            manifest.record(anim_name, anim_key, [f'{output_base}.mp4', f'{output_base}.gif'])
+        else:
+            # Si falló ffmpeg o el GIF, la próxima ejecución vuelve a codificar
+            manifest.forget(anim_name)
+        return mp4_ok, gif_ok
+    blocks = [frames[i:i + STREAM_BLOCK] for i in range(0, len(frames), STREAM_BLOCK)]
+    n = resolve_workers(workers, len(blocks))
+    sinks = []
+
+    def consume(result):
+        size, bufs = result
+        if not sinks:
+            sinks.append(FfmpegPipe(f'{output_base}.mp4', size, fps))
+            sinks.append(GifWriter(f'{output_base}.gif', size, fps))
+        for buf in bufs:
+            for sink in sinks:
+                sink.write(buf)
+
+    try:
+        if n == 1:
+            try:
+                for block in blocks:
+                    consume(_render_chunk(var, block, style, rgb=True, store=store))
+            finally:
+                _release_animators()
+        else:
+            with _pool(n, store) as pool:
+                # Ventana acotada de bloques en vuelo, consumidos en orden
+                todo = iter(blocks)
+                pending = deque()
+                for block in todo:
+                    pending.append(pool.submit(_render_chunk, var, block, style, True))
+                    if len(pending) >= 2 * n:
+                        break
+                while pending:
+                    consume(pending.popleft().result())
+                    block = next(todo, None)
+                    if block is not None:
+                        pending.append(pool.submit(_render_chunk, var, block, style, True))
+    finally:
+        results = [sink.close() for sink in sinks] or [False, False]
+    return report_video_and_gif(output_base, *results)
+
+
+@profiled()
+def stream_line_animation(store, var, coord, frames, xlabel, ylabel, ylim, output_base,
+                          fps=10, workers=None, dpi=FRAME_DPI, figsize=FRAME_FIGSIZE,
+                          blit=True, manifest=None, cut=None):
+    """
+    Renderiza una animación 1D enviando los fotogramas directo a ffmpeg y al GIF.
+
+    Los fotogramas se renderizan en bloques pequeños (en paralelo si hay más
+    de un proceso) y sus buffers RGB se escriben en orden al MP4 y al GIF, sin
+    volver a leer PNG del disco.
+
+    Args:
+        store: SnapshotStore con los datos
+        var: Variable a graficar
+        coord: Coordenada del eje horizontal ('x1' o 'x3')
+        frames: Lista de (t, título, ruta_png); con ruta None no se guarda PNG
+        xlabel, ylabel: Etiquetas de los ejes
+        ylim: Límites fijos del eje vertical
+        output_base: Nombre base de los archivos de salida (sin extensión)
+        fps: Fotogramas por segundo
+        workers, dpi, figsize, blit, cut: Ver render_line_frames
+        manifest: BuildManifest opcional; con él solo se regeneran los PNG,
+            el MP4 y el GIF cuyas entradas o parámetros cambiaron
+
+    Returns:
+        tuple: (mp4_success, gif_success)
+    """
+    style = _line_style(coord, xlabel, ylabel, ylim, dpi, figsize, blit, cut)
+    return _stream_animation(store, var, frames, style, output_base, fps, workers, manifest)
+
+
+@profiled()
+def stream_image_animation(store, var, frames, clim, output_base, cut=None, xlabel=None,
+                           ylabel=None, cmap='viridis', clabel='', fps=10, workers=None,
+                           dpi=FRAME_DPI, figsize=FRAME_FIGSIZE, blit=True, manifest=None):
+    """
+    Renderiza una animación 2D (imagen) enviando los fotogramas a ffmpeg y al GIF.
+
+    Args:
+        store, var, frames, clim, cut, xlabel, ylabel, cmap, clabel: Ver render_image_frames
+        output_base, fps, workers, dpi, figsize, blit, manifest: Ver stream_line_animation
+
+    Returns:
+        tuple: (mp4_success, gif_success)
+    """
+    style = _image_style(store, cut, xlabel, ylabel, clim, cmap, clabel, dpi, figsize, blit)
+    return _stream_animation(store, var, frames, style, output_base, fps, workers, manifest)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+🧭 Planificador de tareas
+
+Grafo de tareas en proceso: cada tarea declara de qué tareas depende y
+cuántos "slots" del presupuesto de workers ocupa (por ejemplo, una animación
+que reparte fotogramas en N procesos ocupa N slots). Las tareas listas se
+ejecutan en paralelo mientras quepan en el presupuesto, así que el tiempo
+total queda acotado por la cadena más lenta y no por la suma de los pasos.
+
+Además de las dependencias, una tarea puede declarar tareas `after`: espera
+a que terminen, pero corre aunque fallen (por ejemplo, un resumen que agrega
+los resultados opcionales de otra etapa si los hay).
+"""
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from profiling import stage
+
+PENDING = 'pendiente'
+DONE = 'ok'
+FAILED = 'error'
+SKIPPED = 'omitida'
+
+_STATUS_ICON = {DONE: '🤍', FAILED: '❌', SKIPPED: '⏭️', PENDING: '…'}
+
+
+class Task:
+    """Una tarea del grafo: función sin argumentos, dependencias y slots"""
+
+    def __init__(self, name, func, deps=(), slots=1, after=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.after = tuple(after)
+        self.slots = max(1, int(slots))
+        self.status = PENDING
+        self.error = None
+        self.elapsed = 0.0
+
+
+class TaskGraph:
+    """
+    Grafo de tareas con dependencias y presupuesto de workers.
+
+    Args:
+        workers: Presupuesto de slots que pueden estar ocupados a la vez
+    """
+
+    def __init__(self, workers=1):
+        self.workers = max(1, int(workers))
+        self.tasks = {}
+
+    def add(self, name, func, deps=(), slots=1, after=()):
+        """
+        Agrega una tarea. Las dependencias deben haberse agregado antes.
+
+        Args:
+            name: Nombre único de la tarea
+            func: Función sin argumentos
+            deps: Tareas que deben terminar bien antes (si fallan, esta se omite)
+            slots: Slots del presupuesto de workers que ocupa
+            after: Tareas que deben terminar antes, bien o mal
+
+        Returns:
+            str: Nombre de la tarea (para usarlo en `deps` de otras tareas)
+        """
+        if name in self.tasks:
+            raise ValueError(f"Tarea duplicada: {name}")
+        missing = [d for d in tuple(deps) + tuple(after) if d not in self.tasks]
+        if missing:
+            raise ValueError(f"La tarea {name} depende de tareas desconocidas: {missing}")
+        self.tasks[name] = Task(name, func, deps, slots, after)
+        return name
+
+    def _execute(self, task):
+        start = time.perf_counter()
+        try:
+            with stage(task.name, slots=task.slots):
+                task.func()
+            task.status = DONE
+        except (Exception, SystemExit) as e:
+            task.status = FAILED
+            task.error = e
+            print(f"❌ Falló la tarea {task.name}: {e}")
+            if not isinstance(e, SystemExit):
+                traceback.print_exc()
+        finally:
+            task.elapsed = time.perf_counter() - start
+
+    def run(self):
+        """
+        Ejecuta todas las tareas respetando dependencias y presupuesto.
+
+        Las tareas cuyas dependencias fallaron se omiten; las tareas `after`
+        solo fijan el orden.
+
+        Returns:
+            bool: True si todas las tareas terminaron bien
+        """
+        pending = [t for t in self.tasks.values() if t.status == PENDING]
+        running = {}
+        used = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                for task in list(pending):
+                    states = [self.tasks[d].status for d in task.deps]
+                    if any(s in (FAILED, SKIPPED) for s in states):
+                        task.status = SKIPPED
+                        pending.remove(task)
+                        continue
+                    if any(s != DONE for s in states):
+                        continue
+                    if any(self.tasks[a].status == PENDING for a in task.after):
+                        continue
+                    slots = min(task.slots, self.workers)
+                    if running and used + slots > self.workers:
+                        continue
+                    used += slots
+                    running[pool.submit(self._execute, task)] = (task, slots)
+                    pending.remove(task)
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    _, slots = running.pop(fut)
+                    used -= slots
+        return all(t.status == DONE for t in self.tasks.values())
+
+    def report(self):
+        """Imprime el estado y la duración de cada tarea"""
+        ok = sum(t.status == DONE for t in self.tasks.values())
+        print(f"\n{'='*50}")
+        for t in self.tasks.values():
+            line = f"{_STATUS_ICON[t.status]} {t.name:<32} {t.status:<9} {t.elapsed:7.2f} s"
+            if t.error is not None:
+                line += f"  ({t.error})"
+            print(line)
+        print(f"🤍 Resumen: {ok}/{len(self.tasks)} tareas completadas")
+        print(f"{'='*50}")
+        return ok
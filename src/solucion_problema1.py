@@ -5,142 +5,430 @@
 🎯 Tareas Implementadas:
 1. Visualización de densidad ρ(x,t) con rango fijo para comparación
 2. Creación de video mostrando la evolución temporal
+   + Visor HTML interactivo de ρ y vx (datos comprimidos, sin PNG)
 3. Análisis de componentes de velocidad (vx, vy, vz)
 4. Cálculo y visualización de presión P = c_s²ρ
+   + Relación de dispersión ω–k y velocidad del sonido medida
+   + Seguimiento de frentes y tiempos de reflexión en las paredes
+   + Diagnósticos de conservación de masa y energía por snapshot
 5. Respuestas conceptuales sobre reflexión en paredes
 
 📁 Datos requeridos: data/soundwave-data/
 🔥 Resultados: results/problema1/
 
-Ejecutar desde src/: python solucion_problema1.py
+Ejecutar: python src/solucion_problema1.py [--render preview] [--t-start N --t-end M]
+
+Uso como biblioteca (importar el módulo no lee datos ni borra resultados):
+    import solucion_problema1 as p1
+    ok, ctx = p1.run(data_dir, results_dir)      # todo el problema
+    ctx = p1.context(data_dir, results_dir)      # o etapas sueltas
+    p1.load(ctx); p1.front_tracking(ctx)
 """
 import math
 from pathlib import Path
+from types import SimpleNamespace
+
+from utils import clean_results_directory, ensure_dir
+from manifest import BuildManifest
+from scheduler import TaskGraph
+from profiling import write_trace
+from presets import add_arguments, profile_from_args, resolve_profile
+
+# NumPy, matplotlib y los módulos que los usan se importan dentro de cada
+# etapa: importar este módulo es rápido y no carga ninguno de los dos.
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / 'data' / 'soundwave-data'
+RESULTS_DIR = ROOT / 'results' / 'problema1'
+CS = 1.0  # Velocidad del sonido (P = c_s² ρ)
+
+
+def context(data_dir=DATA_DIR, results_dir=None, profile=None):
+    """
+    Contexto compartido entre las etapas.
+
+    Args:
+        data_dir: Directorio de datos (var_XX.npy o salida nativa de PLUTO)
+        results_dir: Directorio de resultados (por defecto RESULTS_DIR, o
+            results/<perfil>/problema1 con un perfil distinto de publication)
+        profile: Perfil de renderizado (RenderProfile o nombre, ver presets.py)
+
+    Returns:
+        SimpleNamespace: Con `data_dir`, `results_dir` y `profile`; las etapas agregan el resto
+    """
+    profile = resolve_profile(profile)
+    if results_dir is None:
+        results_dir = profile.results_dir(RESULTS_DIR)
+    return SimpleNamespace(data_dir=Path(data_dir), results_dir=Path(results_dir), profile=profile)
+
+
+# ---------- Etapas ----------
+
+def load(ctx):
+    """Prepara resultados y abre el cubo de snapshots"""
+    # ---------- Limpieza de resultados anteriores ----------
+    # Incremental por defecto; FORCE_CLEAN=1 borra todo
+    from dataset import STORE_DIRNAME, open_store
+    from derived import Derived
+
+    clean_results_directory('problema1', results_dir=ctx.results_dir)
+    ctx.build = BuildManifest(ctx.results_dir)
+
+    # ---------- Carga de datos de simulación PLUTO ----------
+    # Cubo (tiempo, variable, celda) mapeado en memoria; también acepta una
+    # salida nativa de PLUTO (grid.out + dbl.out/flt.out) sin convertir
+    try:
+        # Si data/ es de solo lectura, el cubo se arma en results/.../.store
+        ctx.store = open_store(ctx.data_dir, fallback_dir=ctx.results_dir / STORE_DIRNAME)
+        ctx.x = ctx.store.coord('x1')
+    except (FileNotFoundError, KeyError):
+        raise SystemExit(f"❌ No se encontró x1 en {ctx.data_dir}. Asegúrate de que la carpeta 'data/soundwave-data/' esté en el directorio raíz del proyecto.")
+    ctx.rho_times = ctx.store.times_for('rho')
+    if not ctx.rho_times:
+        raise SystemExit(f"❌ No se encontraron archivos rho_*.npy en {ctx.data_dir}.")
+    # Tiempos de las figuras según la ventana del perfil (los análisis usan todos)
+    ctx.window = ctx.profile.window(ctx.rho_times)
+    if not ctx.window:
+        raise SystemExit(f"❌ No hay snapshots de rho entre t = {ctx.profile.t_start} y t = {ctx.profile.t_end}.")
+    # Magnitudes derivadas (presión, energías, Mach) memoizadas para todo el eje temporal
+    ctx.derived = Derived(ctx.store, cs=CS)
+
+
+def reduce(ctx):
+    """Estadísticas por tiempo en una sola pasada; de ellas sale el rango fijo de densidad"""
+    from stats import compute_stats
+
+    ctx.stats = compute_stats(ctx.store, ['rho'])
+    ctx.rho_ylim = ctx.stats['rho'].ylim(pad_frac=0.05)
 
-import numpy as np
-import matplotlib.pyplot as plt
-from utils import clean_results_directory, discover_times, ensure_dir, create_video_and_gif
-
-# ---------- Utilidades ----------
-
-def fixed_ylim(values, pad_frac=0.05):
-    vmin = float(np.min(values))
-    vmax = float(np.max(values))
-    if np.isclose(vmin, vmax):
-        # Evitar rango cero
-        delta = 1.0 if vmax == 0 else abs(vmax)*0.1
-        vmin -= delta
-        vmax += delta
-    pad = (vmax - vmin) * pad_frac
-    return vmin - pad, vmax + pad
-
-
-# ---------- Limpieza de resultados anteriores ----------
-# Limpiar resultados anteriores
-clean_results_directory('problema1')
-
-# ---------- Carga de datos de simulación PLUTO ----------
-data_dir = Path('../data/soundwave-data')
-x_path = data_dir / 'x1.npy'
-if not x_path.exists():
-    raise SystemExit(f"❌ No se encontró {x_path}. Asegúrate de que la carpeta 'data/soundwave-data/' esté en el directorio raíz del proyecto.")
-
-x = np.load(x_path)
-rho_times = discover_times(str(data_dir / 'rho_*.npy'))
-if not rho_times:
-    raise SystemExit("❌ No se encontraron archivos rho_*.npy en 'data/soundwave-data/'.")
-
-# Descubrir tiempos para velocidades
-vx1_times = discover_times(str(data_dir / 'vx1_*.npy'))
-vx2_times = discover_times(str(data_dir / 'vx2_*.npy'))
-vx3_times = discover_times(str(data_dir / 'vx3_*.npy'))
-
-# Rango fijo para densidad
-rhos_minmax = []
-for t in rho_times:
-    rho_t = np.load(data_dir / f'rho_{t:02d}.npy')
-    rhos_minmax.append((rho_t.min(), rho_t.max()))
-rho_min = min(v[0] for v in rhos_minmax)
-rho_max = max(v[1] for v in rhos_minmax)
-ymin, ymax = fixed_ylim([rho_min, rho_max], pad_frac=0.05)
-
-# ---------- Tarea 1: Generación de fotogramas y video de densidad ----------
-frames_dir = Path('../results/problema1/frames_density')
-ensure_dir(frames_dir)
-
-print(f"✨ Generando {len(rho_times)} fotogramas de densidad...")
-for t in rho_times:
-    rho_t = np.load(data_dir / f'rho_{t:02d}.npy')
-    fig, ax = plt.subplots(figsize=(7, 4))
-    ax.plot(x, rho_t, lw=2)
-    ax.set_title(f"Densidad ρ(x)  —  t = {t} (u.t.)")
-    ax.set_xlabel("x (u.l.)")
-    ax.set_ylabel("ρ (u.)")
-    ax.set_ylim(ymin, ymax)
-    ax.grid(True, alpha=0.3)
-    fig.tight_layout()
-    fname = frames_dir / f'density_{t:02d}.png'
-    fig.savefig(fname, dpi=180)
-    plt.close(fig)
-
-# ---------- Video y GIF a partir de los fotogramas ----------
-print("✨ Creando video MP4 y GIF de densidad...")
-mp4_ok, gif_ok = create_video_and_gif(
-    frames_dir=frames_dir,
-    output_base='../results/problema1/density',
-    fps=10,
-    file_pattern='density_%0{width}d.png'
-)
-
-# ---------- Tarea 4: Análisis de componentes de velocidad ----------
-if rho_times:
-    tA, tB = rho_times[0], rho_times[-1]
+
+def density_animation(ctx, workers=None):
+    """Tarea 1: Fotogramas, video y GIF de densidad"""
+    from render import resolve_keep_frames, stream_line_animation
+
+    profile = ctx.profile
+    if not profile.animates('rho', 'density'):
+        print(f"✨ Perfil {profile.name}: se omite la animación de densidad")
+        return
+    # Los fotogramas se envían directo a ffmpeg y al GIF; los PNG son opcionales
+    frames_dir = ctx.results_dir / 'frames_density'
+    keep_frames = resolve_keep_frames(profile.keep_frames)
+    if keep_frames:
+        ensure_dir(frames_dir)
+
+    times = profile.frame_times(ctx.rho_times)
+    print(f"✨ Generando {len(times)} fotogramas de densidad, video MP4 y GIF...")
+    stream_line_animation(
+        ctx.store, 'rho', 'x1',
+        [(t, f"Densidad ρ(x)  —  t = {t} (u.t.)",
+          frames_dir / f'density_{t:02d}.png' if keep_frames else None) for t in times],
+        xlabel="x (u.l.)", ylabel="ρ (u.)", ylim=ctx.rho_ylim,
+        output_base=ctx.results_dir / 'density',
+        fps=profile.fps,
+        workers=workers,
+        dpi=profile.dpi,
+        figsize=profile.figsize,
+        manifest=ctx.build,
+    )
+    ctx.build.save()
+
+
+def html_viewer(ctx):
+    """Visor HTML interactivo de ρ(x) y vx(x): datos comprimidos en lugar de fotogramas"""
+    from viewer import VIEWER_VERSION, resolve_dtype, write_viewer
+
+    store, build, profile = ctx.store, ctx.build, ctx.profile
+    labels = {'rho': "ρ (u.)", 'vx1': "vx (u.)"}
+    variables = [v for v in labels if v in store and profile.animates(v)]
+    if not variables:
+        return
+    times = set(ctx.window)
+    inputs = [store.coord_digest('x1')] + [store.digest(v, t) for v in variables
+                                           for t in store.times_for(v) if t in times]
+    out = ctx.results_dir / 'viewer.html'
+    dtype = resolve_dtype()
+    key = build.stale_key(out, inputs, {'dtype': dtype, 'fps': profile.fps, 'version': VIEWER_VERSION})
+    ctx.viewer = out  # report() solo lista el visor si está al día en esta ejecución
+    if not key:
+        print("✨ Sin cambios: visor HTML")
+        return
+    size = write_viewer(out, store, variables, 'x1', times=ctx.window, title="Problema 1: onda sonora",
+                        xlabel="x (u.l.)", dtype=dtype, labels=labels, fps=profile.fps)
+    build.record_output(out, key)
+    build.save()
+    print(f"✨ Visor HTML guardado como viewer.html ({size / 1024:.0f} KiB)")
+
+
+def velocity_plots(ctx):
+    """Tarea 4: Análisis de componentes de velocidad"""
+    from render import new_figure
+    from decimate import plot_line
+
+    store, build, profile = ctx.store, ctx.build, ctx.profile
+    tA, tB = ctx.window[0], ctx.window[-1]
     for t in (tA, tB):
         # Cargar componentes de velocidad
         vx_data = []
         labels = []
+        inputs = [store.coord_digest('x1')]
         for comp in ('vx1', 'vx2', 'vx3'):
-            fpath = data_dir / f'{comp}_{t:02d}.npy'
-            if fpath.exists():
-                vx = np.load(fpath)
-                vx_data.append(vx)
+            if store.has(comp, t):
+                vx_data.append(store.snapshot(comp, t))
                 labels.append(comp)
+                inputs.append(store.digest(comp, t))
             else:
                 vx_data.append(None)
                 labels.append(f"{comp} (no encontrado)")
 
-        fig, ax = plt.subplots(figsize=(7, 4))
+        out = ctx.results_dir / f'velocities_t{t:02d}.png'
+        style = {'title': f"Componentes de velocidad — t = {t}", 'xlabel': "x (u.l.)",
+                 'ylabel': "v (u.)", 'labels': labels, 'dpi': profile.dpi, 'figsize': profile.figsize}
+        key = build.stale_key(out, inputs, style)
+        if not key:
+            continue
+        fig, ax = new_figure(figsize=style['figsize'])
         for vx, lab in zip(vx_data, labels):
             if vx is not None:
-                ax.plot(x, vx, lw=2, label=lab)
-        ax.set_title(f"Componentes de velocidad — t = {t}")
-        ax.set_xlabel("x (u.l.)")
-        ax.set_ylabel("v (u.)")
+                plot_line(ax, ctx.x, vx, dpi=style['dpi'], lw=2, label=lab)
+        ax.set_title(style['title'])
+        ax.set_xlabel(style['xlabel'])
+        ax.set_ylabel(style['ylabel'])
         ax.grid(True, alpha=0.3)
         ax.legend()
         fig.tight_layout()
-        fig.savefig(f'../results/problema1/velocities_t{t:02d}.png', dpi=180)
-        plt.close(fig)
+        fig.savefig(out, dpi=style['dpi'])
+        build.record_output(out, key)
+    build.save()
     print(f"✨ Figuras de velocidad guardadas como velocities_t{tA:02d}.png y velocities_t{tB:02d}.png")
 
-# ---------- Tarea 5: Cálculo y visualización de presión ----------
-cs = 1.0  # Velocidad del sonido
-tP = rho_times[-1]
-rho_tP = np.load(data_dir / f'rho_{tP:02d}.npy')
-P_tP = (cs**2) * rho_tP  # P = c_s² * ρ
-
-fig, ax = plt.subplots(figsize=(7, 4))
-ax.plot(x, P_tP, lw=2)
-ax.set_title(f"Presión P(x) = c_s^2 · ρ(x)  —  t = {tP}  (c_s = {cs})")
-ax.set_xlabel("x (u.l.)")
-ax.set_ylabel("P (u.)")
-ax.grid(True, alpha=0.3)
-fig.tight_layout()
-fig.savefig(f'../results/problema1/pressure_t{tP:02d}.png', dpi=180)
-plt.close(fig)
-print(f"✨ Figura de presión guardada como pressure_t{tP:02d}.png")
-
-print("🔥 Archivos generados en results/problema1/:")
-print(" - Videos: density.mp4 y density.gif")
-print(" - Análisis: velocities_t{tA:02d}.png, velocities_t{tB:02d}.png, pressure_t{tP:02d}.png")
-print(" - Fotogramas: frames_density/*.png")
+
+def pressure_plot(ctx):
+    """Tarea 5: Cálculo y visualización de presión"""
+    from render import new_figure
+    from decimate import plot_line
+
+    store, build, profile = ctx.store, ctx.build, ctx.profile
+    cs = CS
+    tP = ctx.window[-1]
+    out = ctx.results_dir / f'pressure_t{tP:02d}.png'
+    style = {'title': f"Presión P(x) = c_s^2 · ρ(x)  —  t = {tP}  (c_s = {cs})",
+             'xlabel': "x (u.l.)", 'ylabel': "P (u.)", 'cs': cs, 'dpi': profile.dpi,
+             'figsize': profile.figsize}
+    key = build.stale_key(out, [store.digest('rho', tP), store.coord_digest('x1')], style)
+    if key:
+        P_tP = ctx.derived.at('pressure', tP)  # P = c_s² * ρ
+
+        fig, ax = new_figure(figsize=style['figsize'])
+        plot_line(ax, ctx.x, P_tP, dpi=style['dpi'], lw=2)
+        ax.set_title(style['title'])
+        ax.set_xlabel(style['xlabel'])
+        ax.set_ylabel(style['ylabel'])
+        ax.grid(True, alpha=0.3)
+        fig.tight_layout()
+        fig.savefig(out, dpi=style['dpi'])
+        build.record_output(out, key)
+        build.save()
+    print(f"✨ Figura de presión guardada como pressure_t{tP:02d}.png")
+
+
+def dispersion_analysis(ctx):
+    """Relación de dispersión ω–k de ρ y vx y velocidad del sonido medida"""
+    from spectral import dispersion, plot_dispersion
+
+    store, build, profile = ctx.store, ctx.build, ctx.profile
+    variables = [v for v in ('rho', 'vx1') if v in store]
+    inputs = [store.coord_digest('x1')] + [store.digest(v, t) for v in variables
+                                           for t in store.times_for(v)]
+    out_png = ctx.results_dir / 'dispersion_rho.png'
+    out_txt = ctx.results_dir / 'dispersion.txt'
+    key_png = build.stale_key(out_png, inputs, {'cs': CS, 'dpi': profile.dpi, 'figsize': profile.figsize})
+    key_txt = build.stale_key(out_txt, inputs, {'cs': CS})
+    if not (key_png or key_txt):
+        print("✨ Sin cambios: dispersión")
+        return
+
+    spectra = dispersion(store, variables, 'x1')
+    speeds = {var: spec.phase_speed()['v_phase'] for var, spec in spectra.items()}
+    lines = []
+    for var, v in speeds.items():
+        if v is None:
+            lines.append(f" - v_fase medida ({var}): sin datos (tiempos no equiespaciados o amplitud nula)")
+        else:
+            lines.append(f" - v_fase medida ({var}) = {v:.6g} u.l./u.t.")
+    v_rho = speeds.get('rho')
+    if v_rho is not None:
+        # El enunciado usa el índice del snapshot como tiempo; si c_s = 1 de verdad,
+        # la separación física entre snapshots es v_medida / c_s
+        lines.append(f" - c_s teórica = {CS:g} → Δt implícito entre snapshots ≈ {v_rho / CS:.4g}")
+    if key_png and 'rho' in spectra and spectra['rho'].power is not None:
+        marks = [(v_rho, f"v medida = {v_rho:.3g}")] if v_rho is not None else []
+        plot_dispersion(spectra['rho'], out_png, marks,
+                        xlabel="k (1/u.l.)", ylabel="ω (1/u.t.)",
+                        title="Relación de dispersión de ρ", dpi=profile.dpi,
+                        figsize=profile.figsize)
+        build.record_output(out_png, key_png)
+    if key_txt:
+        with open(out_txt, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        build.record_output(out_txt, key_txt)
+    build.save()
+    print("🔥 Dispersión: \n" + "\n".join(lines))
+
+
+def front_tracking(ctx):
+    """Frentes de densidad y velocidad y sus reflexiones en las paredes"""
+    import numpy as np
+    from fronts import track_waves
+
+    store, build = ctx.store, ctx.build
+    inputs = [store.coord_digest('x1')] + [store.digest('rho', t) for t in ctx.rho_times]
+    out_txt = ctx.results_dir / 'fronts.txt'
+    out_csv = ctx.results_dir / 'fronts.csv'
+    key_txt = build.stale_key(out_txt, inputs)
+    key_csv = build.stale_key(out_csv, inputs)
+    if not (key_txt or key_csv):
+        print("✨ Sin cambios: frentes")
+        return
+
+    track = track_waves(store, 'rho', 'x1', ctx.rho_times)
+    lines = track.summary_lines()
+    if key_txt:
+        with open(out_txt, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        build.record_output(out_txt, key_txt)
+    if key_csv:
+        np.savetxt(out_csv, track.table(), delimiter=',', fmt='%.6g',
+                   header='t,pico,frente_izq,frente_der,amplitud,v_izq,v_der', comments='')
+        build.record_output(out_csv, key_csv)
+    build.save()
+    print("🔥 Frentes y reflexiones: \n" + "\n".join(lines))
+
+
+def conservation_diagnostics(ctx):
+    """Masa y energía en las paredes reflectivas: diagnósticos de conservación por snapshot"""
+    from diagnostics import THRESHOLDS, conservation
+
+    store, build = ctx.store, ctx.build
+    inputs = [store.coord_digest('x1')] + [store.digest(v, t) for v in store.variables
+                                           for t in store.times_for(v)]
+    params = {'cs': CS, 'thresholds': THRESHOLDS}
+    out_txt = ctx.results_dir / 'diagnostics.txt'
+    out_csv = ctx.results_dir / 'diagnostics.csv'
+    key_txt = build.stale_key(out_txt, inputs, params)
+    key_csv = build.stale_key(out_csv, inputs, params)
+    if not (key_txt or key_csv):
+        print("✨ Sin cambios: diagnósticos")
+        return
+
+    try:
+        diag = conservation(ctx.derived, 'x1')
+    except KeyError as exc:
+        print(f"⚠️ Sin diagnósticos de conservación: {exc}")
+        return
+    lines = diag.summary_lines()
+    if key_txt:
+        with open(out_txt, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        build.record_output(out_txt, key_txt)
+    if key_csv:
+        diag.write_csv(out_csv)
+        build.record_output(out_csv, key_csv)
+    build.save()
+    print("🩺 Diagnósticos de conservación: \n" + "\n".join(lines))
+
+
+def report(ctx):
+    from render import resolve_keep_frames
+
+    tA, tB, tP = ctx.window[0], ctx.window[-1], ctx.window[-1]
+    print(f"🔥 Archivos generados en {ctx.results_dir}/ (perfil {ctx.profile.name}):")
+    if ctx.profile.animates('rho', 'density'):
+        print(" - Videos: density.mp4 y density.gif")
+    if getattr(ctx, 'viewer', None) is not None:
+        print(" - Visor interactivo: viewer.html")
+    print(f" - Análisis: velocities_t{tA:02d}.png, velocities_t{tB:02d}.png, pressure_t{tP:02d}.png")
+    print(" - Dispersión: dispersion_rho.png y dispersion.txt")
+    print(" - Frentes y reflexiones: fronts.txt y fronts.csv")
+    print(" - Diagnósticos de conservación: diagnostics.txt y diagnostics.csv")
+    if ctx.profile.animates('rho', 'density') and resolve_keep_frames(ctx.profile.keep_frames):
+        print(" - Fotogramas: frames_density/*.png")
+
+
+# ---------- Grafo de tareas ----------
+
+def add_tasks(graph, render_workers=None, prefix='problema1', data_dir=DATA_DIR, results_dir=None,
+              profile=None):
+    """
+    Agrega las etapas del Problema 1 a un grafo de tareas.
+
+    Args:
+        graph: TaskGraph
+        render_workers: Procesos para la animación (ocupa ese número de slots)
+        prefix: Prefijo de los nombres de tarea
+        data_dir: Directorio de datos
+        results_dir: Directorio de resultados (ver context)
+        profile: Perfil de renderizado (ver presets.py)
+
+    Returns:
+        SimpleNamespace: Contexto compartido entre las etapas
+    """
+    from render import resolve_workers
+
+    ctx = context(data_dir, results_dir, profile)
+    render_workers = resolve_workers(render_workers)
+    load_t = graph.add(f'{prefix}:carga', lambda: load(ctx))
+    reduce_t = graph.add(f'{prefix}:estadisticas', lambda: reduce(ctx), deps=[load_t])
+    anim_t = graph.add(f'{prefix}:densidad', lambda: density_animation(ctx, render_workers),
+                       deps=[reduce_t], slots=render_workers)
+    view_t = graph.add(f'{prefix}:visor', lambda: html_viewer(ctx), deps=[load_t])
+    vel_t = graph.add(f'{prefix}:velocidades', lambda: velocity_plots(ctx), deps=[load_t])
+    pres_t = graph.add(f'{prefix}:presion', lambda: pressure_plot(ctx), deps=[load_t])
+    disp_t = graph.add(f'{prefix}:dispersion', lambda: dispersion_analysis(ctx), deps=[load_t])
+    front_t = graph.add(f'{prefix}:frentes', lambda: front_tracking(ctx), deps=[load_t])
+    diag_t = graph.add(f'{prefix}:diagnostico', lambda: conservation_diagnostics(ctx), deps=[load_t])
+    graph.add(f'{prefix}:resumen', lambda: report(ctx),
+              deps=[anim_t, view_t, vel_t, pres_t, disp_t, front_t, diag_t])
+    return ctx
+
+
+def run(data_dir=DATA_DIR, results_dir=None, workers=None, profile=None):
+    """
+    Ejecuta el Problema 1 completo.
+
+    Args:
+        data_dir: Directorio de datos
+        results_dir: Directorio de resultados (ver context)
+        workers: Procesos (por defecto RENDER_WORKERS o número de CPUs)
+        profile: Perfil de renderizado (ver presets.py)
+
+    Returns:
+        tuple: (ok, ctx); ok es False si alguna etapa falló
+    """
+    from render import resolve_workers
+
+    workers = resolve_workers(workers)
+    graph = TaskGraph(workers)
+    ctx = add_tasks(graph, render_workers=workers, data_dir=data_dir, results_dir=results_dir,
+                    profile=profile)
+    ok = graph.run()
+    graph.report()
+    # Solo con PROFILE=1 o PROFILE=chrome
+    write_trace(ctx.results_dir)
+    return ok, ctx
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Problema 1: onda sonora")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Procesos (por defecto RENDER_WORKERS o número de CPUs)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    ok, _ = run(workers=args.workers, profile=profile_from_args(args))
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
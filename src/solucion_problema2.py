@@ -4,37 +4,72 @@
 
 🎯 Tareas Implementadas:
 1. Visualización de Bx(z), Bz(z), vx(z) con rangos fijos según ejercicio
+   + Visor HTML interactivo de Bx, Bz, vx, By y vy (datos comprimidos, sin PNG)
 2. Verificación de perturbación perpendicular: By ≈ 0, vy ≈ 0
 3. Cálculo de condiciones iniciales: ρ₀, B₀, velocidad de Alfvén v_A
 4. Análisis de amplitud de perturbación y clasificación del régimen
 5. Determinación si es régimen sub-Alfvénico o súper-Alfvénico
+   + Relación de dispersión ω–k y velocidad de fase medida frente a v_A
+   + Diagnósticos de conservación y de By, vy en todos los snapshots
 
 📁 Datos requeridos: data/alfvenwave-data/
 🔥 Resultados: results/problema2/
 
-Ejecutar desde src/: python solucion_problema2.py
+Ejecutar: python src/solucion_problema2.py [--render preview] [--vars Bx vx]
+
+Uso como biblioteca (importar el módulo no lee datos ni borra resultados):
+    import solucion_problema2 as p2
+    ok, ctx = p2.run(data_dir, results_dir)
+    m = p2.alfven_metrics(rho0, B0)              # sin NumPy ni matplotlib
 """
-import math
 from pathlib import Path
+from types import SimpleNamespace
+
+from utils import clean_results_directory, ensure_dir
+from manifest import BuildManifest
+from scheduler import TaskGraph
+from profiling import write_trace
+from presets import add_arguments, profile_from_args, resolve_profile
+
+# NumPy, matplotlib y los módulos que los usan se importan dentro de cada
+# etapa: importar este módulo es rápido y no carga ninguno de los dos.
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / 'data' / 'alfvenwave-data'
+RESULTS_DIR = ROOT / 'results' / 'problema2'
+
+# Animaciones: (nombre, variable PLUTO, rango fijo o None para calcularlo de los datos)
+ANIMATIONS = (
+    ('Bx', 'bx1', (-1.0, 1.0)),  # fijo según el ejercicio
+    ('Bz', 'bx3', None),
+    ('vx', 'vx1', (-1.0, 1.0)),  # fijo según el ejercicio
+)
 
-import numpy as np
-import matplotlib.pyplot as plt
-from utils import clean_results_directory, discover_times, ensure_dir, create_video_and_gif
+# Variables del visor HTML además de las animaciones: (nombre, variable PLUTO)
+VIEWER_EXTRA = (
+    ('By', 'bx2'),
+    ('vy', 'vx2'),
+)
 
 # ---------- Utilidades ----------
 
-def fixed_ylim_from_series(series_list, pad_frac=0.05, symmetric=False):
-    vmin = min(float(np.min(s)) for s in series_list if s is not None and s.size > 0)
-    vmax = max(float(np.max(s)) for s in series_list if s is not None and s.size > 0)
-    if symmetric:
-        m = max(abs(vmin), abs(vmax))
-        vmin, vmax = -m, m
-    if np.isclose(vmin, vmax):
-        delta = 1.0 if vmax == 0 else abs(vmax)*0.1
-        vmin -= delta
-        vmax += delta
-    pad = (vmax - vmin) * pad_frac
-    return vmin - pad, vmax + pad
+def context(data_dir=DATA_DIR, results_dir=None, profile=None):
+    """
+    Contexto compartido entre las etapas.
+
+    Args:
+        data_dir: Directorio de datos (var_XX.npy o salida nativa de PLUTO)
+        results_dir: Directorio de resultados (por defecto RESULTS_DIR, o
+            results/<perfil>/problema2 con un perfil distinto de publication)
+        profile: Perfil de renderizado (RenderProfile o nombre, ver presets.py)
+
+    Returns:
+        SimpleNamespace: Con `data_dir`, `results_dir` y `profile`; las etapas agregan el resto
+    """
+    profile = resolve_profile(profile)
+    if results_dir is None:
+        results_dir = profile.results_dir(RESULTS_DIR)
+    return SimpleNamespace(data_dir=Path(data_dir), results_dir=Path(results_dir), profile=profile)
 
 
 def write_summary(path, lines):
@@ -42,186 +77,496 @@ def write_summary(path, lines):
         for L in lines:
             f.write(str(L).rstrip() + '\n')
 
-# ---------- Limpieza de resultados anteriores ----------
-# Limpiar resultados anteriores
-clean_results_directory('problema2')
-
-# ---------- Carga de datos de simulación PLUTO ----------
-data_dir = Path('../data/alfvenwave-data')
-z_path = data_dir / 'x3.npy'
-if not z_path.exists():
-    raise SystemExit(f"❌ No se encontró {z_path}. Asegúrate de que la carpeta 'data/alfvenwave-data/' esté en el directorio raíz del proyecto.")
-
-z = np.load(z_path)
-
-# Descubrir tiempos disponibles
-time_candidates = []
-for base in ('vx1', 'bx1', 'bx3'):
-    time_candidates += discover_times(str(data_dir / f'{base}_*.npy'))
-
-times = sorted(set(time_candidates))
-if not times:
-    raise SystemExit("❌ No se encontraron archivos *_*.npy en 'data/alfvenwave-data/' (vx1, bx1 o bx3).")
-
-# Cargar series de datos
-Bx_series = []
-Bz_series = []
-vx_series = []
-
-for t in times:
-    bx1 = data_dir / f'bx1_{t:02d}.npy'
-    if bx1.exists():
-        Bx_series.append(np.load(bx1))
-    bz3 = data_dir / f'bx3_{t:02d}.npy'
-    if bz3.exists():
-        Bz_series.append(np.load(bz3))
-    vx1 = data_dir / f'vx1_{t:02d}.npy'
-    if vx1.exists():
-        vx_series.append(np.load(vx1))
-
-# Rangos según requisitos del ejercicio
-Bx_ylim = (-1.0, 1.0)  # fijo
-Bz_ylim = fixed_ylim_from_series(Bz_series, pad_frac=0.05)
-vx_ylim = (-1.0, 1.0)  # fijo 
-
-# ---------- Tarea 1: Videos de Bx(z), Bz(z), vx(z) ----------
-def make_frames_and_video(varname, series_name, ylim):
-    frames_dir = Path(f'../results/problema2/frames_{varname}')
-    ensure_dir(frames_dir)
-
-    print(f"✨ Generando fotogramas para {varname}...")
-    for t in times:
-        fpath = data_dir / f'{series_name}_{t:02d}.npy'
-        if not fpath.exists():
-            continue
-        y = np.load(fpath)
-        fig, ax = plt.subplots(figsize=(7, 4))
-        ax.plot(z, y, lw=2)
-        ax.set_title(f"{varname}(z) — t = {t}")
-        ax.set_xlabel("z (u.l.)")
-        ax.set_ylabel(varname + " (u.)")
-        ax.set_ylim(*ylim)
+
+def make_frames_and_video(store, times, varname, series_name, ylim, results_dir, build=None, workers=None,
+                          profile=None):
+    from render import resolve_keep_frames, stream_line_animation
+
+    profile = resolve_profile(profile)
+    frames_dir = results_dir / f'frames_{varname}'
+    keep_frames = resolve_keep_frames(profile.keep_frames)
+    if keep_frames:
+        ensure_dir(frames_dir)
+    times = profile.frame_times([t for t in times if store.has(series_name, t)])
+
+    print(f"✨ Generando fotogramas, video MP4 y GIF para {varname}...")
+    mp4_ok, gif_ok = stream_line_animation(
+        store, series_name, 'x3',
+        [(t, f"{varname}(z) — t = {t}", frames_dir / f'{t:02d}.png' if keep_frames else None)
+         for t in times],
+        xlabel="z (u.l.)", ylabel=varname + " (u.)", ylim=ylim,
+        output_base=results_dir / varname,
+        fps=profile.fps,
+        workers=workers,
+        dpi=profile.dpi,
+        figsize=profile.figsize,
+        manifest=build,
+    )
+    if build is not None:
+        build.save()
+    return mp4_ok, gif_ok
+
+
+# ---------- Etapas ----------
+
+def load(ctx):
+    """Prepara resultados y abre el cubo de snapshots"""
+    from dataset import STORE_DIRNAME, open_store
+    from derived import Derived
+
+    # ---------- Limpieza de resultados anteriores ----------
+    # Incremental por defecto; FORCE_CLEAN=1 borra todo
+    clean_results_directory('problema2', results_dir=ctx.results_dir)
+    ctx.build = BuildManifest(ctx.results_dir)
+
+    # ---------- Carga de datos de simulación PLUTO ----------
+    # Cubo (tiempo, variable, celda) mapeado en memoria; también acepta una
+    # salida nativa de PLUTO (grid.out + dbl.out/flt.out) sin convertir
+    try:
+        # Si data/ es de solo lectura, el cubo se arma en results/.../.store
+        ctx.store = open_store(ctx.data_dir, fallback_dir=ctx.results_dir / STORE_DIRNAME)
+        ctx.z = ctx.store.coord('x3')
+    except (FileNotFoundError, KeyError):
+        raise SystemExit(f"❌ No se encontró x3 en {ctx.data_dir}. Asegúrate de que la carpeta 'data/alfvenwave-data/' esté en el directorio raíz del proyecto.")
+
+    # Descubrir tiempos disponibles
+    time_candidates = []
+    for base in ('vx1', 'bx1', 'bx3'):
+        time_candidates += ctx.store.times_for(base)
+
+    ctx.times = sorted(set(time_candidates))
+    if not ctx.times:
+        raise SystemExit(f"❌ No se encontraron archivos *_*.npy en {ctx.data_dir} (vx1, bx1 o bx3).")
+    # Tiempos de las figuras según la ventana del perfil (los análisis usan todos)
+    ctx.window = ctx.profile.window(ctx.times)
+    if not ctx.window:
+        raise SystemExit(f"❌ No hay snapshots entre t = {ctx.profile.t_start} y t = {ctx.profile.t_end}.")
+    # Magnitudes derivadas (|B|, v_A local, Mach) memoizadas para todo el eje temporal
+    ctx.derived = Derived(ctx.store)
+
+
+def reduce(ctx):
+    """Estadísticas por variable y por tiempo en una sola pasada sobre el cubo"""
+    from stats import compute_stats
+
+    ctx.stats = compute_stats(ctx.store, ['rho', 'bx1', 'bx3', 'vx1'])
+
+
+def animation(ctx, varname, series_name, ylim, workers=None):
+    """Tarea 1: Video de Bx(z), Bz(z) o vx(z)"""
+    if not ctx.profile.animates(varname, series_name):
+        print(f"✨ Perfil {ctx.profile.name}: se omite la animación de {varname}")
+        return
+    if ylim is None:
+        ylim = ctx.stats[series_name].ylim(pad_frac=0.05)
+    make_frames_and_video(ctx.store, ctx.times, varname, series_name, ylim, ctx.results_dir, ctx.build, workers,
+                          ctx.profile)
+
+
+def html_viewer(ctx):
+    """Visor HTML interactivo de las variables animadas y de By, vy (deberían ser ≈ 0)"""
+    from viewer import VIEWER_VERSION, resolve_dtype, write_viewer
+
+    store, build, profile = ctx.store, ctx.build, ctx.profile
+    entries = [(name, var, ylim) for name, var, ylim in ANIMATIONS] + [(n, v, None) for n, v in VIEWER_EXTRA]
+    entries = [e for e in entries if e[1] in store and profile.animates(e[0], e[1])]
+    if not entries:
+        return
+    labels = {var: f"{name} (u.)" for name, var, _ in entries}
+    ylims = {var: ylim for _, var, ylim in entries if ylim is not None}
+    times = set(ctx.window)
+    inputs = [store.coord_digest('x3')] + [store.digest(var, t) for _, var, _ in entries
+                                           for t in store.times_for(var) if t in times]
+    out = ctx.results_dir / 'viewer.html'
+    dtype = resolve_dtype()
+    key = build.stale_key(out, inputs, {'dtype': dtype, 'fps': profile.fps, 'ylims': ylims,
+                                        'version': VIEWER_VERSION})
+    ctx.viewer = out  # report() solo lista el visor si está al día en esta ejecución
+    if not key:
+        print("✨ Sin cambios: visor HTML")
+        return
+    size = write_viewer(out, store, list(labels), 'x3', times=ctx.window, title="Problema 2: onda de Alfvén",
+                        xlabel="z (u.l.)", dtype=dtype, labels=labels, ylims=ylims, fps=profile.fps)
+    build.record_output(out, key)
+    build.save()
+    print(f"✨ Visor HTML guardado como viewer.html ({size / 1024:.0f} KiB)")
+
+
+def check_transverse(ctx):
+    """Tarea 3: Verificación de By y vy (deberían ser ≈ 0)"""
+    from render import new_figure
+    from decimate import plot_line
+
+    store, build, profile = ctx.store, ctx.build, ctx.profile
+    t_check = ctx.window[len(ctx.window)//2]
+    has_by = store.has('bx2', t_check)
+    has_vy = store.has('vx2', t_check)
+    out = ctx.results_dir / f'by_vy_t{t_check:02d}.png'
+    style = {'title': f"By y vy — t = {t_check} (deberían ser ≈ 0)", 'xlabel': "z (u.l.)",
+             'ylabel': "magnitud (u.)", 'dpi': profile.dpi, 'figsize': profile.figsize}
+    inputs = [store.coord_digest('x3')]
+    inputs += [store.digest(v, t_check) if store.has(v, t_check) else None for v in ('bx2', 'vx2')]
+    key = build.stale_key(out, inputs, style)
+    if (has_by or has_vy) and key:
+        fig, ax = new_figure(figsize=style['figsize'])
+        if has_by:
+            by = store.snapshot('bx2', t_check)
+            plot_line(ax, ctx.z, by, dpi=style['dpi'], lw=2, label='By')
+        if has_vy:
+            vy = store.snapshot('vx2', t_check)
+            plot_line(ax, ctx.z, vy, dpi=style['dpi'], lw=2, label='vy')
+        ax.set_title(style['title'])
+        ax.set_xlabel(style['xlabel'])
+        ax.set_ylabel(style['ylabel'])
         ax.grid(True, alpha=0.3)
+        ax.legend()
         fig.tight_layout()
-        fig.savefig(frames_dir / f'{t:02d}.png', dpi=180)
-        plt.close(fig)
-
-    print(f"✨ Creando video MP4 y GIF para {varname}...")
-    mp4_ok, gif_ok = create_video_and_gif(
-        frames_dir=frames_dir,
-        output_base=f'../results/problema2/{varname}',
-        fps=10,
-        file_pattern='%0{width}d.png'
-    )
+        fig.savefig(out, dpi=style['dpi'])
+        build.record_output(out, key)
+        build.save()
+
+
+def initial_conditions(ctx):
+    """Tarea 4: Condiciones iniciales ρ₀ y B₀"""
+    from render import new_figure
+    from decimate import plot_line
+
+    store, build, stats, profile = ctx.store, ctx.build, ctx.stats, ctx.profile
+    ctx.rho0 = None
+    ctx.B0 = None
+    if store.has('rho', 0):
+        ctx.rho0 = stats['rho'].at(0)['mean']
+        out = ctx.results_dir / 'rho_t00.png'
+        style = {'title': r'$\rho(z)$ en $t=0$', 'xlabel': "z (u.l.)", 'ylabel': "ρ (u.)",
+                 'dpi': profile.dpi, 'figsize': profile.figsize}
+        key = build.stale_key(out, [store.digest('rho', 0), store.coord_digest('x3')], style)
+        if key:
+            rho_init = store.snapshot('rho', 0)
+            # Gráfica de densidad inicial
+            fig, ax = new_figure(figsize=style['figsize'])
+            plot_line(ax, ctx.z, rho_init, dpi=style['dpi'], lw=2)
+            ax.set_title(style['title'])
+            ax.set_xlabel(style['xlabel'])
+            ax.set_ylabel(style['ylabel'])
+            ax.grid(True, alpha=0.3)
+            fig.tight_layout()
+            fig.savefig(out, dpi=style['dpi'])
+            build.record_output(out, key)
+    if store.has('bx3', 0):
+        B0 = ctx.B0 = stats['bx3'].at(0)['mean']
+        out = ctx.results_dir / 'bz_t00.png'
+        style = {'title': r'$B_z(z)$ en $t=0$ (se espera $B_0 \approx 1$)', 'xlabel': "z (u.l.)",
+                 'ylabel': "Bz (u.)", 'label': f'B0 ≈ {B0:.3g} (promedio)', 'dpi': profile.dpi,
+                 'figsize': profile.figsize}
+        key = build.stale_key(out, [store.digest('bx3', 0), store.coord_digest('x3')], style)
+        if key:
+            bz_init = store.snapshot('bx3', 0)
+            # Gráfica de campo magnético inicial
+            fig, ax = new_figure(figsize=style['figsize'])
+            plot_line(ax, ctx.z, bz_init, dpi=style['dpi'], lw=2)
+            ax.axhline(B0, ls='--', alpha=0.6, label=style['label'])
+            ax.set_title(style['title'])
+            ax.set_xlabel(style['xlabel'])
+            ax.set_ylabel(style['ylabel'])
+            ax.grid(True, alpha=0.3)
+            ax.legend()
+            fig.tight_layout()
+            fig.savefig(out, dpi=style['dpi'])
+            build.record_output(out, key)
+    build.save()
+
+
+def amplitude_plot(ctx):
+    """Tarea 5: Amplitud de perturbación por tiempo"""
+    from render import new_figure
+
+    store, build, profile = ctx.store, ctx.build, ctx.profile
+    # Semi-rango y máximo absoluto precalculados
+    vx_stats = ctx.stats.get('vx1')
+    if vx_stats is None or not len(vx_stats):
+        return
+    ts = vx_stats.times
+    Avals = vx_stats.half_range
+
+    out = ctx.results_dir / 'vx_amp_over_time.png'
+    style = {'title': "Amplitud (max-min)/2 de vx por tiempo", 'xlabel': "t (índice)",
+             'ylabel': "Amplitud de vx (u.)", 'dpi': profile.dpi, 'figsize': profile.figsize}
+    key = build.stale_key(out, [store.digest('vx1', t) for t in ts], style)
+    if key:
+        fig, ax = new_figure(figsize=style['figsize'])
+        ax.plot(ts, Avals, lw=2, marker='o')
+        ax.set_title(style['title'])
+        ax.set_xlabel(style['xlabel'])
+        ax.set_ylabel(style['ylabel'])
+        ax.grid(True, alpha=0.3)
+        fig.tight_layout()
+        fig.savefig(out, dpi=style['dpi'])
+        build.record_output(out, key)
+        build.save()
+
+
+def dispersion_analysis(ctx):
+    """Relación de dispersión ω–k de vx y Bx y velocidad de fase medida"""
+    from spectral import dispersion, plot_dispersion
+
+    store, build, profile = ctx.store, ctx.build, ctx.profile
+    # Espectros de todos los snapshots en una FFT por lotes (rápido: se calcula siempre)
+    spectra = dispersion(store, ['vx1', 'bx1'], 'x3')
+    ctx.phase_speeds = {var: spec.phase_speed()['v_phase'] for var, spec in spectra.items()}
+    if 'vx1' not in spectra or spectra['vx1'].power is None:
+        return
+
+    out = ctx.results_dir / 'dispersion_vx.png'
+    inputs = [store.coord_digest('x3')] + [store.digest('vx1', t) for t in store.times_for('vx1')]
+    key = build.stale_key(out, inputs, {'dpi': profile.dpi, 'figsize': profile.figsize})
+    if key:
+        v = ctx.phase_speeds['vx1']
+        marks = [(v, f"v medida = {v:.3g}")] if v is not None else []
+        plot_dispersion(spectra['vx1'], out, marks,
+                        xlabel="k (1/u.l.)", ylabel="ω (1/u.t.)",
+                        title="Relación de dispersión de vx", dpi=profile.dpi,
+                        figsize=profile.figsize)
+        build.record_output(out, key)
+        build.save()
+
+
+def local_mach(derived):
+    """
+    Máximo del Mach Alfvénico local |v|/v_A(z, t) sobre todas las celdas y tiempos.
+
+    Args:
+        derived: derived.Derived del almacén
+
+    Returns:
+        float o None si faltan ρ, B o v
+    """
+    if 'mach_alfven' not in derived:
+        return None
+    return float(derived.stats('mach_alfven').absmax.max())
+
+
+def alfven_metrics(rho0, B0, vx_stats=None, phase_speeds=None, mach_local=None):
+    """
+    Velocidad de Alfvén y régimen Alfvénico de una corrida.
+
+    Args:
+        rho0: Densidad media en t=0 (o None)
+        B0: Bz medio en t=0 (o None)
+        vx_stats: SeriesStats de vx1 (o None)
+        phase_speeds: {variable: velocidad de fase medida}; las None (sin
+            espectro, ver spectral.py) se omiten
+        mach_local: Máximo del Mach Alfvénico local (ver local_mach)
+
+    Returns:
+        dict: Solo las magnitudes que se pudieron calcular ('rho0', 'B0',
+            'v_A', 'vx_max', 'M_A', 'regime', 'M_A_local', 'v_phase_<var>',
+            'v_phase_over_vA')
+    """
+    m = {}
+    if rho0 is not None:
+        m['rho0'] = rho0
+    if B0 is not None:
+        m['B0'] = B0
+    if (rho0 is not None) and (B0 is not None):
+        m['v_A'] = B0 / rho0 ** 0.5  # Factor 1/sqrt(4π) absorbido en unidades de PLUTO
+    if vx_stats is not None and len(vx_stats):
+        m['vx_max'] = float(vx_stats.absmax.max())
+        if 'v_A' in m:
+            m['M_A'] = m['vx_max'] / m['v_A']
+            m['regime'] = 'sub' if m['M_A'] < 1 else 'super'
+    if mach_local is not None:
+        m['M_A_local'] = mach_local
+    for var, v in (phase_speeds or {}).items():
+        if v is not None:
+            m[f'v_phase_{var}'] = v
+    if 'v_A' in m and 'v_phase_vx1' in m:
+        m['v_phase_over_vA'] = m['v_phase_vx1'] / m['v_A']
+    return m
+
+
+def summary_lines(m):
+    """Líneas de resumen.txt a partir de alfven_metrics"""
+    lines = []
+    if 'rho0' in m:
+        lines.append(f" - rho0 (promedio en t=0) = {m['rho0']:.6g}")
+    if 'B0' in m:
+        lines.append(f" - B0 (promedio de Bz en t=0) = {m['B0']:.6g}")
+    if 'v_A' in m:
+        lines.append(f" - v_A = B0 / sqrt(rho0) = {m['v_A']:.6g}")
+
+    # ---------- Análisis de amplitud y régimen Alfvénico ----------
+    if 'vx_max' in m:
+        lines.append(f" - Amplitud máxima |vx| observada = {m['vx_max']:.6g}")
+    if 'M_A' in m:
+        regime = "sub-Alfvénico (M_A < 1)" if m['regime'] == 'sub' else "súper-Alfvénico (M_A >= 1)"
+        lines.append(f" - Mach Alfvénico aproximado M_A = |vx|max / v_A = {m['M_A']:.6g} → {regime}")
+    if 'M_A_local' in m:
+        lines.append(f" - Mach Alfvénico local máximo max |v| / v_A(z, t) = {m['M_A_local']:.6g}")
+
+    # ---------- Velocidad de fase medida (análisis espectral) ----------
+    for key, v in m.items():
+        if key.startswith('v_phase_') and key != 'v_phase_over_vA':
+            lines.append(f" - v_fase medida ({key[len('v_phase_'):]}) = {v:.6g} u.l./u.t.")
+    if 'v_phase_over_vA' in m:
+        # El tiempo es el índice del snapshot: si la onda viaja a v_A, la
+        # separación física entre snapshots es v_medida / v_A
+        lines.append(f" - v_fase / v_A = {m['v_phase_over_vA']:.4g} "
+                     "(= Δt implícito entre snapshots si la onda viaja a v_A)")
+    return lines
+
+
+def summary(ctx):
+    """
+    Velocidad de Alfvén, régimen Alfvénico y resumen.txt.
+
+    Las velocidades de fase se agregan solo si la etapa de dispersión las
+    calculó: si falló, el resumen se escribe igual sin ellas.
+    """
+    metrics = alfven_metrics(ctx.rho0, ctx.B0, ctx.stats.get('vx1'),
+                             getattr(ctx, 'phase_speeds', None),
+                             local_mach(ctx.derived))
+    lines = summary_lines(metrics)
+
+    # ---------- Escribir resumen ----------
+    if lines:
+        out = ctx.results_dir / 'resumen.txt'
+        key = ctx.build.stale_key(out, [], lines)
+        if key:
+            write_summary(out, lines)
+            ctx.build.record_output(out, key)
+            ctx.build.save()
+        print("🔥 Resumen: \n" + "\n".join(lines))
+
+
+def conservation_diagnostics(ctx):
+    """Masa, energía, By y vy en todos los snapshots: diagnósticos de conservación"""
+    from diagnostics import THRESHOLDS, conservation
+
+    store, build = ctx.store, ctx.build
+    inputs = [store.coord_digest('x3')] + [store.digest(v, t) for v in store.variables
+                                           for t in store.times_for(v)]
+    params = {'cs': ctx.derived.params['cs'], 'thresholds': THRESHOLDS}
+    out_txt = ctx.results_dir / 'diagnostics.txt'
+    out_csv = ctx.results_dir / 'diagnostics.csv'
+    key_txt = build.stale_key(out_txt, inputs, params)
+    key_csv = build.stale_key(out_csv, inputs, params)
+    if not (key_txt or key_csv):
+        print("✨ Sin cambios: diagnósticos")
+        return
+
+    try:
+        diag = conservation(ctx.derived, 'x3')
+    except KeyError as exc:
+        print(f"⚠️ Sin diagnósticos de conservación: {exc}")
+        return
+    lines = diag.summary_lines()
+    if key_txt:
+        with open(out_txt, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        build.record_output(out_txt, key_txt)
+    if key_csv:
+        diag.write_csv(out_csv)
+        build.record_output(out_csv, key_csv)
+    build.save()
+    print("🩺 Diagnósticos de conservación: \n" + "\n".join(lines))
+
+
+def report(ctx):
+    animated = [v for v, s, _ in ANIMATIONS if ctx.profile.animates(v, s)]
+    print(f"🔥 Archivos generados en {ctx.results_dir}/ (perfil {ctx.profile.name}):")
+    if animated:
+        print(f" - Videos: {', '.join(v + '.mp4' for v in animated)} y sus respectivos GIFs")
+    if getattr(ctx, 'viewer', None) is not None:
+        print(" - Visor interactivo: viewer.html")
+    print(" - Análisis: by_vy_tXX.png, rho_t00.png, bz_t00.png, vx_amp_over_time.png, dispersion_vx.png")
+    print(" - Resumen: resumen.txt")
+    print(" - Diagnósticos de conservación: diagnostics.txt y diagnostics.csv")
+
+
+# ---------- Grafo de tareas ----------
+
+def add_tasks(graph, render_workers=None, prefix='problema2', data_dir=DATA_DIR, results_dir=None,
+              profile=None):
+    """
+    Agrega las etapas del Problema 2 a un grafo de tareas.
+
+    Args:
+        graph: TaskGraph
+        render_workers: Procesos por animación (cada una ocupa ese número de slots)
+        prefix: Prefijo de los nombres de tarea
+        data_dir: Directorio de datos
+        results_dir: Directorio de resultados (ver context)
+        profile: Perfil de renderizado (ver presets.py)
+
+    Returns:
+        SimpleNamespace: Contexto compartido entre las etapas
+    """
+    from render import resolve_workers
+
+    ctx = context(data_dir, results_dir, profile)
+    render_workers = resolve_workers(render_workers)
+    load_t = graph.add(f'{prefix}:carga', lambda: load(ctx))
+    reduce_t = graph.add(f'{prefix}:estadisticas', lambda: reduce(ctx), deps=[load_t])
+    final = []
+    for varname, series_name, ylim in ANIMATIONS:
+        # Con rango fijo la animación no necesita esperar a las estadísticas
+        deps = [load_t] if ylim is not None else [reduce_t]
+        final.append(graph.add(
+            f'{prefix}:{varname}',
+            lambda v=varname, s=series_name, y=ylim: animation(ctx, v, s, y, render_workers),
+            deps=deps, slots=render_workers))
+    final.append(graph.add(f'{prefix}:visor', lambda: html_viewer(ctx), deps=[load_t]))
+    final.append(graph.add(f'{prefix}:by_vy', lambda: check_transverse(ctx), deps=[load_t]))
+    init_t = graph.add(f'{prefix}:iniciales', lambda: initial_conditions(ctx), deps=[reduce_t])
+    amp_t = graph.add(f'{prefix}:amplitud', lambda: amplitude_plot(ctx), deps=[reduce_t])
+    disp_t = graph.add(f'{prefix}:dispersion', lambda: dispersion_analysis(ctx), deps=[load_t])
+    final.append(disp_t)
+    # La dispersión solo fija el orden: si falla, el resumen sale sin velocidades de fase
+    final.append(graph.add(f'{prefix}:resumen', lambda: summary(ctx), deps=[load_t, init_t, amp_t],
+                           after=[disp_t]))
+    final.append(graph.add(f'{prefix}:diagnostico', lambda: conservation_diagnostics(ctx), deps=[load_t]))
+    graph.add(f'{prefix}:listado', lambda: report(ctx), deps=final)
+    return ctx
+
+
+def run(data_dir=DATA_DIR, results_dir=None, workers=None, profile=None):
+    """
+    Ejecuta el Problema 2 completo.
+
+    Args:
+        data_dir: Directorio de datos
+        results_dir: Directorio de resultados (ver context)
+        workers: Procesos (por defecto RENDER_WORKERS o número de CPUs)
+        profile: Perfil de renderizado (ver presets.py)
+
+    Returns:
+        tuple: (ok, ctx); ok es False si alguna etapa falló
+    """
+    from render import resolve_workers
+
+    workers = resolve_workers(workers)
+    graph = TaskGraph(workers)
+    ctx = add_tasks(graph, render_workers=max(1, workers // len(ANIMATIONS)),
+                    data_dir=data_dir, results_dir=results_dir, profile=profile)
+    ok = graph.run()
+    graph.report()
+    # Solo con PROFILE=1 o PROFILE=chrome
+    write_trace(ctx.results_dir)
+    return ok, ctx
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Problema 2: onda de Alfvén")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Procesos (por defecto RENDER_WORKERS o número de CPUs)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    ok, _ = run(workers=args.workers, profile=profile_from_args(args))
+    if not ok:
+        raise SystemExit(1)
+
 
-make_frames_and_video('Bx', 'bx1', Bx_ylim)
-make_frames_and_video('Bz', 'bx3', Bz_ylim)
-make_frames_and_video('vx', 'vx1', vx_ylim)
-
-# ---------- Tarea 3: Verificación de By y vy (deberían ser ≈ 0) ----------
-t_check = times[len(times)//2]
-by_path = data_dir / f'bx2_{t_check:02d}.npy'
-vy_path = data_dir / f'vx2_{t_check:02d}.npy'
-if by_path.exists() or vy_path.exists():
-    fig, ax = plt.subplots(figsize=(7, 4))
-    if by_path.exists():
-        by = np.load(by_path)
-        ax.plot(z, by, lw=2, label='By')
-    if vy_path.exists():
-        vy = np.load(vy_path)
-        ax.plot(z, vy, lw=2, label='vy')
-    ax.set_title(f"By y vy — t = {t_check} (deberían ser ≈ 0)")
-    ax.set_xlabel("z (u.l.)")
-    ax.set_ylabel("magnitud (u.)")
-    ax.grid(True, alpha=0.3)
-    ax.legend()
-    fig.tight_layout()
-    fig.savefig(f'../results/problema2/by_vy_t{t_check:02d}.png', dpi=180)
-    plt.close(fig)
-
-# ---------- Tarea 4: Condiciones iniciales y velocidad de Alfvén ----------
-summary_lines = []
-rho0 = None
-B0 = None
-rho0_path = data_dir / 'rho_00.npy'
-bz0_path = data_dir / 'bx3_00.npy'
-if rho0_path.exists():
-    rho_init = np.load(rho0_path)
-    rho0 = float(np.mean(rho_init))
-    # Gráfica de densidad inicial
-    fig, ax = plt.subplots(figsize=(7, 4))
-    ax.plot(z, rho_init, lw=2)
-    ax.set_title(r'$\rho(z)$ en $t=0$')
-    ax.set_xlabel("z (u.l.)")
-    ax.set_ylabel("ρ (u.)")
-    ax.grid(True, alpha=0.3)
-    fig.tight_layout()
-    fig.savefig('../results/problema2/rho_t00.png', dpi=180)
-    plt.close(fig)
-    summary_lines.append(f" - rho0 (promedio en t=0) = {rho0:.6g}")
-if bz0_path.exists():
-    bz_init = np.load(bz0_path)
-    B0 = float(np.mean(bz_init))
-    # Gráfica de campo magnético inicial
-    fig, ax = plt.subplots(figsize=(7, 4))
-    ax.plot(z, bz_init, lw=2)
-    ax.axhline(B0, ls='--', alpha=0.6, label=f'B0 ≈ {B0:.3g} (promedio)')
-    ax.set_title(r'$B_z(z)$ en $t=0$ (se espera $B_0 \approx 1$)')
-    ax.set_xlabel("z (u.l.)")
-    ax.set_ylabel("Bz (u.)")
-    ax.grid(True, alpha=0.3)
-    ax.legend()
-    fig.tight_layout()
-    fig.savefig('../results/problema2/bz_t00.png', dpi=180)
-    plt.close(fig)
-    summary_lines.append(f" - B0 (promedio de Bz en t=0) = {B0:.6g}")
-
-if (rho0 is not None) and (B0 is not None):
-    vA = B0 / math.sqrt(rho0)  # Factor 1/sqrt(4π) absorbido en unidades de PLUTO
-    summary_lines.append(f" - v_A = B0 / sqrt(rho0) = {vA:.6g}")
-else:
-    vA = None
-
-# ---------- Tarea 5: Análisis de amplitud y régimen Alfvénico ----------
-amp_by_time = []
-for t in times:
-    fp = data_dir / f'vx1_{t:02d}.npy'
-    if not fp.exists():
-        continue
-    v = np.load(fp)
-    # Calcular amplitud de perturbación
-    A = 0.5 * (float(np.max(v)) - float(np.min(v)))
-    Aabs = float(np.max(np.abs(v)))
-    amp_by_time.append((t, A, Aabs))
-
-if amp_by_time:
-    ts = [t for (t, A, Aabs) in amp_by_time]
-    Avals = [A for (t, A, Aabs) in amp_by_time]
-    Aabsvals = [Aabs for (t, A, Aabs) in amp_by_time]
-
-    fig, ax = plt.subplots(figsize=(7, 4))
-    ax.plot(ts, Avals, lw=2, marker='o')
-    ax.set_title("Amplitud (max-min)/2 de vx por tiempo")
-    ax.set_xlabel("t (índice)")
-    ax.set_ylabel("Amplitud de vx (u.)")
-    ax.grid(True, alpha=0.3)
-    fig.tight_layout()
-    fig.savefig('../results/problema2/vx_amp_over_time.png', dpi=180)
-    plt.close(fig)
-
-    Amax = max(Aabsvals)
-    summary_lines.append(f" - Amplitud máxima |vx| observada = {Amax:.6g}")
-    if vA is not None:
-        MA = Amax / vA
-        regime = "sub-Alfvénico (M_A < 1)" if MA < 1 else "súper-Alfvénico (M_A >= 1)"
-        summary_lines.append(f" - Mach Alfvénico aproximado M_A = |vx|max / v_A = {MA:.6g} → {regime}")
-
-# ---------- Escribir resumen ----------
-if summary_lines:
-    write_summary('../results/problema2/resumen.txt', summary_lines)
-    print("🔥 Resumen: \n" + "\n".join(summary_lines))
-
-print("🔥 Archivos generados en results/problema2/:")
-print(" - Videos: Bx.mp4, Bz.mp4, vx.mp4 y sus respectivos GIFs")
-print(" - Análisis: by_vy_tXX.png, rho_t00.png, bz_t00.png, vx_amp_over_time.png")
-print(" - Resumen: resumen.txt")
+if __name__ == "__main__":
+    main()
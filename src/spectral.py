@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+🌊 Análisis espectral: relación de dispersión y velocidad de fase
+
+Apila todos los snapshots de una o varias variables en un array
+(variable, tiempo, espacio) y calcula su transformada de Fourier 2D en una
+sola operación por lotes (FFT espacial de todos los tiempos y variables, y
+luego FFT temporal de todos los modos). De ahí salen:
+
+- el espectro de potencia ω–k (diagrama de dispersión), y
+- la velocidad de fase medida v = ω/k de los modos espaciales dominantes.
+
+Con series cortas (pocas oscilaciones registradas) el pico de la FFT temporal
+tiene poca resolución, así que la frecuencia de cada modo dominante se
+refina con un ajuste de mínimos cuadrados de una sinusoide con media libre
+(periodograma de Lomb–Scargle generalizado), evaluado para todos los modos y
+frecuencias candidatas a la vez.
+
+La memoria no crece con el producto de todo: la FFT temporal se hace de a
+una variable y solo sobre los K_BAND modos de menor k, y el ajuste recorre
+las frecuencias candidatas en bloques de FIT_CHUNK elementos.
+
+Si los snapshots no están equiespaciados en el tiempo (falta alguno) o los
+modos dominantes no tienen potencia (amplitud nula), no hay espectro ω o
+velocidad de fase: phase_speed devuelve v_phase = None en vez de fallar.
+
+Los tiempos son los índices de snapshot (como en el enunciado: rho_20.npy es
+t = 20) salvo que el almacén traiga el tiempo físico (PLUTO: sim_time) o se
+indique `dt`.
+"""
+import numpy as np
+
+from profiling import profiled
+
+# Relleno con ceros de la FFT temporal (interpola el espectro en ω)
+PAD_TIME = 4
+# Frecuencias candidatas del ajuste por mínimos cuadrados
+OMEGA_GRID = 2000
+REFINE_GRID = 201
+# Modos espaciales dominantes usados para la velocidad de fase
+N_MODES = 3
+# Modos espaciales (los de menor k) que se conservan en el espectro ω–k
+K_BAND = 256
+# Elementos (frecuencia × tiempo × modo) por bloque del ajuste
+FIT_CHUNK = 1 << 21
+
+
+def time_axis(store, times, dt=None):
+    """
+    Tiempos de los snapshots `times`.
+
+    Args:
+        store: Almacén (si tiene `sim_time` se usa el tiempo físico)
+        times: Índices de snapshot
+        dt: Intervalo entre snapshots consecutivos (fuerza t = índice · dt)
+
+    Returns:
+        ndarray: Tiempos
+    """
+    if dt is None and getattr(store, 'sim_time', None) is not None:
+        lookup = dict(zip(store.times, store.sim_time))
+        return np.array([lookup[t] for t in times], dtype=np.float64)
+    return np.asarray(times, dtype=np.float64) * (1.0 if dt is None else dt)
+
+
+def _uniform_step(values, name):
+    values = np.asarray(values, dtype=np.float64)
+    if values.size < 2:
+        raise ValueError(f"Se necesitan al menos dos valores de {name}")
+    steps = np.diff(values)
+    if not np.allclose(steps, steps[0], rtol=1e-3):
+        raise ValueError(f"El análisis espectral requiere {name} uniformemente espaciado")
+    return float(steps.mean())
+
+
+def _is_uniform(values):
+    """Si hay al menos dos valores equiespaciados (ver _uniform_step)"""
+    try:
+        _uniform_step(values, '')
+    except ValueError:
+        return False
+    return True
+
+
+def fit_frequencies(modes, t, omega, chunk=FIT_CHUNK):
+    """
+    Frecuencia de cada modo por mínimos cuadrados (sinusoide + media libre).
+
+    Para cada ω candidata resuelve a(t) ≈ A cos(ωt) + B sin(ωt) + C para
+    todos los modos a la vez y se queda con la ω de menor residuo. Cada ω
+    se resuelve con sus ecuaciones normales 3×3, recorriendo las ω en
+    bloques: la memoria es O(chunk), no O(ω · tiempo).
+
+    Args:
+        modes: Amplitudes complejas (tiempo, modo)
+        t: Tiempos
+        omega: Frecuencias candidatas
+        chunk: Elementos (ω × tiempo × modo) por bloque
+
+    Returns:
+        tuple: (ω de cada modo, fracción de varianza explicada de cada modo)
+    """
+    t = np.asarray(t, dtype=np.float64) - t[0]
+    modes = np.asarray(modes)
+    nt, nm = modes.shape
+    mode_sums = modes.sum(axis=0)
+    resid = np.empty((omega.size, nm))
+    step = max(1, chunk // max(1, nt * nm))
+    for i in range(0, omega.size, step):
+        phase = np.outer(omega[i:i + step], t)                      # (W, T)
+        c, s = np.cos(phase), np.sin(phase)
+        gram = np.empty((len(phase), 3, 3))
+        gram[:, 0, 0] = (c * c).sum(axis=1)
+        gram[:, 1, 1] = (s * s).sum(axis=1)
+        gram[:, 2, 2] = nt
+        gram[:, 0, 1] = gram[:, 1, 0] = (c * s).sum(axis=1)
+        gram[:, 0, 2] = gram[:, 2, 0] = c.sum(axis=1)
+        gram[:, 1, 2] = gram[:, 2, 1] = s.sum(axis=1)
+        rhs = np.stack([c @ modes, s @ modes, np.broadcast_to(mode_sums, (len(phase), nm))],
+                       axis=1)                                      # (W, 3, M)
+        coef = np.linalg.pinv(gram) @ rhs                           # (W, 3, M)
+        fit = c[:, :, None] * coef[:, None, 0] + s[:, :, None] * coef[:, None, 1] + coef[:, None, 2]
+        resid[i:i + step] = (np.abs(modes[None] - fit) ** 2).sum(axis=1)
+    best = resid.argmin(axis=0)
+    total = (np.abs(modes - modes.mean(axis=0)) ** 2).sum(axis=0)
+    explained = 1.0 - resid[best, np.arange(modes.shape[1])] / np.where(total > 0, total, 1.0)
+    return omega[best], explained
+
+
+class DispersionSpectrum:
+    """
+    Espectro ω–k de una variable.
+
+    Atributos:
+        var: Nombre de la variable
+        k: Números de onda (≥ 0)
+        omega: Frecuencias angulares (ordenadas, negativas y positivas)
+        power: Potencia |F(ω, k)|² con forma (omega, k); omega y power son
+            None si los tiempos no están equiespaciados
+        modes: Amplitudes complejas de cada modo espacial por tiempo (tiempo, k)
+        t: Tiempos usados
+    """
+
+    def __init__(self, var, k, omega, power, modes, t):
+        self.var = var
+        self.k = k
+        self.omega = omega
+        self.power = power
+        self.modes = modes
+        self.t = t
+
+    def dominant_modes(self, n=N_MODES):
+        """Índices de los `n` modos espaciales (k > 0) con más varianza temporal"""
+        var = (np.abs(self.modes - self.modes.mean(axis=0)) ** 2).sum(axis=0)
+        var[self.k == 0] = -1
+        return np.argsort(var)[::-1][:n]
+
+    def ridge(self):
+        """|ω| de máxima potencia para cada k (cresta del diagrama de dispersión)"""
+        power = self.power.copy()
+        power[self.omega == 0, :] = 0
+        return np.abs(self.omega[power.argmax(axis=0)])
+
+    def phase_speed(self, n=N_MODES):
+        """
+        Velocidad de fase medida con los modos dominantes.
+
+        Returns:
+            dict: {'v_phase': promedio ponderado por varianza, 'k': k del modo
+            principal, 'omega': su ω, 'modes': [(k, ω, v, varianza explicada), ...]};
+            v_phase, k y omega son None si los tiempos no están
+            equiespaciados o los modos no tienen potencia
+        """
+        unknown = {'v_phase': None, 'k': None, 'omega': None, 'modes': []}
+        if self.power is None or len(self.t) < 3:
+            return unknown
+        idx = self.dominant_modes(n)
+        idx = idx[self.k[idx] > 0]
+        weights = (np.abs(self.modes[:, idx] - self.modes[:, idx].mean(axis=0)) ** 2).sum(axis=0)
+        if not weights.sum() > 0:
+            return unknown
+        span = self.t[-1] - self.t[0]
+        dt = span / (len(self.t) - 1)
+        # Desde un cuarto de oscilación en toda la serie hasta Nyquist
+        omega = np.linspace(0.5 * np.pi / span, np.pi / dt, OMEGA_GRID)
+        modes = self.modes[:, idx]
+        freqs, explained = fit_frequencies(modes, self.t, omega)
+        # Segunda pasada con una malla fina alrededor de cada mínimo
+        step = omega[1] - omega[0]
+        for i, w in enumerate(freqs):
+            local = np.linspace(max(w - step, omega[0]), w + step, REFINE_GRID)
+            (freqs[i],), (explained[i],) = fit_frequencies(modes[:, i:i + 1], self.t, local)
+        speeds = freqs / self.k[idx]
+        return {
+            'v_phase': float(np.average(speeds, weights=weights)),
+            'k': float(self.k[idx[0]]),
+            'omega': float(freqs[0]),
+            'modes': [(float(k), float(w), float(v), float(e))
+                      for k, w, v, e in zip(self.k[idx], freqs, speeds, explained)],
+        }
+
+
+def omega_k_spectra(series, x, t, names=None, pad=PAD_TIME, k_band=K_BAND):
+    """
+    Espectros ω–k de varias series (variable, tiempo, espacio), de a una variable.
+
+    Args:
+        series: Array (variable, tiempo, espacio) o (tiempo, espacio)
+        x: Coordenadas espaciales (uniformes)
+        t: Tiempos (sin espectro ω si no están equiespaciados)
+        names: Nombres de las variables
+        pad: Factor de relleno con ceros de la FFT temporal
+        k_band: Modos espaciales de menor k que se conservan
+
+    Returns:
+        list: DispersionSpectrum por variable
+
+    Raises:
+        ValueError: Si las coordenadas espaciales no son uniformes
+    """
+    if np.ndim(series) == 2:
+        series = [series]
+    names = list(names) if names is not None else [str(i) for i in range(len(series))]
+    t = np.asarray(t, dtype=np.float64)
+    dx = _uniform_step(x, 'el espacio')
+    dt = _uniform_step(t, 'el tiempo') if _is_uniform(t) else None
+
+    spectra = []
+    for name, data in zip(names, series):
+        nt, nx = np.shape(data)
+        k = (2 * np.pi * np.fft.rfftfreq(nx, dx))[:k_band]
+        # FFT espacial por bloques de tiempos, quedándose solo con la banda de k bajos
+        modes = np.empty((nt, k.size), dtype=np.complex128)           # (T, K)
+        rows = max(1, FIT_CHUNK // nx)
+        for i in range(0, nt, rows):
+            block = np.asarray(data[i:i + rows], dtype=np.float64)
+            modes[i:i + rows] = np.fft.rfft(block, axis=1)[:, :k.size]
+        omega = power = None
+        if dt is not None:
+            # FFT temporal de todos los modos, sin la media temporal (ω = 0)
+            spec = np.fft.fft(modes - modes.mean(axis=0), n=pad * nt, axis=0)
+            power = np.abs(spec)
+            del spec
+            power **= 2
+            power = np.fft.fftshift(power, axes=0)
+            omega = np.fft.fftshift(2 * np.pi * np.fft.fftfreq(pad * nt, dt))
+        spectra.append(DispersionSpectrum(name, k, omega, power, modes, t))
+    return spectra
+
+
+@profiled()
+def dispersion(store, variables, coord, times=None, dt=None):
+    """
+    Espectros ω–k de variables de un almacén 1D.
+
+    Args:
+        store: SnapshotStore o PlutoStore
+        variables: Variables a analizar (las que no existen se ignoran)
+        coord: Coordenada espacial ('x1' o 'x3')
+        times: Snapshots a usar (por defecto los comunes a todas las variables)
+        dt: Intervalo entre snapshots (ver time_axis)
+
+    Returns:
+        dict: {variable: DispersionSpectrum}
+    """
+    variables = [v for v in variables if v in store]
+    if not variables:
+        return {}
+    if times is None:
+        common = set(store.times_for(variables[0]))
+        for v in variables[1:]:
+            common &= set(store.times_for(v))
+        times = sorted(common)
+    # Una variable a la vez: nunca se apila (variable, tiempo, celda)
+    x = store.coord(coord)
+    t = time_axis(store, times, dt)
+    return {v: omega_k_spectra(store.series(v, times), x, t, [v])[0] for v in variables}
+
+
+def plot_dispersion(spec, path, speeds=(), xlabel="k", ylabel="ω", title=None, dpi=180,
+                    figsize=(7, 4)):
+    """
+    Guarda el diagrama de dispersión (log10 de la potencia) con rectas ω = v·k.
+
+    Args:
+        spec: DispersionSpectrum
+        path: Archivo PNG de salida
+        speeds: [(v, etiqueta), ...] rectas a superponer
+        dpi, figsize: Resolución y tamaño de la figura en pulgadas
+    """
+    from render import new_figure
+
+    fig, ax = new_figure(figsize=figsize)
+    half = spec.omega >= 0
+    power = spec.power[half]
+    logp = np.log10(power + power.max() * 1e-12)
+    mesh = ax.pcolormesh(spec.k, spec.omega[half], logp, shading='nearest', cmap='magma')
+    fig.colorbar(mesh, ax=ax, label="log10 potencia")
+    ax.plot(spec.k, spec.ridge(), 'c.', ms=4, label="cresta")
+    for v, label in speeds:
+        ax.plot(spec.k, v * spec.k, '--', lw=1.5, label=label)
+    ax.set_ylim(0, spec.omega[half].max())
+    ax.set_xlim(0, spec.k.max())
+    ax.set_title(title or f"Relación de dispersión de {spec.var}")
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.legend(loc='upper left', fontsize=8)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+📊 Estadísticas por variable y por tiempo
+
+Motor de reducciones vectorizadas: en una sola pasada sobre el cubo
+(tiempo, variable, celda) calcula, para cada variable y cada snapshot, el
+mínimo, máximo, promedio, máximo absoluto y semi-rango. Los datos se recorren
+en bloques de tiempo, así que también funciona con cubos que no caben en
+memoria. Límites de gráficas, amplitudes y condiciones iniciales se leen de
+estas estadísticas en lugar de volver a recorrer los arrays.
+"""
+import numpy as np
+
+from profiling import profiled
+
+# Tamaño máximo de cada bloque leído del cubo
+CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def fixed_ylim(vmin, vmax, pad_frac=0.05, symmetric=False):
+    """
+    Rango fijo con margen para el eje vertical.
+
+    Args:
+        vmin, vmax: Extremos de los datos
+        pad_frac: Margen relativo al rango
+        symmetric: Centrar el rango en cero
+
+    Returns:
+        tuple: (ymin, ymax)
+    """
+    vmin, vmax = float(vmin), float(vmax)
+    if symmetric:
+        m = max(abs(vmin), abs(vmax))
+        vmin, vmax = -m, m
+    if np.isclose(vmin, vmax):
+        # Evitar rango cero
+        delta = 1.0 if vmax == 0 else abs(vmax)*0.1
+        vmin -= delta
+        vmax += delta
+    pad = (vmax - vmin) * pad_frac
+    return vmin - pad, vmax + pad
+
+
+class SeriesStats:
+    """
+    Estadísticas por snapshot de una variable.
+
+    Atributos (arrays alineados con `times`): min, max, mean, absmax y
+    half_range = (max - min) / 2.
+    """
+
+    def __init__(self, times, vmin, vmax, mean):
+        self.times = list(times)
+        self.min = np.asarray(vmin, dtype=np.float64)
+        self.max = np.asarray(vmax, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.absmax = np.maximum(np.abs(self.min), np.abs(self.max))
+        self.half_range = 0.5 * (self.max - self.min)
+        self._t_index = {t: i for i, t in enumerate(self.times)}
+
+    def __len__(self):
+        return len(self.times)
+
+    def __contains__(self, t):
+        return t in self._t_index
+
+    def at(self, t):
+        """Estadísticas del snapshot `t` como diccionario"""
+        i = self._t_index[t]
+        return {'min': float(self.min[i]), 'max': float(self.max[i]),
+                'mean': float(self.mean[i]), 'absmax': float(self.absmax[i]),
+                'half_range': float(self.half_range[i])}
+
+    @property
+    def global_min(self):
+        return float(self.min.min())
+
+    @property
+    def global_max(self):
+        return float(self.max.max())
+
+    def ylim(self, pad_frac=0.05, symmetric=False):
+        """Rango fijo que contiene todos los snapshots (ver fixed_ylim)"""
+        return fixed_ylim(self.global_min, self.global_max, pad_frac, symmetric)
+
+
+def _rows_per_chunk(row_bytes, chunk_bytes):
+    return max(1, int(chunk_bytes // max(1, row_bytes)))
+
+
+def reduce_series(series, times=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Estadísticas de un array (tiempo, celda), recorrido en bloques de tiempo.
+
+    Args:
+        series: Array o memmap (tiempo, ...); se reduce sobre todas las celdas
+        times: Tiempos de cada fila (por defecto 0..T-1)
+        chunk_bytes: Tamaño máximo de cada bloque
+
+    Returns:
+        SeriesStats
+    """
+    n = series.shape[0]
+    times = list(range(n)) if times is None else list(times)
+    flat = series.reshape(n, -1)
+    out = np.empty((3, n))
+    step = _rows_per_chunk(flat[0].nbytes if n else 1, chunk_bytes)
+    for t0 in range(0, n, step):
+        block = np.asarray(flat[t0:t0 + step])
+        out[0, t0:t0 + step] = block.min(axis=1)
+        out[1, t0:t0 + step] = block.max(axis=1)
+        out[2, t0:t0 + step] = block.mean(axis=1, dtype=np.float64)
+    return SeriesStats(times, out[0], out[1], out[2])
+
+
+@profiled()
+def compute_stats(store, variables=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Estadísticas de varias variables de un SnapshotStore en una sola pasada.
+
+    El cubo se lee una vez, en bloques de tiempo que contienen todas las
+    variables pedidas; si un solo snapshot no cabe en un bloque (mallas 2D/3D
+    grandes) también se divide en bloques de celdas. Los snapshots ausentes
+    se excluyen.
+
+    Args:
+        store: SnapshotStore
+        variables: Variables a reducir (por defecto todas; las que no existen
+            en el almacén se ignoran)
+        chunk_bytes: Tamaño máximo de cada bloque
+
+    Returns:
+        dict: {variable: SeriesStats}
+    """
+    variables = [v for v in (store.variables if variables is None else variables) if v in store]
+    if not variables:
+        return {}
+    iv = [store.var_index(v) for v in variables]
+    cube = store.cube
+    n, _, ncells = cube.shape
+    out = np.empty((3, n, len(iv)))
+    row_bytes = ncells * len(iv) * cube.dtype.itemsize
+    step = _rows_per_chunk(row_bytes, chunk_bytes)
+    cstep = ncells if row_bytes <= chunk_bytes else _rows_per_chunk(len(iv) * cube.dtype.itemsize, chunk_bytes)
+    for t0 in range(0, n, step):
+        t1 = min(n, t0 + step)
+        vmin = np.full((t1 - t0, len(iv)), np.inf)
+        vmax = np.full((t1 - t0, len(iv)), -np.inf)
+        total = np.zeros((t1 - t0, len(iv)))
+        for c0 in range(0, ncells, cstep):
+            block = np.asarray(cube[t0:t1, iv, c0:c0 + cstep])
+            np.minimum(vmin, block.min(axis=2), out=vmin)
+            np.maximum(vmax, block.max(axis=2), out=vmax)
+            total += block.sum(axis=2, dtype=np.float64)
+        out[0, t0:t1] = vmin
+        out[1, t0:t1] = vmax
+        out[2, t0:t1] = total / ncells
+
+    result = {}
+    for k, var in enumerate(variables):
+        rows = store.present[:, iv[k]]
+        result[var] = SeriesStats([t for t, ok in zip(store.times, rows) if ok],
+                                  out[0, rows, k], out[1, rows, k], out[2, rows, k])
+    return result
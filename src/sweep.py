@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+🧮 Barrido de parámetros: análisis de muchas corridas de onda de Alfvén
+
+Analiza varios directorios de simulación (por ejemplo, un barrido en
+amplitud o en densidad) en paralelo, un proceso por corrida, con las mismas
+magnitudes que resumen.txt del Problema 2 (ρ₀, B₀, v_A, |vx|max, M_A, M_A local,
+régimen y velocidad de fase medida) y los diagnósticos de conservación
+(derivas de masa y energía, umbrales violados), sin animaciones. Escribe:
+
+- results/sweep/sweep.csv: una fila por corrida
+- results/sweep/sweep_MA.png: M_A frente al parámetro del barrido
+
+El valor del parámetro de cada corrida se lee de la sección [Parameters] de
+su pluto.ini o, si no está ahí, del nombre del directorio (amp_0.1,
+amp=0.1, amp0.1...). Sin --param las corridas se ordenan por nombre.
+
+Ejecutar:
+    python src/sweep.py runs/amp_* --param amp [--workers N]
+"""
+import argparse
+import csv
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from dataset import STORE_DIRNAME, open_store
+from stats import compute_stats
+from spectral import dispersion
+from render import new_figure, resolve_workers
+from utils import ensure_dir
+from derived import Derived
+from diagnostics import conservation
+from solucion_problema2 import alfven_metrics, local_mach
+
+RESULTS_DIR = Path(__file__).resolve().parent.parent / 'results' / 'sweep'
+TABLE_NAME = 'sweep.csv'
+PLOT_NAME = 'sweep_MA.png'
+
+# Columnas de la tabla, en orden; las magnitudes que falten quedan vacías
+COLUMNS = ('run', 'param', 'rho0', 'B0', 'v_A', 'vx_max', 'M_A', 'regime', 'M_A_local',
+           'v_phase_vx1', 'v_phase_bx1', 'v_phase_over_vA', 'mass_drift', 'energy_drift',
+           'violations', 'n_times', 'error')
+
+_NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+
+
+def read_ini_parameter(path, name):
+    """Valor numérico de `name` en la sección [Parameters] de un pluto.ini (o None)"""
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    section = None
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if line.startswith('['):
+            section = line.strip('[]').strip().lower()
+        elif section == 'parameters' and line:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].lower() == name.lower():
+                try:
+                    return float(parts[1])
+                except ValueError:
+                    return None
+    return None
+
+
+def sweep_parameter(run_dir, name):
+    """
+    Valor del parámetro `name` de una corrida.
+
+    Busca primero en pluto.ini (del directorio o del directorio padre, ya
+    que PLUTO suele escribir los datos en un subdirectorio) y luego en el
+    nombre del directorio.
+
+    Returns:
+        float o None
+    """
+    run_dir = Path(run_dir)
+    for ini in (run_dir / 'pluto.ini', run_dir.parent / 'pluto.ini'):
+        value = read_ini_parameter(ini, name)
+        if value is not None:
+            return value
+    m = re.search(rf'(?:^|[^a-z0-9]){re.escape(name)}[=_-]?({_NUMBER})(?:$|[^0-9])',
+                  run_dir.name, re.IGNORECASE)
+    return float(m.group(1)) if m else None
+
+
+def analyze_run(run_dir, param=None, store_root=None):
+    """
+    Magnitudes de resumen de una corrida (se ejecuta en un proceso del pool).
+
+    Args:
+        run_dir: Directorio de la corrida
+        param: Nombre del parámetro del barrido (o None)
+        store_root: Directorio para el cubo si la corrida es de solo lectura
+
+    Returns:
+        dict: Fila de la tabla; si la corrida no se puede analizar, 'error'
+            guarda el repr de la excepción (un fallo no corta el barrido)
+    """
+    row = {'run': str(run_dir)}
+    if param:
+        row['param'] = sweep_parameter(run_dir, param)
+    try:
+        store = open_store(run_dir, fallback_dir=store_root)
+        stats = compute_stats(store, ['rho', 'bx3', 'vx1'])
+        rho0 = stats['rho'].at(0)['mean'] if store.has('rho', 0) else None
+        B0 = stats['bx3'].at(0)['mean'] if store.has('bx3', 0) else None
+        speeds = {var: spec.phase_speed()['v_phase']
+                  for var, spec in dispersion(store, ['vx1', 'bx1'], 'x3').items()}
+        derived = Derived(store)
+        row.update(alfven_metrics(rho0, B0, stats.get('vx1'), speeds, local_mach(derived)))
+        row.update(conservation_checks(derived))
+        row['n_times'] = len(store.times_for('vx1'))
+    except Exception as exc:
+        row['error'] = repr(exc)
+    return row
+
+
+def conservation_checks(derived):
+    """Derivas máximas de masa y energía y umbrales violados (ver diagnostics.py)"""
+    try:
+        diag = conservation(derived, 'x3')
+    except KeyError:
+        return {}
+    return {'mass_drift': diag.worst('deriva_masa')[1],
+            'energy_drift': diag.worst('deriva_energia')[1],
+            'violations': ';'.join(v[0] for v in diag.violations())}
+
+
+def run_sweep(run_dirs, param=None, workers=None, store_root=None):
+    """
+    Analiza las corridas en paralelo.
+
+    Args:
+        run_dirs: Directorios de simulación
+        param: Nombre del parámetro del barrido (o None)
+        workers: Procesos (por defecto RENDER_WORKERS o número de CPUs)
+        store_root: Directorio para los cubos de las corridas de solo lectura
+
+    Returns:
+        list: Filas (ver analyze_run), ordenadas por parámetro y nombre
+    """
+    run_dirs = [Path(d) for d in run_dirs]
+    n = resolve_workers(workers, len(run_dirs))
+    if n == 1:
+        rows = [analyze_run(d, param, store_root) for d in run_dirs]
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+        with ProcessPoolExecutor(max_workers=n, mp_context=ctx) as pool:
+            futures = {d: pool.submit(analyze_run, d, param, store_root) for d in run_dirs}
+            rows = []
+            for d, fut in futures.items():
+                try:
+                    rows.append(fut.result())
+                except Exception as exc:
+                    # El proceso murió (memoria, señal...): la fila queda con el error
+                    row = {'run': str(d), 'error': repr(exc)}
+                    if param:
+                        row['param'] = sweep_parameter(d, param)
+                    rows.append(row)
+
+    def order(row):
+        p = row.get('param')
+        return (p is None, p if p is not None else 0.0, row['run'])
+    return sorted(rows, key=order)
+
+
+def write_table(rows, path):
+    """Escribe las filas como CSV con las columnas de COLUMNS"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: ('' if row.get(k) is None else row.get(k, '')) for k in COLUMNS})
+
+
+def plot_mach(rows, path, param=None, dpi=180):
+    """Grafica M_A de cada corrida frente al parámetro (o al nombre de la corrida)"""
+    rows = [r for r in rows if 'M_A' in r]
+    if not rows:
+        return False
+    fig, ax = new_figure(figsize=(7, 4))
+    by_param = param and all(r.get('param') is not None for r in rows)
+    xs = [r['param'] for r in rows] if by_param else list(range(len(rows)))
+    ys = [r['M_A'] for r in rows]
+    ax.plot(xs, ys, lw=1.5, marker='o')
+    ax.axhline(1.0, ls='--', color='gray', alpha=0.7, label='M_A = 1')
+    if not by_param:
+        ax.set_xticks(xs)
+        ax.set_xticklabels([Path(r['run']).name for r in rows], rotation=45, ha='right', fontsize=7)
+    ax.set_title("Mach Alfvénico por corrida")
+    ax.set_xlabel(param if by_param else "corrida")
+    ax.set_ylabel("M_A = |vx|max / v_A")
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analiza un barrido de corridas de onda de Alfvén")
+    parser.add_argument('runs', nargs='+', help="Directorios de simulación (var_XX.npy o salida de PLUTO)")
+    parser.add_argument('--param', default=None,
+                        help="Parámetro del barrido (de pluto.ini o del nombre del directorio)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Procesos (por defecto RENDER_WORKERS o número de CPUs)")
+    parser.add_argument('--output', type=Path, default=RESULTS_DIR, help="Directorio de salida")
+    args = parser.parse_args()
+
+    run_dirs = [d for d in args.runs if Path(d).is_dir()]
+    for d in sorted(set(args.runs) - set(run_dirs)):
+        print(f"⚠️ {d} no es un directorio, se omite")
+    if not run_dirs:
+        raise SystemExit("❌ No se indicó ningún directorio de simulación.")
+
+    print(f"🧮 Analizando {len(run_dirs)} corridas...")
+    rows = run_sweep(run_dirs, args.param, args.workers, args.output / STORE_DIRNAME)
+    ensure_dir(args.output)
+    write_table(rows, args.output / TABLE_NAME)
+    plotted = plot_mach(rows, args.output / PLOT_NAME, args.param)
+
+    for row in rows:
+        if 'error' in row:
+            print(f"❌ {row['run']}: {row['error']}")
+        elif 'M_A' in row:
+            regime = 'sub-Alfvénico' if row['regime'] == 'sub' else 'súper-Alfvénico'
+            print(f"✨ {row['run']}: M_A = {row['M_A']:.4g} ({regime})")
+            if row.get('violations'):
+                print(f"⚠️ {row['run']}: supera los umbrales de {row['violations'].replace(';', ', ')}")
+        else:
+            print(f"⚠️ {row['run']}: faltan rho, bx3 o vx1 para calcular M_A")
+    print(f"🔥 Tabla: {args.output / TABLE_NAME}")
+    if plotted:
+        print(f"🔥 Gráfica: {args.output / PLOT_NAME}")
+    if all('error' in r for r in rows):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
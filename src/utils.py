@@ -4,34 +4,68 @@
 
 Funciones auxiliares compartidas entre los scripts de simulación.
 """
+import os
 import re
 import glob
 import subprocess
 import shutil
 from pathlib import Path
 
+from catalog import open_catalog
+from profiling import profiled
 
-def clean_results_directory(problem_name):
+
+FORCE_CLEAN_ENV = 'FORCE_CLEAN'
+
+
+def clean_results_directory(problem_name, force=None, results_dir=None):
     """
-    Limpia los resultados anteriores de un problema específico.
+    Prepara el directorio de resultados de un problema específico.
+    
+    Por defecto la construcción es incremental: se conservan los resultados
+    anteriores y el manifiesto (ver manifest.py) decide qué regenerar. Con
+    `force` se borran todos los resultados anteriores.
     
     Args:
         problem_name (str): Nombre del problema ('problema1' o 'problema2')
+        force (bool): Borrar todo (None → variable de entorno FORCE_CLEAN)
+        results_dir (Path): Directorio de resultados (por defecto
+            ../results/<problem_name>, relativo al directorio actual)
     """
-    results_dir = Path(f'../results/{problem_name}')
-    if results_dir.exists():
+    results_dir = Path(results_dir) if results_dir is not None else Path(f'../results/{problem_name}')
+    if force is None:
+        force = os.environ.get(FORCE_CLEAN_ENV, '0').lower() not in ('0', 'false', 'no', '')
+    if results_dir.exists() and not force:
+        print(f"✨ Modo incremental: se conservan los resultados del {problem_name.title()}")
+    elif results_dir.exists():
         print(f"✨ Limpiando resultados anteriores del {problem_name.title()}...")
         shutil.rmtree(results_dir)
         print("✨ Resultados anteriores eliminados")
     else:
         print(f"✨ No hay resultados del {problem_name.title()} para limpiar")
     
-    # Crear directorio vacío
+    # Crear directorio (vacío si se limpió)
     results_dir.mkdir(parents=True, exist_ok=True)
 
 
+@profiled()
 def discover_times(pattern):
-    """Descubre los tiempos disponibles en archivos de simulación PLUTO"""
+    """
+    Descubre los tiempos disponibles en archivos de simulación PLUTO.
+
+    Args:
+        pattern: Patrón `directorio/var_*.npy`; la variable no distingue
+            mayúsculas y el directorio se lee del catálogo (una sola pasada
+            por directorio, ver catalog.py)
+
+    Returns:
+        list: Tiempos ordenados
+    """
+    data_dir, name = os.path.split(pattern)
+    m = re.fullmatch(r'(?P<var>[^*?\[\]]+)_\*\.npy', name)
+    if m and not glob.has_magic(data_dir):
+        return open_catalog(data_dir or '.').times_for(m.group('var'))
+    # Patrones generales: glob sobre el directorio
     times = []
     rx = re.compile(r'_(\d+)\.npy$')
     for fp in glob.glob(pattern):
@@ -46,6 +80,7 @@ def ensure_dir(d):
     Path(d).mkdir(parents=True, exist_ok=True)
 
 
+@profiled()
 def try_ffmpeg(frames_dir, width, output='output.mp4', fps=10, file_pattern='%0{width}d.png'):
     """
     Intenta crear un video usando ffmpeg
@@ -57,9 +92,11 @@ def try_ffmpeg(frames_dir, width, output='output.mp4', fps=10, file_pattern='%0{
         fps: Frames por segundo
         file_pattern: Patrón de archivos (ej: '%0{width}d.png' o 'density_%0{width}d.png')
     """
+    from video import EVEN_YUV420P
+
     pattern = str(Path(frames_dir) / file_pattern.format(width=width))
     cmd = ['ffmpeg', '-y', '-framerate', str(fps), '-i', pattern,
-           '-vf', 'format=yuv420p', output]
+           '-vf', EVEN_YUV420P, output]
     try:
         subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
         return True
@@ -67,10 +104,15 @@ def try_ffmpeg(frames_dir, width, output='output.mp4', fps=10, file_pattern='%0{
         return False
 
 
+@profiled()
 def save_gif_with_pillow(frames_dir, output='output.gif', fps=10, file_pattern='*.png'):
     """
     Crea un GIF usando Pillow como fallback
     
+    Los frames se leen y escriben de uno en uno con una paleta global calculada
+    a partir de una muestra espaciada de frames, así que la memoria no crece con
+    el número de frames.
+    
     Args:
         frames_dir: Directorio con los frames
         output: Archivo de salida
@@ -82,14 +124,19 @@ def save_gif_with_pillow(frames_dir, output='output.gif', fps=10, file_pattern='
     except ImportError:
         print("Pillow no está instalado; no se puede crear GIF.")
         return False
+    from video import PALETTE_SAMPLE, GifWriter, build_palette
+
     frames = sorted(Path(frames_dir).glob(file_pattern))
     if not frames:
         return False
-    images = [Image.open(fp).convert('P', palette=Image.ADAPTIVE) for fp in frames]
-    duration_ms = int(1000 / fps)
-    images[0].save(output, save_all=True, append_images=images[1:], loop=0, 
-                   duration=duration_ms, optimize=False)
-    return True
+    step = max(1, len(frames) // PALETTE_SAMPLE)
+    sample = [Image.open(fp).convert('RGB') for fp in frames[::step][:PALETTE_SAMPLE]]
+    writer = GifWriter(output, sample[0].size, fps=fps, palette=build_palette(sample))
+    del sample
+    for fp in frames:
+        with Image.open(fp) as im:
+            writer.write(im)
+    return writer.close()
 
 
 def create_video_and_gif(frames_dir, output_base, fps=10, file_pattern='%0{width}d.png', width=None):
@@ -132,17 +179,29 @@ def create_video_and_gif(frames_dir, output_base, fps=10, file_pattern='%0{width
     
     # Intentar crear MP4 con ffmpeg
     mp4_success = try_ffmpeg(frames_dir, width, output=mp4_output, fps=fps, file_pattern=file_pattern)
-    if mp4_success:
-        print(f"✨ Video creado: {mp4_output}")
-    else:
-        print(f"❌ No se pudo crear video: {mp4_output}")
     
     # Crear GIF con Pillow
     gif_pattern = '*.png' if '%' not in file_pattern else '*.png'
     gif_success = save_gif_with_pillow(frames_dir, output=gif_output, fps=fps, file_pattern=gif_pattern)
+    
+    return report_video_and_gif(output_base, mp4_success, gif_success)
+
+
+def report_video_and_gif(output_base, mp4_success, gif_success):
+    """
+    Informa el resultado de crear el MP4 y el GIF de una animación
+    
+    Returns:
+        tuple: (mp4_success, gif_success)
+    """
+    mp4_output = f"{output_base}.mp4"
+    gif_output = f"{output_base}.gif"
+    if mp4_success:
+        print(f"✨ Video creado: {mp4_output}")
+    else:
+        print(f"❌ No se pudo crear video: {mp4_output}")
     if gif_success:
         print(f"✨ GIF creado: {gif_output}")
     else:
         print(f"❌ No se pudo crear GIF: {gif_output}")
-    
     return mp4_success, gif_success
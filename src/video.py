@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+🎬 Codificación en streaming
+
+Destinos que reciben fotogramas RGB crudos uno a uno, sin pasar por PNG
+intermedios: un pipe hacia la entrada estándar de ffmpeg y un escritor de GIF
+incremental basado en Pillow con una paleta global compartida.
+"""
+import os
+import subprocess
+
+import numpy as np
+
+# yuv420p (libx264) exige ancho y alto pares: con dpi o tamaños de figura
+# arbitrarios se recorta a par (sin efecto si ya lo son)
+EVEN_YUV420P = 'scale=trunc(iw/2)*2:trunc(ih/2)*2,format=yuv420p'
+
+
+class FfmpegPipe:
+    """
+    Envía fotogramas RGB crudos a ffmpeg por stdin para crear un MP4.
+
+    Si ffmpeg no está instalado o falla, el destino queda deshabilitado y
+    `close()` devuelve False.
+
+    Con `live=True` el MP4 se escribe fragmentado (un fragmento por
+    fotograma, sin retardo del codificador), así que se puede reproducir
+    mientras se siguen agregando fotogramas (ver follow.py).
+
+    Args:
+        output: Archivo de salida
+        size: Tamaño del fotograma en píxeles (ancho, alto)
+        fps: Fotogramas por segundo
+        live: MP4 reproducible antes de cerrar el pipe
+    """
+
+    def __init__(self, output, size, fps=10, live=False):
+        self.output = str(output)
+        self.ok = True
+        w, h = size
+        cmd = ['ffmpeg', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+               '-s', f'{w}x{h}', '-framerate', str(fps), '-i', '-',
+               '-vf', EVEN_YUV420P]
+        if live:
+            cmd += ['-tune', 'zerolatency', '-g', str(fps), '-flush_packets', '1',
+                    '-movflags', 'frag_every_frame+empty_moov+default_base_moof']
+        cmd.append(self.output)
+        try:
+            self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                         stdout=subprocess.DEVNULL,
+                                         stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            self.proc = None
+            self.ok = False
+
+    def write(self, rgb):
+        """Escribe un fotograma (bytes RGB de alto × ancho × 3)"""
+        if not self.ok:
+            return
+        try:
+            self.proc.stdin.write(rgb)
+        except (BrokenPipeError, OSError):
+            self.ok = False
+
+    def flush(self):
+        """Entrega a ffmpeg los fotogramas que quedaron en el buffer del pipe"""
+        if not self.ok:
+            return
+        try:
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            self.ok = False
+
+    def close(self):
+        """Cierra el pipe y espera a ffmpeg. Devuelve True si el MP4 se creó"""
+        if self.proc is None:
+            return False
+        try:
+            self.proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            self.ok = False
+        return self.proc.wait() == 0 and self.ok
+
+
+PALETTE_SAMPLE = 8
+
+
+def build_palette(images, colors=256):
+    """
+    Calcula una paleta global a partir de una muestra de fotogramas.
+
+    Args:
+        images: Imágenes RGB del mismo tamaño
+        colors: Número de colores de la paleta
+
+    Returns:
+        Image: Imagen 'P' cuya paleta se comparte entre todos los fotogramas
+    """
+    from PIL import Image
+
+    w, h = images[0].size
+    strip = Image.new('RGB', (w, h * len(images)))
+    for i, im in enumerate(images):
+        strip.paste(im, (0, i * h))
+    return strip.quantize(colors, method=Image.Quantize.FASTOCTREE)
+
+
+class GifWriter:
+    """
+    Escribe un GIF animado fotograma a fotograma con una paleta compartida.
+
+    Todos los fotogramas se mapean a una única paleta global (escrita una vez
+    en la cabecera), así que la cuantización cara se hace una sola vez y la
+    memoria se mantiene acotada: como máximo se retienen `sample` fotogramas
+    mientras se calcula la paleta. De cada fotograma solo se escribe el
+    rectángulo que cambió respecto al anterior.
+
+    Args:
+        output: Archivo de salida
+        size: Tamaño del fotograma en píxeles (ancho, alto)
+        fps: Fotogramas por segundo
+        loop: Repeticiones (0 = infinito)
+        palette: Imagen 'P' con la paleta a usar (ej: de build_palette); si es
+            None se calcula con los primeros `sample` fotogramas
+        sample: Fotogramas usados para calcular la paleta
+    """
+
+    def __init__(self, output, size, fps=10, loop=0, palette=None, sample=PALETTE_SAMPLE):
+        self.output = str(output)
+        self.size = tuple(size)
+        self.duration_ms = int(1000 / fps)
+        self.loop = loop
+        self.palette = palette
+        self.sample = max(1, sample)
+        self.count = 0
+        self._pending = []
+        self._previous = None
+        self._fp = None
+        try:
+            from PIL import Image, GifImagePlugin
+        except ImportError:
+            print("Pillow no está instalado; no se puede crear GIF.")
+            self.ok = False
+            return
+        self._Image = Image
+        self._gif = GifImagePlugin
+        self._fp = open(self.output, 'wb')
+        self.ok = True
+
+    def _as_image(self, frame):
+        if isinstance(frame, (bytes, bytearray, memoryview)):
+            return self._Image.frombuffer('RGB', self.size, frame, 'raw', 'RGB', 0, 1)
+        return frame.convert('RGB')
+
+    def write(self, frame):
+        """Agrega un fotograma (bytes RGB de alto × ancho × 3 o imagen de Pillow)"""
+        if not self.ok:
+            return
+        if self.palette is None:
+            self._pending.append(self._as_image(frame))
+            if len(self._pending) >= self.sample:
+                self._flush_pending()
+            return
+        self._write_frame(self._as_image(frame))
+
+    def _flush_pending(self):
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        if self.palette is None:
+            self.palette = build_palette(pending)
+        for im in pending:
+            self._write_frame(im)
+
+    def _write_frame(self, im):
+        im = im.quantize(palette=self.palette, dither=self._Image.Dither.NONE)
+        indices = np.asarray(im)
+        offset = (0, 0)
+        if self.count == 0:
+            header, _ = self._gif.getheader(im, info={'loop': self.loop,
+                                                       'duration': self.duration_ms})
+            for chunk in header:
+                self._fp.write(chunk)
+        else:
+            # Solo el rectángulo que cambió (al menos 1 píxel para conservar el tiempo)
+            changed = indices != self._previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            cols = np.flatnonzero(changed.any(axis=0))
+            if rows.size:
+                box = (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+            else:
+                box = (0, 0, 1, 1)
+            offset = box[:2]
+            im = im.crop(box)
+        for chunk in self._gif.getdata(im, offset=offset, duration=self.duration_ms):
+            self._fp.write(chunk)
+        self._previous = indices
+        self.count += 1
+
+    def close(self):
+        """Escribe el terminador del GIF. Devuelve True si tiene fotogramas"""
+        if self._fp is None:
+            return False
+        self._flush_pending()
+        self._fp.write(b';')
+        self._fp.close()
+        self._fp = None
+        if self.count == 0:
+            os.remove(self.output)
+            return False
+        return self.ok
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+🖥️ Visor HTML de animaciones 1D
+
+En lugar de un PNG por fotograma, exporta las series (tiempo, celda) de una
+o varias variables en binario compacto dentro de un único HTML autocontenido
+que dibuja los fotogramas en el navegador (canvas), sin conexión ni
+dependencias: barra de tiempo, reproducir/pausar, paso a paso, fps,
+variables superpuestas y normalización de cada una a su rango.
+
+Formato de los datos:
+- float16 (por defecto): cada variable se guarda como (v - centro) / semi-rango,
+  así que el error relativo al rango es ~5e-4 (menos de un píxel) aunque la
+  perturbación sea pequeña frente al fondo (ej: ρ = 1 + 1e-3 sin kx)
+- float32: los valores tal cual (exactos en datos float32)
+
+Los bytes de cada array se reordenan por planos (primero el byte bajo de
+todos los valores, luego el alto) y todo se comprime con zlib; el navegador
+lo descomprime con DecompressionStream. Para las corridas 1D de la tarea el
+HTML ocupa una fracción pequeña de los PNG de frames_* y se escribe en
+milisegundos.
+
+El formato se elige con el argumento `dtype` o con la variable de entorno
+VIEWER_DTYPE. read_viewer devuelve los datos de un HTML ya escrito.
+"""
+import base64
+import json
+import os
+import re
+import zlib
+
+import numpy as np
+
+from profiling import profiled
+from stats import fixed_ylim
+
+DTYPE_ENV = 'VIEWER_DTYPE'
+DTYPES = {'float16': '<f2', 'float32': '<f4'}
+DEFAULT_DTYPE = 'float16'
+
+# Cambiar al modificar el formato o la página: invalida el manifiesto
+VIEWER_VERSION = 1
+
+# Colores de las variables (ciclo por defecto de matplotlib)
+COLORS = ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2',
+          '#7f7f7f', '#bcbd22', '#17becf')
+
+
+def resolve_dtype(dtype=None):
+    """
+    Formato de los datos del visor.
+
+    Args:
+        dtype: 'float16' o 'float32' (None → variable de entorno VIEWER_DTYPE
+            o DEFAULT_DTYPE)
+
+    Raises:
+        ValueError: Si el formato no está en DTYPES
+    """
+    dtype = dtype or os.environ.get(DTYPE_ENV) or DEFAULT_DTYPE
+    if dtype not in DTYPES:
+        raise ValueError(f"Formato desconocido: {dtype} (opciones: {', '.join(DTYPES)})")
+    return dtype
+
+
+def _shuffle(values):
+    """Bytes de `values` reordenados por planos (byte 0 de todos, byte 1 de todos...)"""
+    return values.view(np.uint8).reshape(-1, values.itemsize).T.tobytes()
+
+
+def _unshuffle(buf, dtype, count):
+    itemsize = np.dtype(dtype).itemsize
+    planes = np.frombuffer(buf, dtype=np.uint8, count=count * itemsize).reshape(itemsize, count)
+    return planes.T.copy().view(dtype).reshape(-1)
+
+
+def _quantize(values, dtype):
+    """(array en `dtype`, centro, escala) con valor = centro + escala · array"""
+    if dtype == 'float32':
+        return values.astype(DTYPES[dtype]), 0.0, 1.0
+    finite = values[np.isfinite(values)]
+    lo, hi = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 0.0)
+    center = 0.5 * (lo + hi)
+    scale = 0.5 * (hi - lo) or 1.0
+    return ((values - center) / scale).astype(DTYPES[dtype]), center, scale
+
+
+@profiled()
+def pack(store, variables, coord, times=None, dtype=None, labels=None, ylims=None):
+    """
+    Empaqueta las series de `variables` para el visor.
+
+    Args:
+        store: Almacén con una malla 1D
+        variables: Variables a exportar (las que no estén en el almacén se omiten)
+        coord: Coordenada del eje horizontal ('x1' o 'x3')
+        times: Tiempos a exportar (por defecto todos los de cada variable)
+        dtype: Formato de los datos (ver resolve_dtype)
+        labels: {variable: etiqueta} (por defecto el nombre de la variable)
+        ylims: {variable: (ymin, ymax)} rangos fijos (por defecto los de
+            los datos con un 5 % de margen, como las animaciones)
+
+    Returns:
+        tuple: (metadatos JSON-serializables, bytes comprimidos)
+
+    Raises:
+        ValueError: Si la malla no es 1D a lo largo de `coord`
+    """
+    dtype = resolve_dtype(dtype)
+    labels, ylims = labels or {}, ylims or {}
+    x = np.asarray(store.coord(coord), dtype=np.float64)
+    ncells = int(np.prod(store.grid_shape))
+    if x.size != ncells:
+        raise ValueError(f"{coord} tiene {x.size} celdas y los snapshots {ncells}: el visor es solo 1D")
+
+    wanted = None if times is None else set(times)
+    series = {}
+    for var in variables:
+        if var in store:
+            ts = [t for t in store.times_for(var) if wanted is None or t in wanted]
+            if ts:
+                series[var] = ts
+    timeline = sorted(set().union(*series.values())) if series else []
+    position = {t: i for i, t in enumerate(timeline)}
+
+    chunks, offset = [], 0
+
+    def section(values):
+        nonlocal offset
+        chunks.append(_shuffle(values))
+        entry = {'offset': offset, 'count': int(values.size), 'dtype': values.dtype.str}
+        offset += values.nbytes
+        return entry
+
+    meta = {'version': VIEWER_VERSION, 'coord': coord, 'ncells': ncells,
+            'times': timeline, 'x': section(x.astype('<f4')), 'variables': []}
+    sim_time = getattr(store, 'sim_time', None)
+    if sim_time is not None:
+        lookup = dict(zip(store.times, sim_time))
+        meta['sim_time'] = [float(lookup[t]) for t in timeline]
+    for i, (var, ts) in enumerate(series.items()):
+        values = np.asarray(store.series(var, ts), dtype=np.float64).reshape(len(ts), ncells)
+        finite = values[np.isfinite(values)]
+        ylim = ylims.get(var) or (fixed_ylim(finite.min(), finite.max(), pad_frac=0.05)
+                                  if finite.size else (-1.0, 1.0))
+        quantized, center, scale = _quantize(values, dtype)
+        entry = section(quantized)
+        entry.update(name=var, label=labels.get(var, var), color=COLORS[i % len(COLORS)],
+                     rows=[position[t] for t in ts], center=center, scale=scale,
+                     ylim=[float(ylim[0]), float(ylim[1])])
+        meta['variables'].append(entry)
+    return meta, zlib.compress(b''.join(chunks), 9)
+
+
+def write_viewer(path, store, variables, coord, times=None, title='', xlabel=None, dtype=None,
+                 labels=None, ylims=None, fps=10):
+    """
+    Escribe el visor HTML autocontenido de `variables`.
+
+    Args:
+        path: Archivo HTML de salida
+        store, variables, coord, times, dtype, labels, ylims: Ver pack
+        title: Título de la página
+        xlabel: Etiqueta del eje horizontal (por defecto `coord`)
+        fps: Fotogramas por segundo iniciales de la reproducción
+
+    Returns:
+        int: Tamaño del HTML en bytes
+    """
+    meta, blob = pack(store, variables, coord, times, dtype, labels, ylims)
+    meta.update(title=title, xlabel=xlabel or coord, fps=fps)
+    # "</" dentro de un <script> cerraría la etiqueta
+    meta_json = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    html = (_PAGE.replace('__TITLE__', _escape(title or 'Visor'))
+            .replace('__META__', meta_json)
+            .replace('__DATA__', base64.b64encode(blob).decode('ascii')))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    return len(html.encode('utf-8'))
+
+
+def read_viewer(path):
+    """
+    Lee los datos de un visor escrito por write_viewer.
+
+    Returns:
+        dict: 'times', 'x' y {variable: (tiempos, array (tiempo, celda))}
+            en la misma precisión en que se guardaron
+    """
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    meta = json.loads(re.search(r'<script id="viewer-meta"[^>]*>(.*?)</script>', html, re.S).group(1))
+    data = re.search(r'<script id="viewer-data"[^>]*>(.*?)</script>', html, re.S).group(1)
+    raw = memoryview(zlib.decompress(base64.b64decode(data)))
+
+    def section(entry):
+        return _unshuffle(raw[entry['offset']:], entry['dtype'], entry['count'])
+
+    out = {'times': meta['times'], 'x': section(meta['x'])}
+    for v in meta['variables']:
+        values = section(v).astype(np.float64).reshape(len(v['rows']), meta['ncells'])
+        out[v['name']] = ([meta['times'][r] for r in v['rows']], v['center'] + v['scale'] * values)
+    return out
+
+
+def _escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+_PAGE = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  body { font-family: system-ui, sans-serif; margin: 16px; color: #222; }
+  h1 { font-size: 18px; margin: 0 0 8px; }
+  #plot { width: 100%; max-width: 1000px; height: 440px; display: block; border: 1px solid #ddd; }
+  .row { display: flex; flex-wrap: wrap; gap: 10px; align-items: center; margin: 8px 0; max-width: 1000px; }
+  #slider { flex: 1; min-width: 200px; }
+  #tlabel { min-width: 150px; font-variant-numeric: tabular-nums; }
+  button { min-width: 36px; }
+  input[type=number] { width: 50px; }
+  .swatch { display: inline-block; width: 14px; height: 3px; vertical-align: middle; margin-right: 4px; }
+  #status { color: #a00; }
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<canvas id="plot"></canvas>
+<div class="row">
+  <button id="prev" title="Anterior (←)">⏮</button>
+  <button id="play" title="Reproducir / pausar (espacio)">▶</button>
+  <button id="next" title="Siguiente (→)">⏭</button>
+  <input id="slider" type="range" min="0" value="0">
+  <span id="tlabel"></span>
+</div>
+<div class="row">
+  <label>fps <input id="fps" type="number" min="1" max="60"></label>
+  <label><input id="loop" type="checkbox" checked> bucle</label>
+  <label><input id="normalize" type="checkbox"> normalizar a [-1, 1]</label>
+  <span id="vars"></span>
+  <span id="status"></span>
+</div>
+<script id="viewer-meta" type="application/json">__META__</script>
+<script id="viewer-data" type="application/octet-stream">__DATA__</script>
+<script>
+"use strict";
+
+// ---------- Decodificación ----------
+
+function base64Bytes(text) {
+  var bin = atob(text.trim()), out = new Uint8Array(bin.length);
+  for (var i = 0; i < bin.length; i++) out[i] = bin.charCodeAt(i);
+  return out;
+}
+
+async function inflate(bytes) {
+  var stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("deflate"));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+var HALF = null;
+function halfTable() {
+  // Los 65536 valores float16 posibles, calculados una vez
+  if (HALF) return HALF;
+  HALF = new Float32Array(65536);
+  for (var h = 0; h < 65536; h++) {
+    var s = (h & 0x8000) ? -1 : 1, e = (h >> 10) & 0x1f, f = h & 0x3ff;
+    HALF[h] = e === 0 ? s * Math.pow(2, -14) * (f / 1024)
+            : e === 31 ? (f ? NaN : s * Infinity)
+            : s * Math.pow(2, e - 15) * (1 + f / 1024);
+  }
+  return HALF;
+}
+
+function section(raw, entry, center, scale) {
+  var size = entry.dtype === "<f2" ? 2 : 4, n = entry.count;
+  var bytes = new Uint8Array(n * size);
+  for (var b = 0; b < size; b++) {
+    var plane = entry.offset + b * n;
+    for (var i = 0; i < n; i++) bytes[i * size + b] = raw[plane + i];
+  }
+  var out = new Float32Array(n);
+  if (size === 2) {
+    var table = halfTable(), q = new Uint16Array(bytes.buffer);
+    for (var j = 0; j < n; j++) out[j] = center + scale * table[q[j]];
+  } else {
+    var v = new Float32Array(bytes.buffer);
+    for (var k = 0; k < n; k++) out[k] = center + scale * v[k];
+  }
+  return out;
+}
+
+async function loadData(metaText, dataText) {
+  var meta = JSON.parse(metaText);
+  var raw = await inflate(base64Bytes(dataText));
+  meta.xs = section(raw, meta.x, 0, 1);
+  meta.variables.forEach(function (v) {
+    v.values = section(raw, v, v.center, v.scale);
+    v.rowAt = new Int32Array(meta.times.length).fill(-1);
+    v.rows.forEach(function (r, i) { v.rowAt[r] = i; });
+    v.visible = false;
+  });
+  return meta;
+}
+
+// ---------- Dibujo ----------
+
+function niceTicks(lo, hi, n) {
+  var span = hi - lo, raw = span / n, mag = Math.pow(10, Math.floor(Math.log10(raw)));
+  var step = [1, 2, 5, 10].map(function (m) { return m * mag; }).find(function (s) { return s >= raw; });
+  var ticks = [];
+  for (var t = Math.ceil(lo / step) * step; t <= hi + step * 1e-9; t += step) ticks.push(Math.abs(t) < step * 1e-9 ? 0 : t);
+  return ticks;
+}
+
+function fmt(v) {
+  var a = Math.abs(v);
+  return (a !== 0 && (a < 1e-3 || a >= 1e4)) ? v.toExponential(1) : String(+v.toPrecision(4));
+}
+
+function draw(meta, canvas, frame, normalize) {
+  var dpr = window.devicePixelRatio || 1, w = canvas.clientWidth, h = canvas.clientHeight;
+  if (canvas.width !== Math.round(w * dpr) || canvas.height !== Math.round(h * dpr)) {
+    canvas.width = Math.round(w * dpr); canvas.height = Math.round(h * dpr);
+  }
+  var ctx = canvas.getContext("2d");
+  ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+  ctx.clearRect(0, 0, w, h);
+  var m = { l: 70, r: 20, t: 30, b: 45 }, pw = w - m.l - m.r, ph = h - m.t - m.b;
+  var xs = meta.xs, n = meta.ncells, x0 = xs[0], x1 = xs[n - 1];
+  var shown = meta.variables.filter(function (v) { return v.visible; });
+  var y0 = normalize ? -1.05 : Math.min.apply(null, shown.map(function (v) { return v.ylim[0]; }).concat(shown.length ? [] : [-1]));
+  var y1 = normalize ? 1.05 : Math.max.apply(null, shown.map(function (v) { return v.ylim[1]; }).concat(shown.length ? [] : [1]));
+  function px(x) { return m.l + (x - x0) / (x1 - x0) * pw; }
+  function py(y) { return m.t + (y1 - y) / (y1 - y0) * ph; }
+
+  // Ejes y grilla
+  ctx.font = "12px system-ui, sans-serif"; ctx.lineWidth = 1;
+  ctx.strokeStyle = "#e4e4e4"; ctx.fillStyle = "#444";
+  ctx.textAlign = "center"; ctx.textBaseline = "top";
+  niceTicks(x0, x1, 8).forEach(function (t) {
+    ctx.beginPath(); ctx.moveTo(px(t), m.t); ctx.lineTo(px(t), m.t + ph); ctx.stroke();
+    ctx.fillText(fmt(t), px(t), m.t + ph + 5);
+  });
+  ctx.textAlign = "right"; ctx.textBaseline = "middle";
+  niceTicks(y0, y1, 6).forEach(function (t) {
+    ctx.beginPath(); ctx.moveTo(m.l, py(t)); ctx.lineTo(m.l + pw, py(t)); ctx.stroke();
+    ctx.fillText(fmt(t), m.l - 6, py(t));
+  });
+  ctx.strokeStyle = "#888"; ctx.strokeRect(m.l, m.t, pw, ph);
+  ctx.textAlign = "center"; ctx.textBaseline = "bottom";
+  ctx.fillText(meta.xlabel, m.l + pw / 2, h - 4);
+
+  // Líneas; con más celdas que píxeles, mínimo y máximo por columna
+  ctx.save();
+  ctx.beginPath(); ctx.rect(m.l, m.t, pw, ph); ctx.clip();
+  ctx.lineWidth = 2;
+  shown.forEach(function (v) {
+    var row = v.rowAt[frame];
+    if (row < 0) return;
+    var base = row * n, lo = v.ylim[0], hi = v.ylim[1];
+    function val(i) {
+      var y = v.values[base + i];
+      return normalize ? 2 * (y - lo) / (hi - lo) - 1 : y;
+    }
+    ctx.strokeStyle = v.color; ctx.beginPath();
+    if (n > 2 * pw) {
+      var col = -1, mn = 0, mx = 0;
+      for (var i = 0; i <= n; i++) {
+        var c = i < n ? Math.floor((px(xs[i]) - m.l)) : -2;
+        if (c !== col) {
+          if (col >= 0) { ctx.lineTo(m.l + col, py(mn)); ctx.lineTo(m.l + col, py(mx)); }
+          if (i === n) break;
+          col = c; mn = mx = val(i);
+        } else {
+          var y = val(i); if (y < mn) mn = y; if (y > mx) mx = y;
+        }
+      }
+    } else {
+      for (var k = 0; k < n; k++) ctx[k ? "lineTo" : "moveTo"](px(xs[k]), py(val(k)));
+    }
+    ctx.stroke();
+  });
+  ctx.restore();
+
+  // Título y leyenda
+  ctx.fillStyle = "#222"; ctx.textAlign = "left"; ctx.textBaseline = "bottom"; ctx.font = "14px system-ui, sans-serif";
+  ctx.fillText(shown.map(function (v) { return v.label; }).join(", ") + "  —  " + timeLabel(meta, frame), m.l, m.t - 8);
+}
+
+function timeLabel(meta, frame) {
+  var label = "t = " + meta.times[frame];
+  if (meta.sim_time) label += " (" + fmt(meta.sim_time[frame]) + " u.t.)";
+  return label;
+}
+
+// ---------- Controles ----------
+
+function setup(meta) {
+  var canvas = document.getElementById("plot"), slider = document.getElementById("slider");
+  var fps = document.getElementById("fps"), play = document.getElementById("play");
+  var loop = document.getElementById("loop"), normalize = document.getElementById("normalize");
+  var frame = 0, playing = false, last = 0;
+  slider.max = Math.max(0, meta.times.length - 1);
+  fps.value = meta.fps;
+
+  function show(i) {
+    frame = Math.max(0, Math.min(meta.times.length - 1, i));
+    slider.value = frame;
+    document.getElementById("tlabel").textContent = timeLabel(meta, frame) + "  [" + (frame + 1) + "/" + meta.times.length + "]";
+    draw(meta, canvas, frame, normalize.checked);
+  }
+  function tick(now) {
+    if (!playing) return;
+    if (now - last >= 1000 / Math.max(1, +fps.value || 1)) {
+      last = now;
+      if (frame + 1 < meta.times.length) show(frame + 1);
+      else if (loop.checked) show(0);
+      else { toggle(); return; }
+    }
+    requestAnimationFrame(tick);
+  }
+  function toggle() {
+    playing = !playing;
+    play.textContent = playing ? "⏸" : "▶";
+    if (playing) { if (frame + 1 >= meta.times.length) show(0); requestAnimationFrame(tick); }
+  }
+
+  var vars = document.getElementById("vars");
+  meta.variables.forEach(function (v, i) {
+    v.visible = i === 0;
+    var label = document.createElement("label"), box = document.createElement("input"), sw = document.createElement("span");
+    box.type = "checkbox"; box.checked = v.visible;
+    box.onchange = function () { v.visible = box.checked; show(frame); };
+    sw.className = "swatch"; sw.style.background = v.color;
+    label.appendChild(box); label.appendChild(sw); label.appendChild(document.createTextNode(v.label + " "));
+    vars.appendChild(label);
+  });
+
+  slider.oninput = function () { show(+slider.value); };
+  play.onclick = toggle;
+  document.getElementById("prev").onclick = function () { show(frame - 1); };
+  document.getElementById("next").onclick = function () { show(frame + 1); };
+  normalize.onchange = function () { show(frame); };
+  window.onresize = function () { show(frame); };
+  document.onkeydown = function (e) {
+    if (e.target.tagName === "INPUT" && e.target.type === "number") return;
+    if (e.key === " ") { toggle(); e.preventDefault(); }
+    else if (e.key === "ArrowLeft") show(frame - 1);
+    else if (e.key === "ArrowRight") show(frame + 1);
+  };
+  show(0);
+}
+
+if (typeof document !== "undefined") {
+  loadData(document.getElementById("viewer-meta").textContent, document.getElementById("viewer-data").textContent)
+    .then(setup)
+    .catch(function (err) {
+      document.getElementById("status").textContent = "No se pudieron leer los datos: " + err;
+    });
+}
+</script>
+</body>
+</html>
+"""
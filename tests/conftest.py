@@ -0,0 +1,29 @@
+"""
+🧪 Configuración de pytest
+
+Los módulos de src/ y benchmarks/ se importan planos (`from dataset import
+...`), igual que en run_all.py y en los benchmarks.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+# Sin pantalla y sin PNG por fotograma salvo que la prueba lo pida
+os.environ.setdefault('MPLBACKEND', 'Agg')
+os.environ.setdefault('KEEP_FRAMES', '0')
+
+
+@pytest.fixture
+def sound_dir(tmp_path):
+    """Conjunto sintético de onda sonora pequeño (50 celdas, 6 snapshots)"""
+    from synthetic import make_dataset
+
+    data_dir = tmp_path / 'sound'
+    make_dataset('sound', data_dir, ncells=50, nsnapshots=6)
+    return data_dir
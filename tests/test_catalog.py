@@ -0,0 +1,59 @@
+"""Catálogo de snapshots: un solo recorrido, sin distinción de mayúsculas"""
+import os
+
+import numpy as np
+import pytest
+
+import catalog
+from catalog import open_catalog, scan
+
+
+def _touch(data_dir, *names):
+    for name in names:
+        np.save(data_dir / name, np.zeros(3))
+
+
+def test_scan_is_case_insensitive(tmp_path):
+    _touch(tmp_path, 'Bx1_00.npy', 'Bx1_01.npy', 'bx1_02.npy', 'rho_00.npy', 'rho_10.npy')
+    (tmp_path / 'notas.txt').write_text('no es un snapshot')
+    (tmp_path / 'x1.npy').write_bytes(b'')
+    (tmp_path / 'rho_final.npy').write_bytes(b'')
+    (tmp_path / 'vx1_03.npy').mkdir()  # directorio con nombre de snapshot
+
+    cat = scan(tmp_path)
+    assert cat.variables == ['Bx1', 'rho']
+    assert len(cat) == 5
+    for name in ('bx1', 'BX1', 'Bx1'):
+        assert name in cat
+        assert cat.resolve(name) == 'Bx1'
+        assert cat.times_for(name) == [0, 1, 2]
+    assert cat.path('bx1', 2) == tmp_path / 'bx1_02.npy'
+    assert cat.times_for('rho') == [0, 10]
+    assert 'vx1' not in cat and cat.resolve('vx1') is None and cat.times_for('vx1') == []
+
+
+def test_case_duplicate_snapshot_raises(tmp_path):
+    _touch(tmp_path, 'Bx1_00.npy', 'bx1_00.npy')
+    with pytest.raises(ValueError, match='mismo snapshot'):
+        scan(tmp_path)
+
+
+def test_sidecar_reused_until_directory_changes(tmp_path, monkeypatch):
+    _touch(tmp_path, 'rho_00.npy', 'rho_01.npy')
+    first = open_catalog(tmp_path)
+    assert (tmp_path / '.store' / 'catalog.json').exists()
+
+    calls = []
+    real_scan = catalog.scan
+    monkeypatch.setattr(catalog, 'scan', lambda d: calls.append(d) or real_scan(d))
+    assert open_catalog(tmp_path).files == first.files
+    assert calls == []
+
+    _touch(tmp_path, 'rho_02.npy')
+    st = os.stat(tmp_path)
+    # Asegura una fecha distinta aunque el sistema de archivos tenga poca resolución
+    os.utime(tmp_path, ns=(st.st_atime_ns, first.dir_mtime_ns + 1_000_000_000))
+    assert open_catalog(tmp_path).times_for('rho') == [0, 1, 2]
+    assert len(calls) == 1
+    assert open_catalog(tmp_path, refresh=True).times_for('rho') == [0, 1, 2]
+    assert len(calls) == 2
@@ -0,0 +1,70 @@
+"""Almacén de snapshots: empaquetado, vigencia del cubo y directorio alternativo"""
+import os
+
+import numpy as np
+import pytest
+
+import dataset
+from dataset import CUBE_NAME, INDEX_NAME, STORE_DIRNAME, SnapshotStore, open_store
+
+
+def test_store_matches_files(sound_dir):
+    store = open_store(sound_dir)
+    assert isinstance(store, SnapshotStore)
+    assert store.times == list(range(6))
+    assert store.grid_shape == (50, 1, 1)
+    for var in ('rho', 'vx1'):
+        for t in store.times:
+            np.testing.assert_array_equal(store.snapshot(var, t), np.load(sound_dir / f'{var}_{t:02d}.npy'))
+    assert 'RHO' in store
+    np.testing.assert_array_equal(store.series('rho', [2, 3]), store.series('rho')[2:4])
+
+
+def test_store_reused_while_sources_unchanged(sound_dir, capsys):
+    open_store(sound_dir)
+    assert 'Empaquetando' in capsys.readouterr().out
+    open_store(sound_dir)
+    assert 'Empaquetando' not in capsys.readouterr().out
+
+
+def test_store_repacks_when_an_older_file_changes(sound_dir, capsys):
+    store = open_store(sound_dir)
+    old_view = store.snapshot('rho', 1)
+    expected_old = np.array(old_view)
+
+    # Un archivo reescrito con una fecha anterior a la de los demás
+    path = sound_dir / 'rho_01.npy'
+    st = os.stat(path)
+    np.save(path, np.load(path) * 2)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - 10**9))
+    capsys.readouterr()
+
+    new = open_store(sound_dir)
+    assert 'Empaquetando' in capsys.readouterr().out
+    np.testing.assert_array_equal(new.snapshot('rho', 1), np.load(path))
+    # El cubo se reemplazó, no se sobrescribió: la vista anterior sigue válida
+    np.testing.assert_array_equal(old_view, expected_old)
+    assert sorted(os.listdir(sound_dir / STORE_DIRNAME)) == ['catalog.json', CUBE_NAME, INDEX_NAME]
+
+
+def test_interrupted_pack_leaves_no_fresh_store(sound_dir):
+    open_store(sound_dir)
+    (sound_dir / 'rho_03.npy').unlink()
+    np.save(sound_dir / 'rho_03.npy', np.zeros(7))  # tamaño incorrecto: el empaquetado falla
+
+    with pytest.raises(ValueError):
+        open_store(sound_dir)
+    store_dir = sound_dir / STORE_DIRNAME
+    assert not (store_dir / INDEX_NAME).exists()
+    assert not [p for p in os.listdir(store_dir) if p.endswith('.tmp')]
+
+
+def test_read_only_data_dir_uses_fallback(sound_dir, tmp_path, monkeypatch):
+    # Como root no se puede probar con permisos: se simula el directorio de solo lectura
+    monkeypatch.setattr(dataset, '_writable', lambda path: False)
+    fallback = tmp_path / 'results' / STORE_DIRNAME
+    store = open_store(sound_dir, fallback_dir=fallback)
+    assert store.store_dir.parent == fallback
+    assert store.store_dir.name.startswith('sound-')
+    assert not (sound_dir / STORE_DIRNAME / INDEX_NAME).exists()
+    np.testing.assert_array_equal(store.snapshot('rho', 0), np.load(sound_dir / 'rho_00.npy'))
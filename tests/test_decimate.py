@@ -0,0 +1,45 @@
+"""Decimación mínimo/máximo: se conservan los extremos de cada columna"""
+import math
+
+import numpy as np
+import pytest
+
+from decimate import decimate, minmax_indices
+
+
+@pytest.mark.parametrize('n, nbins', [(10_000, 700), (10_001, 333), (997, 10), (5, 40)])
+def test_minmax_keeps_extrema(n, nbins):
+    rng = np.random.default_rng(n)
+    y = rng.normal(size=n)
+    y[n // 3] = 50.0  # picos aislados
+    y[2 * n // 3] = -50.0
+    idx = minmax_indices(y, nbins)
+
+    assert np.all(np.diff(idx) > 0)
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert len(idx) <= 2 * nbins + 2
+    kept = set(idx.tolist())
+    assert {int(y.argmax()), int(y.argmin())} <= kept
+    # Mínimo y máximo de cada bloque
+    size = max(1, math.ceil(n / nbins))
+    for b0 in range(0, n, size):
+        block = y[b0:b0 + size]
+        assert b0 + int(block.argmin()) in kept
+        assert b0 + int(block.argmax()) in kept
+
+
+def test_decimate_keeps_range_and_order():
+    x = np.linspace(0, 1, 20_000)
+    y = np.sign(np.sin(40 * np.pi * x)) + 0.01 * x  # discontinuidades
+    xd, yd = decimate(x, y, width_px=300)
+    assert len(yd) <= 2 * 300 + 2
+    assert np.all(np.diff(xd) > 0)
+    assert yd.min() == y.min() and yd.max() == y.max()
+    assert xd[0] == x[0] and xd[-1] == x[-1]
+
+
+def test_small_input_unchanged():
+    x = np.arange(100.0)
+    y = np.sin(x)
+    xd, yd = decimate(x, y, width_px=50)
+    assert xd is x and yd is y
@@ -0,0 +1,26 @@
+"""Caché LRU de magnitudes derivadas"""
+import numpy as np
+
+from derived import LRUCache
+
+
+def test_lru_eviction_and_fingerprint():
+    cache = LRUCache(max_bytes=3 * 80)
+    for key in 'abcd':
+        cache.put(key, np.zeros(10), fingerprint=1)
+    assert cache.get('a', 1) is None
+    assert cache.get('d', 1) is not None
+    assert cache.get('d', 2) is None  # la huella cambió: los datos ya no valen
+    assert cache.nbytes == 3 * 80
+
+
+def test_lru_drops_locks_of_evicted_keys():
+    cache = LRUCache(max_bytes=4 * 80)
+    for i in range(100):
+        with cache.key_lock(i):
+            if cache.get(i) is None:
+                cache.put(i, np.zeros(10))
+    with cache.key_lock('grande'):
+        cache.put('grande', np.zeros(1000))
+    assert len(cache) == 4
+    assert set(cache._key_locks) == set(cache._entries)
@@ -0,0 +1,61 @@
+"""Diagnósticos de conservación sobre ondas sintéticas"""
+import numpy as np
+import pytest
+
+from dataset import open_store
+from derived import Derived
+from diagnostics import COLUMNS, cell_volumes, conservation
+from synthetic import make_dataset
+
+
+def test_alfven_wave_conserves_everything(tmp_path):
+    make_dataset('alfven', tmp_path / 'alf', ncells=64, nsnapshots=11, amp=0.2)
+    store = open_store(tmp_path / 'alf')
+    assert cell_volumes(store, 'x3').sum() == pytest.approx(1.0)
+
+    diag = conservation(Derived(store), 'x3')
+    c = diag.columns
+    assert list(diag.times) == list(range(11))
+    np.testing.assert_allclose(c['masa'], 1.0)
+    # ⟨cos²⟩ = 1/2: cinética = amp²/4 y magnética = (1 + amp²/2)/2
+    np.testing.assert_allclose(c['cinetica'], 0.01)
+    np.testing.assert_allclose(c['magnetica'], 0.51)
+    np.testing.assert_allclose(c['px'], 0.0, atol=1e-12)
+    assert diag.violations() == []
+    assert diag.summary_lines()[-1] == " - Sin violaciones de los umbrales"
+
+
+def test_sound_wave_without_magnetic_field(sound_dir):
+    diag = conservation(Derived(open_store(sound_dir)), 'x1')
+    assert np.isnan(diag.columns['magnetica']).all()
+    assert np.isnan(diag.columns['by_max']).all() and diag.worst('by_max') is None
+    assert np.isfinite(diag.columns['energia']).all()
+    assert abs(diag.columns['deriva_masa']).max() < 1e-12
+    assert diag.violations() == []
+
+
+def test_injected_errors_are_violations(tmp_path):
+    data_dir = tmp_path / 'alf'
+    make_dataset('alfven', data_dir, ncells=32, nsnapshots=8)
+    np.save(data_dir / 'vx2_05.npy', np.full(32, 0.01))
+    np.save(data_dir / 'rho_03.npy', np.full(32, 1.001))
+    diag = conservation(Derived(open_store(data_dir)), 'x3')
+
+    found = {name: (t, value) for name, t, value, _ in diag.violations()}
+    assert sorted(found) == ['deriva_masa', 'vy_max']
+    assert found['vy_max'] == (5, pytest.approx(0.01))
+    assert found['deriva_masa'] == (3, pytest.approx(1e-3))
+    assert any(line.startswith(" - ⚠️ vy_max") for line in diag.summary_lines())
+    # Umbrales propios
+    assert diag.violations({'vy_max': 0.1}) == []
+
+
+def test_csv_has_one_row_per_snapshot(tmp_path, sound_dir):
+    diag = conservation(Derived(open_store(sound_dir)), 'x1')
+    path = tmp_path / 'diag.csv'
+    diag.write_csv(path)
+    lines = path.read_text().splitlines()
+    assert lines[0] == ','.join(COLUMNS)
+    table = np.genfromtxt(path, delimiter=',', skip_header=1)
+    assert table.shape == (len(diag.times), len(COLUMNS))
+    np.testing.assert_allclose(table[:, 1], diag.columns['masa'], rtol=1e-7)
@@ -0,0 +1,70 @@
+"""Modo seguimiento sobre una corrida emulada (synthetic.emulate_run)"""
+import csv
+import shutil
+import threading
+
+import numpy as np
+from PIL import Image
+
+from follow import Follower, follow
+from synthetic import emulate_run
+
+NSNAPSHOTS = 6
+
+
+def test_follow_emulated_run(tmp_path):
+    data_dir = tmp_path / 'corrida'
+    out_dir = tmp_path / 'follow'
+    writer = threading.Thread(target=emulate_run, args=('sound', data_dir),
+                              kwargs={'ncells': 50, 'nsnapshots': NSNAPSHOTS, 'interval': 0.1})
+    writer.start()
+    try:
+        follower = follow(data_dir, 'rho', 'x1', out_dir, interval=0.02, idle=10,
+                          max_snapshots=NSNAPSHOTS, fps=5, dpi=40)
+    finally:
+        writer.join()
+
+    with open(out_dir / 'rho_follow.csv') as f:
+        rows = list(csv.DictReader(f))
+    assert [int(r['t']) for r in rows] == list(range(NSNAPSHOTS))
+    assert len(follower.stats) == NSNAPSHOTS
+
+    assert follower.gif_ok
+    with Image.open(out_dir / 'rho.gif') as gif:
+        assert gif.n_frames == NSNAPSHOTS
+    assert (out_dir / 'rho_latest.png').exists()
+    assert (out_dir / 'rho_follow.txt').exists()
+    if shutil.which('ffmpeg'):
+        assert follower.mp4_ok
+
+
+def test_follow_waits_for_data(tmp_path):
+    # Sin snapshots todavía: no falla, solo espera y cierra sin video
+    (tmp_path / 'vacia').mkdir()
+    follower = follow(tmp_path / 'vacia', 'rho', 'x1', tmp_path / 'follow', interval=0.01, idle=0.05)
+    assert len(follower.stats) == 0
+    assert (follower.mp4_ok, follower.gif_ok) == (False, False)
+
+
+def test_follow_retries_truncated_pluto_snapshot(tmp_path):
+    from test_pluto import write_pluto
+
+    x = (np.arange(40) + 0.5) / 40
+    snapshots = {t: {'rho': (1 + 0.1 * np.sin(2 * np.pi * (x - 0.1 * t))).reshape(-1, 1, 1),
+                     'vx1': np.zeros((40, 1, 1))} for t in range(3)}
+    out = tmp_path / 'pluto'
+    write_pluto(out, snapshots, (40, 1, 1))
+    last = out / 'data.0002.dbl'
+    full = last.read_bytes()
+    last.write_bytes(full[:160])  # PLUTO todavía escribe el último snapshot (20 de 40 celdas)
+
+    follower = Follower(out, 'rho', 'x1', tmp_path / 'follow', dpi=40)
+    try:
+        assert follower.poll() == 2
+        assert follower.last_t == 1
+        last.write_bytes(full)
+        assert follower.poll() == 1
+        assert follower.last_t == 2
+    finally:
+        follower.close()
+    np.testing.assert_allclose(follower.source.load(2), snapshots[2]['rho'].ravel())
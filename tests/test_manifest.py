@@ -0,0 +1,106 @@
+"""Manifiesto de construcción: artefactos al día, regeneración y animaciones"""
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from dataset import open_store
+from manifest import BuildManifest
+from render import stream_line_animation
+
+
+def test_manifest_round_trip(tmp_path):
+    out = tmp_path / 'figura.png'
+    build = BuildManifest(tmp_path)
+    key = build.stale_key(out, ['a', 'b'], {'dpi': 80})
+    assert key
+    out.write_bytes(b'png')
+    build.record_output(out, key)
+    build.save()
+
+    # Otra ejecución: el manifiesto se lee del disco y la figura está al día
+    build = BuildManifest(tmp_path)
+    assert build.stale_key(out, ['a', 'b'], {'dpi': 80}) is None
+    # Cambian las entradas o los parámetros, o falta el archivo: se regenera
+    assert build.stale_key(out, ['a', 'c'], {'dpi': 80})
+    assert build.stale_key(out, ['a', 'b'], {'dpi': 180})
+    out.unlink()
+    assert build.stale_key(out, ['a', 'b'], {'dpi': 80})
+
+
+def test_manifest_record_drops_outputs_no_longer_produced(tmp_path):
+    build = BuildManifest(tmp_path)
+    old, new = tmp_path / 'a.mp4', tmp_path / 'a.gif'
+    old.write_bytes(b'mp4')
+    new.write_bytes(b'gif')
+    build.record('a', 'k1', [old, new])
+    build.record('a', 'k2', [new])
+    assert not old.exists() and new.exists()
+
+    build.forget('a')
+    assert not build.is_fresh('a', 'k2')
+    assert new.exists()  # forget no borra archivos
+
+
+def test_manifest_ignores_corrupt_file(tmp_path):
+    (tmp_path / '.manifest.json').write_text('{no es json')
+    assert BuildManifest(tmp_path).entries == {}
+
+
+def _animate(store, results_dir):
+    frames = [(t, f"t = {t}", None) for t in store.times_for('rho')]
+    build = BuildManifest(results_dir)
+    ok = stream_line_animation(store, 'rho', 'x1', frames, 'x', 'rho', (0.5, 1.5),
+                               str(results_dir / 'rho'), fps=5, workers=1, dpi=40,
+                               manifest=build)
+    build.save()
+    return ok, build
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="requiere ffmpeg")
+def test_animation_rebuild(sound_dir, tmp_path, capsys):
+    results = tmp_path / 'results'
+    results.mkdir()
+    store = open_store(sound_dir)
+    assert _animate(store, results)[0] == (True, True)
+    mtime = os.stat(results / 'rho.mp4').st_mtime_ns
+
+    # Segunda ejecución con los mismos datos: no se vuelve a codificar
+    capsys.readouterr()
+    assert _animate(open_store(sound_dir), results)[0] == (True, True)
+    assert 'Sin cambios' in capsys.readouterr().out
+    assert os.stat(results / 'rho.mp4').st_mtime_ns == mtime
+
+    # Cambia un snapshot: el almacén se reempaqueta y la animación se regenera
+    np.save(sound_dir / 'rho_02.npy', np.load(sound_dir / 'rho_02.npy') + 0.01)
+    capsys.readouterr()
+    assert _animate(open_store(sound_dir), results)[0] == (True, True)
+    assert 'Sin cambios' not in capsys.readouterr().out
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="requiere ffmpeg")
+def test_failed_encode_is_not_recorded(sound_dir, tmp_path, monkeypatch):
+    results = tmp_path / 'results'
+    results.mkdir()
+    store = open_store(sound_dir)
+    _animate(store, results)
+    np.save(sound_dir / 'rho_02.npy', np.load(sound_dir / 'rho_02.npy') + 0.01)
+
+    # ffmpeg que falla: el GIF se escribe, el MP4 anterior queda y la
+    # animación no se marca al día
+    fake = tmp_path / 'bin'
+    fake.mkdir()
+    (fake / 'ffmpeg').write_text('#!/bin/sh\ncat >/dev/null\nexit 1\n')
+    (fake / 'ffmpeg').chmod(0o755)
+    monkeypatch.setenv('PATH', f"{fake}{os.pathsep}{os.environ['PATH']}")
+    (mp4_ok, gif_ok), build = _animate(open_store(sound_dir), results)
+    assert (mp4_ok, gif_ok) == (False, True)
+    assert 'rho' not in build.entries
+    assert (results / 'rho.mp4').exists()
+
+    # Con ffmpeg de nuevo, la siguiente ejecución vuelve a codificar
+    monkeypatch.undo()
+    (mp4_ok, gif_ok), build = _animate(open_store(sound_dir), results)
+    assert (mp4_ok, gif_ok) == (True, True)
+    assert sorted(build.entries['rho']['outputs']) == ['rho.gif', 'rho.mp4']
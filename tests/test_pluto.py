@@ -0,0 +1,104 @@
+"""PlutoStore sobre salidas binarias escritas como las escribe PLUTO"""
+import os
+
+import numpy as np
+import pytest
+
+from dataset import open_store
+from pluto import FORMATS, PlutoStore, is_pluto_dir
+
+VARIABLES = ('rho', 'vx1', 'vx2', 'vx3')
+
+
+def write_grid(path, axes):
+    """grid.out (formato de PLUTO 4) con bordes de celda uniformes en [0, 1]"""
+    with open(path, 'w') as f:
+        f.write('# GEOMETRY:   CARTESIAN\n')
+        f.write(f'# DIMENSIONS: {sum(n > 1 for n in axes)}\n')
+        for n in axes:
+            edges = np.linspace(0.0, 1.0, n + 1)
+            f.write(f'{n}\n')
+            for i in range(n):
+                f.write(f' {i + 1}  {edges[i]:.12e}  {edges[i + 1]:.12e}\n')
+
+
+def write_pluto(out_dir, snapshots, axes, mode='single_file', fmt='dbl', endian='little'):
+    """
+    Escribe snapshots {t: {var: array (nx1, nx2, nx3)}} como salida de PLUTO.
+
+    Cada variable va con x1 variando más rápido (orden Fortran).
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    write_grid(out_dir / 'grid.out', axes)
+    dtype = np.dtype(('>' if endian == 'big' else '<') + FORMATS[fmt])
+    with open(out_dir / f'{fmt}.out', 'w') as f:
+        for t, fields in snapshots.items():
+            names = list(fields)
+            f.write(f'{t} {0.1 * t:.6e} 1.0e-3 {100 * t} {mode} {endian} {" ".join(names)}\n')
+            flat = [np.asarray(fields[v]).ravel(order='F') for v in names]
+            if mode == 'single_file':
+                # concatenate pasa al orden de bytes nativo: convertir después
+                np.concatenate(flat).astype(dtype).tofile(out_dir / f'data.{t:04d}.{fmt}')
+            else:
+                for v, arr in zip(names, flat):
+                    arr.astype(dtype).tofile(out_dir / f'{v}.{t:04d}.{fmt}')
+
+
+@pytest.mark.parametrize('mode', ['single_file', 'multiple_files'])
+@pytest.mark.parametrize('fmt', ['dbl', 'flt'])
+def test_pluto_matches_npy_store(sound_dir, tmp_path, mode, fmt):
+    npy = open_store(sound_dir)
+    snapshots = {t: {v: np.asarray(npy.snapshot(v, t)).reshape(-1, 1, 1) for v in VARIABLES}
+                 for t in npy.times}
+    out = tmp_path / 'pluto'
+    write_pluto(out, snapshots, (50, 1, 1), mode, fmt)
+
+    assert is_pluto_dir(out)
+    store = open_store(out)
+    assert isinstance(store, PlutoStore)
+    assert store.times == npy.times
+    assert store.sim_time == pytest.approx([0.1 * t for t in npy.times])
+    assert store.grid_shape == (50, 1, 1)
+    assert store.axes == ('x1',)
+    np.testing.assert_allclose(store.coord('x1'), (np.arange(50) + 0.5) / 50)
+
+    rtol = 0 if fmt == 'dbl' else 1e-6
+    for v in VARIABLES:
+        assert store.times_for(v) == npy.times
+        np.testing.assert_allclose(store.series(v), npy.series(v), rtol=rtol)
+        np.testing.assert_allclose(store.snapshot(v, 3), npy.snapshot(v, 3), rtol=rtol)
+
+
+def test_pluto_2d_cuts_and_missing_variables(tmp_path):
+    rng = np.random.default_rng(0)
+    axes = (6, 4, 1)
+    rho = {t: rng.random(axes) for t in range(3)}
+    # Bx1 solo en t=1: los nombres no distinguen mayúsculas
+    snapshots = {t: ({'rho': rho[t], 'Bx1': -rho[t]} if t == 1 else {'rho': rho[t]}) for t in rho}
+    out = tmp_path / 'pluto2d'
+    write_pluto(out, snapshots, axes, endian='big')
+
+    store = PlutoStore(out)
+    assert store.axes == ('x1', 'x2')
+    assert store.times_for('bx1') == [1]
+    assert store.has('rho', 2) and not store.has('bx1', 2)
+    for t in rho:
+        np.testing.assert_array_equal(store.field('rho', t), rho[t])
+    np.testing.assert_array_equal(store.cut('rho', 2, x2=3), rho[2][:, 3, 0])
+    np.testing.assert_array_equal(store.cut('bx1', 1, x1=0), -rho[1][0, :, 0])
+
+
+def test_pluto_digest_changes_when_file_is_rewritten(sound_dir, tmp_path):
+    npy = open_store(sound_dir)
+    snapshots = {t: {'rho': np.asarray(npy.snapshot('rho', t)).reshape(-1, 1, 1)} for t in npy.times}
+    out = tmp_path / 'pluto'
+    write_pluto(out, snapshots, (50, 1, 1))
+    before = PlutoStore(out).digest('rho', 2)
+    assert PlutoStore(out).digest('rho', 2) == before
+
+    path = out / 'data.0002.dbl'
+    data = np.fromfile(path, dtype='<f8')
+    (2 * data).tofile(path)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert PlutoStore(out).digest('rho', 2) != before
@@ -0,0 +1,81 @@
+"""Lectura anticipada: orden de entrega y ventana acotada"""
+import random
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from prefetch import prefetch, resolve_lookahead, warm
+
+
+@pytest.mark.parametrize('lookahead', [1, 3, 8])
+def test_order_kept_and_window_bounded(lookahead):
+    rng = random.Random(lookahead)
+    delays = {k: rng.uniform(0, 0.01) for k in range(25)}
+    started = []
+    lock = threading.Lock()
+
+    def load(key):
+        with lock:
+            started.append(key)
+        time.sleep(delays[key])  # terminan en desorden
+        return key * 10
+
+    got = []
+    for key, data in prefetch(load, range(25), lookahead=lookahead):
+        with lock:
+            # Además del que se entrega, a lo sumo `lookahead` cargas por delante
+            assert max(started) <= key + lookahead + 1
+        got.append((key, data))
+    assert got == [(k, k * 10) for k in range(25)]
+    assert sorted(started) == list(range(25))
+
+
+def test_lookahead_zero_is_sequential(monkeypatch):
+    monkeypatch.setenv('PREFETCH', '0')
+    assert resolve_lookahead() == 0
+    events = []
+
+    def load(key):
+        events.append(('carga', key, threading.current_thread().name))
+        return key
+
+    for key, _ in prefetch(load, range(4)):
+        events.append(('uso', key, threading.current_thread().name))
+    main = threading.current_thread().name
+    assert events == [(kind, k, main) for k in range(4) for kind in ('carga', 'uso')]
+
+
+def test_resolve_lookahead(monkeypatch):
+    monkeypatch.delenv('PREFETCH', raising=False)
+    assert resolve_lookahead() == 4
+    monkeypatch.setenv('PREFETCH', '7')
+    assert resolve_lookahead() == 7
+    assert resolve_lookahead(2) == 2
+    assert resolve_lookahead(-3) == 0
+
+
+def test_early_break_does_not_wait_for_pending():
+    release = threading.Event()
+
+    def load(key):
+        if key > 0:
+            release.wait(5)
+        return key
+
+    t0 = time.perf_counter()
+    gen = prefetch(load, range(50), lookahead=4)
+    assert next(gen) == (0, 0)
+    gen.close()
+    assert time.perf_counter() - t0 < 2
+    release.set()
+
+
+def test_warm_returns_same_memmap(tmp_path):
+    path = tmp_path / 'a.npy'
+    np.save(path, np.arange(10.0))
+    data = np.load(path, mmap_mode='r')
+    assert warm(data) is data
+    plain = np.arange(3)
+    assert warm(plain) is plain
@@ -0,0 +1,89 @@
+"""Perfiles de renderizado: resolución por nombre, entorno y argumentos"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from presets import PREVIEW_FRAMES, RenderProfile, add_arguments, profile_from_args, resolve_profile
+
+
+def test_resolve_by_name_env_and_overrides(monkeypatch):
+    monkeypatch.delenv('RENDER_PROFILE', raising=False)
+    assert resolve_profile().name == 'publication'
+    assert resolve_profile().dpi == 180
+
+    monkeypatch.setenv('RENDER_PROFILE', 'preview')
+    preview = resolve_profile()
+    assert (preview.name, preview.dpi, preview.max_frames, preview.keep_frames) == \
+        ('preview', 80, PREVIEW_FRAMES, False)
+    # El nombre explícito manda sobre el entorno; los None no cambian nada
+    assert resolve_profile('publication', dpi=None).dpi == 180
+    tuned = resolve_profile('preview', dpi=120, variables=['rho'])
+    assert (tuned.name, tuned.dpi, tuned.variables) == ('preview', 120, ('rho',))
+    assert resolve_profile('preview').dpi == 80  # PROFILES no se modifica
+
+    custom = RenderProfile('mio', dpi=50)
+    assert resolve_profile(custom, fps=3).dpi == 50
+
+
+def test_unknown_profile(monkeypatch):
+    with pytest.raises(ValueError, match='borrador'):
+        resolve_profile('borrador')
+    monkeypatch.setenv('RENDER_PROFILE', 'borrador')
+    with pytest.raises(ValueError):
+        resolve_profile()
+
+
+def test_frame_times():
+    times = list(range(0, 21))
+    assert RenderProfile('p').frame_times(times) == times
+    # El último tiempo siempre se anima
+    assert RenderProfile('p', stride=3).frame_times(times) == [0, 3, 6, 9, 12, 15, 18, 20]
+    assert RenderProfile('p', stride=5).frame_times(times) == [0, 5, 10, 15, 20]
+    capped = RenderProfile('p', stride=None, max_frames=4).frame_times(times)
+    assert capped == [0, 6, 12, 18, 20]
+    window = RenderProfile('p', stride=2, t_start=5, t_end=10)
+    assert window.window(times) == [5, 6, 7, 8, 9, 10]
+    assert window.frame_times(times) == [5, 7, 9, 10]
+    assert RenderProfile('p', t_start=30).frame_times(times) == []
+
+    preview = resolve_profile('preview')
+    assert len(preview.frame_times(range(1000))) <= PREVIEW_FRAMES + 1
+    assert preview.frame_times(range(50)) == list(range(50))
+
+
+def test_animates_and_results_dir():
+    everything = RenderProfile('p')
+    assert everything.animates('bx1', 'Bx')
+    some = RenderProfile('p', variables=['Bx', 'rho'])
+    assert some.animates('bx1', 'Bx') and some.animates('rho')
+    assert not some.animates('vx1', 'vx')
+
+    default = Path('results') / 'problema1'
+    assert resolve_profile('publication').results_dir(default) == default
+    assert resolve_profile('preview').results_dir(default) == Path('results/preview/problema1')
+
+
+def test_profile_from_args(monkeypatch):
+    monkeypatch.delenv('RENDER_PROFILE', raising=False)
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    assert profile_from_args(parser.parse_args([])).name == 'publication'
+
+    args = parser.parse_args(['--render', 'preview', '--dpi', '60', '--figsize', '5', '3',
+                              '--stride', '2', '--t-start', '4', '--t-end', '8', '--vars', 'Bx', 'vx'])
+    profile = profile_from_args(args)
+    assert profile.name == 'preview'
+    assert (profile.dpi, profile.figsize, profile.stride) == (60, (5.0, 3.0), 2)
+    assert (profile.t_start, profile.t_end, profile.variables) == (4, 8, ('Bx', 'vx'))
+    with pytest.raises(SystemExit):
+        parser.parse_args(['--render', 'borrador'])
+
+
+def test_presets_does_not_import_numpy():
+    src = Path(__file__).resolve().parent.parent / 'src'
+    code = "import sys, presets; print('numpy' in sys.modules)"
+    out = subprocess.run([sys.executable, '-c', code], cwd=src, capture_output=True, text=True)
+    assert out.stdout.strip() == 'False'
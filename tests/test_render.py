@@ -0,0 +1,63 @@
+"""Renderizado de fotogramas: procesos, hilos y figura persistente"""
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from dataset import open_store
+from render import render_line_frames
+from synthetic import make_dataset
+
+
+def _pixels(paths):
+    return [np.asarray(Image.open(p).convert('RGB')) for p in paths]
+
+
+def _render(store, var, ylim, out_dir, workers=1, blit=True):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    frames = [(t, f"{var} — t = {t}", out_dir / f'{t:02d}.png') for t in store.times_for(var)]
+    render_line_frames(store, var, 'x1', frames, 'x', var, ylim, workers=workers, dpi=40, blit=blit)
+    return [path for _, _, path in frames]
+
+
+@pytest.fixture
+def long_sound(tmp_path):
+    make_dataset('sound', tmp_path / 'sound', ncells=50, nsnapshots=30)
+    return open_store(tmp_path / 'sound')
+
+
+def test_threads_do_not_share_figures(long_sound, tmp_path):
+    # Con workers=1 las animaciones del grafo corren en hilos del mismo proceso
+    jobs = {'rho': (0.7, 1.3), 'vx1': (-0.3, 0.3), 'vx2': (-1.0, 1.0)}
+    expected = {var: _pixels(_render(long_sound, var, ylim, tmp_path / 'solo' / var))
+                for var, ylim in jobs.items()}
+
+    results = {}
+
+    def run(var, ylim):
+        results[var] = _render(long_sound, var, ylim, tmp_path / 'hilos' / var)
+
+    threads = [threading.Thread(target=run, args=job) for job in jobs.items()]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    for var in jobs:
+        for got, want in zip(_pixels(results[var]), expected[var]):
+            np.testing.assert_array_equal(got, want)
+
+
+def test_pool_matches_single_process(long_sound, tmp_path):
+    single = _pixels(_render(long_sound, 'rho', (0.7, 1.3), tmp_path / 'uno', workers=1))
+    pooled = _pixels(_render(long_sound, 'rho', (0.7, 1.3), tmp_path / 'pool', workers=3))
+    assert len(pooled) == len(single) == 30
+    for got, want in zip(pooled, single):
+        np.testing.assert_array_equal(got, want)
+
+
+def test_blit_matches_full_redraw(long_sound, tmp_path):
+    blit = _pixels(_render(long_sound, 'vx1', (-0.3, 0.3), tmp_path / 'blit', blit=True))
+    full = _pixels(_render(long_sound, 'vx1', (-0.3, 0.3), tmp_path / 'full', blit=False))
+    for got, want in zip(blit, full):
+        np.testing.assert_array_equal(got, want)
@@ -0,0 +1,35 @@
+"""Grafo de tareas: dependencias, tareas omitidas y orden con `after`"""
+import time
+
+from scheduler import DONE, FAILED, SKIPPED, TaskGraph
+
+
+def _fail():
+    raise RuntimeError("falla")
+
+
+def test_failed_dependency_skips_dependents():
+    graph = TaskGraph(workers=2)
+    a = graph.add('a', _fail)
+    b = graph.add('b', lambda: None, deps=[a])
+    graph.add('c', lambda: None, deps=[b])
+    assert not graph.run()
+    assert [t.status for t in graph.tasks.values()] == [FAILED, SKIPPED, SKIPPED]
+
+
+def test_after_only_orders():
+    order = []
+
+    def slow_failure():
+        time.sleep(0.1)
+        order.append('lenta')
+        _fail()
+
+    graph = TaskGraph(workers=4)
+    slow = graph.add('lenta', slow_failure)
+    base = graph.add('base', lambda: order.append('base'))
+    graph.add('resumen', lambda: order.append('resumen'), deps=[base], after=[slow])
+    graph.run()
+    assert graph.tasks['lenta'].status == FAILED
+    assert graph.tasks['resumen'].status == DONE
+    assert order.index('resumen') > order.index('lenta')
@@ -0,0 +1,31 @@
+"""Etapas de los scripts de solución sobre datos sintéticos"""
+from types import SimpleNamespace
+
+import pytest
+
+import solucion_problema1 as p1
+import solucion_problema2 as p2
+from dataset import open_store
+from manifest import BuildManifest
+from presets import resolve_profile
+from synthetic import make_dataset
+
+
+def _context(kind, tmp_path, profile):
+    make_dataset(kind, tmp_path / kind, ncells=20, nsnapshots=4)
+    store = open_store(tmp_path / kind)
+    results = tmp_path / 'results'
+    results.mkdir()
+    return SimpleNamespace(store=store, build=BuildManifest(results), results_dir=results,
+                           profile=profile, window=store.times)
+
+
+@pytest.mark.parametrize('module, kind', [(p1, 'sound'), (p2, 'alfven')])
+@pytest.mark.parametrize('variables, listed', [(None, True), (('no_existe',), False)])
+def test_report_lists_viewer_only_when_written(module, kind, variables, listed, tmp_path, capsys):
+    ctx = _context(kind, tmp_path, resolve_profile('preview', variables=variables))
+    module.html_viewer(ctx)
+    capsys.readouterr()
+    module.report(ctx)
+    assert ('viewer.html' in capsys.readouterr().out) == listed
+    assert (ctx.results_dir / 'viewer.html').exists() == listed
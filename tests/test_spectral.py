@@ -0,0 +1,32 @@
+"""Velocidad de fase medida y espectros degenerados"""
+import numpy as np
+import pytest
+
+from dataset import open_store
+from spectral import dispersion
+from synthetic import make_dataset
+
+
+def test_phase_speed_of_travelling_wave(tmp_path):
+    # La onda de Alfvén sintética recorre el dominio dos veces en 20 snapshots: v = 0.1
+    make_dataset('alfven', tmp_path / 'alf', ncells=64, nsnapshots=21)
+    spectra = dispersion(open_store(tmp_path / 'alf'), ['vx1', 'bx1'], 'x3')
+    for spec in spectra.values():
+        assert spec.phase_speed()['v_phase'] == pytest.approx(0.1, rel=1e-3)
+
+
+def test_zero_amplitude_has_no_phase_speed(tmp_path):
+    make_dataset('alfven', tmp_path / 'alf', ncells=32, nsnapshots=11, amp=0.0)
+    spec = dispersion(open_store(tmp_path / 'alf'), ['vx1'], 'x3')['vx1']
+    result = spec.phase_speed()
+    assert result['v_phase'] is None and result['modes'] == []
+
+
+def test_gapped_times_have_no_phase_speed(tmp_path):
+    data_dir = tmp_path / 'alf'
+    make_dataset('alfven', data_dir, ncells=32, nsnapshots=11, variables=['vx1'])
+    (data_dir / 'vx1_04.npy').unlink()
+    spec = dispersion(open_store(data_dir), ['vx1'], 'x3')['vx1']
+    assert spec.power is None
+    assert spec.phase_speed()['v_phase'] is None
+    assert np.isfinite(spec.k).all()
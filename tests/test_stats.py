@@ -0,0 +1,50 @@
+"""Estadísticas por bloques comparadas con una reducción directa de numpy"""
+import numpy as np
+import pytest
+
+from dataset import open_store
+from stats import compute_stats, fixed_ylim, reduce_series
+from synthetic import make_dataset
+
+
+@pytest.mark.parametrize('chunk_bytes', [64, 2000, 1 << 26])
+def test_compute_stats_matches_numpy(tmp_path, chunk_bytes):
+    # 64 bytes: bloques de celdas dentro de cada snapshot; 2000: dos
+    # snapshots por bloque; 64 MiB: todo el cubo de una vez
+    data_dir = tmp_path / 'sound'
+    make_dataset('sound', data_dir, ncells=50, nsnapshots=9, noise=0.05)
+    (data_dir / 'rho_03.npy').unlink()
+    store = open_store(data_dir)
+
+    stats = compute_stats(store, ['rho', 'vx1', 'no_existe'], chunk_bytes=chunk_bytes)
+    assert sorted(stats) == ['rho', 'vx1']
+    for var, s in stats.items():
+        times = [t for t in store.times if (data_dir / f'{var}_{t:02d}.npy').exists()]
+        assert s.times == times
+        arrays = np.array([np.load(data_dir / f'{var}_{t:02d}.npy') for t in times])
+        np.testing.assert_allclose(s.min, arrays.min(axis=1))
+        np.testing.assert_allclose(s.max, arrays.max(axis=1))
+        np.testing.assert_allclose(s.mean, arrays.mean(axis=1))
+        np.testing.assert_allclose(s.absmax, np.abs(arrays).max(axis=1))
+    assert 3 not in stats['rho'] and 3 in stats['vx1']
+
+
+@pytest.mark.parametrize('chunk_bytes', [8, 100, 1 << 26])
+def test_reduce_series_matches_numpy(chunk_bytes):
+    series = np.random.default_rng(0).normal(size=(7, 4, 5))
+    s = reduce_series(series, times=range(10, 17), chunk_bytes=chunk_bytes)
+    flat = series.reshape(7, -1)
+    np.testing.assert_allclose(s.min, flat.min(axis=1))
+    np.testing.assert_allclose(s.max, flat.max(axis=1))
+    np.testing.assert_allclose(s.mean, flat.mean(axis=1))
+    np.testing.assert_allclose(s.half_range, (flat.max(axis=1) - flat.min(axis=1)) / 2)
+    assert s.at(12)['max'] == pytest.approx(flat[2].max())
+    assert s.ylim(pad_frac=0) == (pytest.approx(flat.min()), pytest.approx(flat.max()))
+
+
+def test_fixed_ylim():
+    assert fixed_ylim(0.0, 1.0, pad_frac=0.1) == pytest.approx((-0.1, 1.1))
+    assert fixed_ylim(-0.2, 0.5, pad_frac=0, symmetric=True) == pytest.approx((-0.5, 0.5))
+    # Rango cero: se abre alrededor del valor
+    assert fixed_ylim(0.0, 0.0, pad_frac=0) == pytest.approx((-1.0, 1.0))
+    assert fixed_ylim(2.0, 2.0, pad_frac=0) == pytest.approx((1.8, 2.2))
@@ -0,0 +1,30 @@
+"""Barrido de parámetros: una fila por corrida, también para las que fallan"""
+import csv
+
+import pytest
+
+from sweep import plot_mach, run_sweep, write_table
+from synthetic import make_dataset
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_sweep_keeps_going_after_a_broken_run(tmp_path, workers):
+    for amp in (0.1, 0.3):
+        make_dataset('alfven', tmp_path / f'amp_{amp}', ncells=32, nsnapshots=11, amp=amp)
+    broken = tmp_path / 'amp_0.2'
+    broken.mkdir()
+    (broken / 'x3.npy').write_bytes(b'no es un npy')
+    (broken / 'vx1_00.npy').write_bytes(b'tampoco')
+
+    rows = run_sweep(sorted(tmp_path.glob('amp_*')), 'amp', workers, tmp_path / 'stores')
+    assert [r['param'] for r in rows] == [0.1, 0.2, 0.3]
+    assert rows[1]['error'] and 'M_A' not in rows[1]
+    assert rows[0]['M_A'] == pytest.approx(0.1, rel=1e-3)
+    assert rows[2]['M_A'] == pytest.approx(0.3, rel=1e-3)
+
+    table = tmp_path / 'sweep.csv'
+    write_table(rows, table)
+    with open(table) as f:
+        written = list(csv.DictReader(f))
+    assert [r['error'] != '' for r in written] == [False, True, False]
+    assert plot_mach(rows, tmp_path / 'sweep_MA.png', 'amp')
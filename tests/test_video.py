@@ -0,0 +1,132 @@
+"""Codificación en streaming: MP4 por pipe a ffmpeg y GIF incremental"""
+import re
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from video import FfmpegPipe, GifWriter
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="requiere ffmpeg")
+
+
+def _frames(n, size):
+    """Fotogramas RGB de prueba: una franja que se desplaza"""
+    w, h = size
+    out = []
+    for i in range(n):
+        img = np.full((h, w, 3), 255, dtype=np.uint8)
+        img[:, (i * 7) % w:(i * 7) % w + 5] = (200, 30, 30)
+        out.append(img.tobytes())
+    return out
+
+
+@needs_ffmpeg
+@pytest.mark.parametrize('size', [(64, 48), (101, 57)])
+def test_ffmpeg_pipe_accepts_any_frame_size(tmp_path, size):
+    # libx264 en yuv420p solo acepta tamaños pares: los impares se recortan
+    pipe = FfmpegPipe(tmp_path / 'video.mp4', size, fps=5)
+    for frame in _frames(4, size):
+        pipe.write(frame)
+    assert pipe.close()
+    assert (tmp_path / 'video.mp4').stat().st_size > 0
+
+
+@needs_ffmpeg
+def test_custom_dpi_with_odd_frame_size(tmp_path):
+    from dataset import open_store
+    from render import stream_line_animation
+    from synthetic import make_dataset
+
+    make_dataset('sound', tmp_path / 'sound', ncells=20, nsnapshots=3)
+    store = open_store(tmp_path / 'sound')
+    frames = [(t, f"t = {t}", None) for t in store.times]
+    # 7 × 4 pulgadas a 75 dpi: 525 × 300 píxeles
+    mp4_ok, gif_ok = stream_line_animation(store, 'rho', 'x1', frames, 'x', 'rho', (0.7, 1.3),
+                                           str(tmp_path / 'rho'), fps=5, workers=1, dpi=75)
+    assert mp4_ok and gif_ok
+
+
+def _mp4_frames(path):
+    """Fotogramas de un MP4 contados por ffmpeg al decodificarlo"""
+    out = subprocess.run(['ffmpeg', '-v', 'info', '-i', str(path), '-f', 'null', '-'],
+                         capture_output=True, text=True).stderr
+    return int(re.findall(r'frame=\s*(\d+)', out)[-1])
+
+
+@needs_ffmpeg
+def test_streamed_animation_has_every_frame(sound_dir, tmp_path):
+    from dataset import open_store
+    from render import stream_line_animation
+
+    store = open_store(sound_dir)
+    frames = [(t, f"t = {t}", None) for t in store.times] * 3  # 18 fotogramas, varios bloques
+    for workers in (1, 2):
+        base = tmp_path / f'rho_{workers}'
+        ok = stream_line_animation(store, 'rho', 'x1', frames, 'x', 'rho', (0.7, 1.3), str(base),
+                                   fps=5, workers=workers, dpi=40)
+        assert ok == (True, True)
+        assert _mp4_frames(f'{base}.mp4') == len(frames)
+        with Image.open(f'{base}.gif') as gif:
+            assert gif.n_frames == len(frames)
+    # Los bloques renderizados en paralelo se escriben en orden
+    assert (tmp_path / 'rho_1.gif').read_bytes() == (tmp_path / 'rho_2.gif').read_bytes()
+
+
+def _image_descriptors(data):
+    """Flags empaquetados de cada descriptor de imagen de un GIF (recorre los bloques)"""
+    flags = data[10]
+    pos = 13 + (3 * 2 ** ((flags & 7) + 1) if flags & 0x80 else 0)
+    found = []
+
+    def skip_subblocks(pos):
+        while data[pos]:
+            pos += data[pos] + 1
+        return pos + 1
+
+    while data[pos] != 0x3B:
+        if data[pos] == 0x21:  # extensión
+            pos = skip_subblocks(pos + 2)
+        elif data[pos] == 0x2C:  # imagen
+            packed = data[pos + 9]
+            found.append(packed)
+            pos += 10 + (3 * 2 ** ((packed & 7) + 1) if packed & 0x80 else 0)
+            pos = skip_subblocks(pos + 1)
+        else:
+            raise AssertionError(f"Bloque GIF inesperado en {pos}: {data[pos]:#x}")
+    return found
+
+
+@pytest.mark.parametrize('sample', [1, 3, 50])
+def test_gif_writer_shared_palette(tmp_path, sample):
+    size = (40, 30)
+    frames = _frames(12, size)
+    writer = GifWriter(tmp_path / 'anim.gif', size, fps=5, sample=sample)
+    for frame in frames:
+        writer.write(frame)
+        # Memoria acotada: a lo sumo `sample` fotogramas retenidos para la paleta
+        assert len(writer._pending) <= sample
+    assert writer.close()
+
+    data = (tmp_path / 'anim.gif').read_bytes()
+    assert data[10] & 0x80  # paleta global en la cabecera
+    descriptors = _image_descriptors(data)
+    assert len(descriptors) == len(frames)
+    assert not any(packed & 0x80 for packed in descriptors)  # ninguna paleta local
+
+    # Con dos colores la paleta es exacta: los fotogramas (recortados al
+    # rectángulo que cambia) se reconstruyen sin pérdida
+    with Image.open(tmp_path / 'anim.gif') as gif:
+        assert gif.n_frames == len(frames)
+        for i, frame in enumerate(frames):
+            gif.seek(i)
+            want = np.frombuffer(frame, dtype=np.uint8).reshape(size[1], size[0], 3)
+            np.testing.assert_array_equal(np.asarray(gif.convert('RGB')), want)
+
+
+def test_gif_writer_without_frames(tmp_path):
+    writer = GifWriter(tmp_path / 'vacio.gif', (10, 10))
+    assert not writer.close()
+    assert not (tmp_path / 'vacio.gif').exists()
@@ -0,0 +1,50 @@
+"""Ida y vuelta del visor HTML: write_viewer → read_viewer"""
+import numpy as np
+import pytest
+
+from dataset import open_store
+from viewer import read_viewer, write_viewer
+
+
+@pytest.mark.parametrize('dtype, rtol', [('float32', 1e-6), ('float16', 1e-3)])
+def test_viewer_round_trip(sound_dir, tmp_path, dtype, rtol):
+    store = open_store(sound_dir)
+    path = tmp_path / 'viewer.html'
+    size = write_viewer(path, store, ['rho', 'vx1'], 'x1', title='Prueba </script>', dtype=dtype)
+    assert size == path.stat().st_size
+
+    data = read_viewer(path)
+    assert data['times'] == store.times
+    np.testing.assert_allclose(data['x'], store.coord('x1'), rtol=1e-6)
+    for var in ('rho', 'vx1'):
+        times, values = data[var]
+        expected = np.asarray(store.series(var), dtype=np.float64)
+        assert times == store.times_for(var)
+        assert values.shape == expected.shape
+        # float16 guarda (valor - centro) / escala: el error es relativo al rango
+        span = np.ptp(expected) or 1.0
+        np.testing.assert_allclose(values, expected, rtol=0, atol=rtol * span)
+
+
+def test_viewer_subset_and_missing_variables(sound_dir, tmp_path):
+    store = open_store(sound_dir)
+    path = tmp_path / 'viewer.html'
+    write_viewer(path, store, ['rho', 'no_existe'], 'x1', times=[1, 3, 5])
+
+    data = read_viewer(path)
+    assert data['times'] == [1, 3, 5]
+    assert 'no_existe' not in data
+    times, values = data['rho']
+    assert times == [1, 3, 5]
+    assert values.shape == (3, 50)
+
+
+def test_viewer_rejects_multidimensional_grids(tmp_path):
+    data_dir = tmp_path / 'plano'
+    data_dir.mkdir()
+    np.save(data_dir / 'x1.npy', np.linspace(0, 1, 4))
+    for t in range(2):
+        np.save(data_dir / f'rho_{t:02d}.npy', np.ones((4, 5)))
+    store = open_store(data_dir)
+    with pytest.raises(ValueError):
+        write_viewer(tmp_path / 'viewer.html', store, ['rho'], 'x1')